@@ -1,24 +1,64 @@
 import streamlit as st
 import pandas as pd
-import matplotlib.pyplot as plt
-from io import BytesIO
 import os
 import sys
+import shutil
+import tempfile
+import warnings
 
 # 确保可以导入 src 模块
 sys.path.append(os.path.join(os.path.dirname(__file__), 'src'))
 import plots as pf
+import ingest
 
 # 设置页面配置
 st.set_page_config(page_title="数据可视化工具", layout="wide")
 
+DEFAULT_SPLIT_INDEX = "Ⅲ2-16"
+
 # ==========================================
 # 辅助函数
 # ==========================================
 @st.cache_resource
-def load_excel(file):
-    """缓存加载 Excel 文件"""
-    return pd.ExcelFile(file)
+def load_table_source(file):
+    """缓存加载数据文件 (Excel / CSV / Parquet / Feather / ZIP)；重新上传时未修改的工作表直接取缓存"""
+    return ingest.open_incremental(file)
+
+def report_upload_changes(xl, file_name, sheet):
+    """与同名文件上一次上传的版本比较，在侧边栏提示变化的工作表与行"""
+    history = st.session_state.setdefault("upload_history", {})
+    entry = history.get(file_name)
+    if entry is None or entry["current"]["version"] != xl.version:
+        # 只保存签名与指纹 (指纹字典随解析的工作表增加)，不保留上一版本的数据
+        current = {"version": xl.version, "signatures": xl.signatures, "fingerprints": xl.fingerprints}
+        entry = {"previous": entry["current"] if entry else None, "current": current}
+        history[file_name] = entry
+    previous = entry["previous"]
+    if previous is None:
+        return
+
+    changes = ingest.compare_signatures(previous["signatures"], xl.signatures,
+                                        previous["fingerprints"], xl.fingerprints)
+    notes = []
+    if changes["changed"]:
+        notes.append("修改: " + "、".join(map(str, changes["changed"])))
+    if changes["added"]:
+        notes.append("新增: " + "、".join(map(str, changes["added"])))
+    if changes["removed"]:
+        notes.append("删除: " + "、".join(map(str, changes["removed"])))
+    st.sidebar.caption("与上次上传相比 — " + ("；".join(notes) if notes else "所有工作表均未变化"))
+
+    old_fp, new_fp = previous["fingerprints"].get(sheet), xl.fingerprints.get(sheet)
+    if old_fp is None or new_fp is None:
+        return
+    diff = ingest.diff_fingerprints(old_fp, new_fp)
+    if diff["unchanged"]:
+        st.sidebar.caption("当前工作表内容未变化，图表将直接使用缓存")
+    elif diff["columns_changed"]:
+        st.sidebar.caption("当前工作表的列发生变化")
+    else:
+        rows = "、".join(f"{a + 1}–{b}" for a, b in diff["changed_rows"])
+        st.sidebar.caption(f"当前工作表第 {rows} 行有变化，其余部分 (如热图未变化的分页) 直接使用缓存")
 
 def clean_data(df):
     """自动清洗数据"""
@@ -34,6 +74,213 @@ def clean_data(df):
         
     return df
 
+MIME_TYPES = {"png": "image/png", "svg": "image/svg+xml", "pdf": "application/pdf"}
+
+def format_size(n_bytes):
+    """文件大小的可读表示"""
+    if n_bytes < 1024 * 1024:
+        return f"{n_bytes / 1024:.1f} KB"
+    return f"{n_bytes / 1024 / 1024:.1f} MB"
+
+def show_images(images, file_stem, numbered=False):
+    """展示渲染好的 PNG 并提供下载按钮 (元素为 {格式: 字节} 时每种格式一个按钮)"""
+    for i, img in enumerate(images):
+        outputs = img if isinstance(img, dict) else {"png": img}
+        st.image(outputs["png"])
+        multi = numbered or len(images) > 1
+        for fmt, data in outputs.items():
+            name = f"{file_stem}_{i+1}" if multi else file_stem
+            st.download_button(
+                label=(f"下载图表 {i+1}" if multi else "下载图表") + f" ({fmt.upper()}, {format_size(len(data))})",
+                data=data,
+                file_name=f"{name}.{fmt}",
+                mime=MIME_TYPES[fmt],
+                key=f"{name}.{fmt}"
+            )
+
+def bundle_job(job, sheets, bundle_fmt, image_fmt, font_size, chart_kwargs):
+    """后台任务：渲染工作簿中所有适用图表，边渲染边写入临时文件，返回 (文件路径, 图表数, 失败列表)"""
+    fd, path = tempfile.mkstemp(suffix=".zip" if bundle_fmt == "zip" else ".pdf")
+    os.close(fd)
+
+    def report(done, total, name):
+        job.update(done=done, total=total, stage=f"{done}/{total} {name}")
+
+    try:
+        if bundle_fmt == "zip":
+            n, errors = pf.write_zip_bundle(sheets, path, progress=report, fmt=image_fmt,
+                                            font_size=font_size, chart_kwargs=chart_kwargs)
+        else:
+            n, errors = pf.write_pdf_bundle(sheets, path, progress=report,
+                                            font_size=font_size, chart_kwargs=chart_kwargs)
+    except BaseException:
+        os.remove(path)
+        raise
+    return path, n, errors
+
+def start_bundle_job(xl, sheet_names, bundle_fmt, image_fmt="png"):
+    """
+    工作表在页面线程中读取 (数据源对象不跨线程共享)，渲染与写文件在后台进行
+    每个工作表清洗后写为一份内存映射的共享工作表 (ingest.SharedSheet)，各图表的渲染任务共用
+    """
+    share_dir = tempfile.mkdtemp(prefix="bundle_")
+    sheets = {name: ingest.save_shared_sheet(clean_data(xl.parse(name)), share_dir, f"sheet_{i}")
+              for i, name in enumerate(sheet_names)}
+    chart_kwargs = {'heatmap': {'split_index': DEFAULT_SPLIT_INDEX, 'cmap_name': heatmap_cmap}}
+    old = st.session_state.setdefault("jobs", {}).get("bundle")
+    if old is not None and old.status == "done":
+        # 删除上一次生成的导出包
+        old_path = old.result[0]
+        if os.path.exists(old_path):
+            os.remove(old_path)
+    job = submit_job("bundle", bundle_job, sheets, bundle_fmt, image_fmt, global_font_size, chart_kwargs,
+                     name=f"figures.{bundle_fmt}", background=True)
+    # 任务结束 (含取消、失败) 或未能提交时删除共享工作表
+    if job is None:
+        shutil.rmtree(share_dir, ignore_errors=True)
+    else:
+        job.future.add_done_callback(lambda _: shutil.rmtree(share_dir, ignore_errors=True))
+
+def submit_job(key, func, *args, name="", background=False, **kwargs):
+    """
+    提交并登记后台任务 func(job, ...)；同一位置已有未完成的任务时先取消，任务队列已满时提示稍后重试
+    :param background: 批量任务 (导出包)，让位于图表预览的渲染
+    """
+    jobs = st.session_state.setdefault("jobs", {})
+    old = jobs.get(key)
+    if old is not None:
+        old.cancel()
+    try:
+        jobs[key] = pf.start_job(func, *args, name=name, background=background, **kwargs)
+    except pf.JobQueueFull as e:
+        jobs.pop(key, None)
+        st.warning(str(e))
+        return None
+    return jobs[key]
+
+def start_render(key, draw_func, *args, file_stem, **kwargs):
+    """在后台渲染图表，结果在页面重新运行后仍保留"""
+    return submit_job(key, pf.render_pages, draw_func, *args, name=file_stem, font_size=global_font_size,
+                      fmt=export_formats, **kwargs)
+
+@st.fragment(run_every=1.0)
+def job_progress(key):
+    """定时刷新任务进度；任务结束后整页重新运行以展示结果"""
+    job = st.session_state["jobs"][key]
+    if job.status not in ("pending", "running"):
+        st.rerun()
+    text = f"{job.stage} · {job.elapsed:.0f} s"
+    st.progress(job.progress, text=text)
+    if st.button("取消", key=f"{key}_cancel"):
+        job.cancel()
+        st.rerun()
+
+def show_job(key, display=None, numbered=False):
+    """
+    展示后台任务的进度或结果
+    :param display: 可选，display(job.result, job.name) 自定义结果展示，默认按图片列表展示
+    """
+    job = st.session_state.get("jobs", {}).get(key)
+    if job is None:
+        return
+    status = job.status
+    if status in ("pending", "running"):
+        job_progress(key)
+    elif status == "cancelled":
+        st.info("已取消")
+    elif status == "error":
+        st.error(f"绘图失败: {job.error}")
+        st.exception(job.error)
+    elif display is not None:
+        display(job.result, job.name)
+    else:
+        show_images(job.result, job.name, numbered=numbered)
+
+def show_bundle(result, file_name):
+    """导出包完成后的提示与下载按钮"""
+    path, n, errors = result
+    if not os.path.exists(path):
+        return
+    st.success(f"已生成 {n} 张图表，文件大小 {format_size(os.path.getsize(path))}")
+    for sheet, chart, msg in errors:
+        st.warning(f"{sheet} / {chart}: {msg}")
+    with open(path, "rb") as f:
+        st.download_button(
+            label="下载导出包",
+            data=f,
+            file_name=file_name,
+            mime="application/zip" if file_name.endswith(".zip") else "application/pdf"
+        )
+
+def boxplot_job(job, df, ci_params, font_size, fmt):
+    """后台任务：可选的 Bootstrap 置信区间 + 箱线图"""
+    ci_table = pairwise = None
+    if ci_params is not None:
+        job.update(stage="计算置信区间")
+        ci_table, pairwise = pf.bootstrap_ci(df, **ci_params)
+    images = pf.render_pages(job, pf.draw_boxplot, df, font_size=font_size, fmt=fmt, ci_table=ci_table)
+    return images, ci_table, pairwise
+
+def show_boxplot(result, file_stem):
+    images, ci_table, pairwise = result
+    show_images(images, file_stem)
+    if ci_table is not None:
+        st.subheader("置信区间汇总")
+        st.dataframe(ci_table)
+        st.subheader("两两比较 (中位数差)")
+        st.dataframe(pairwise)
+
+def energy_job(job, df, span_params, font_size, fmt):
+    """后台任务：能级图，可选的能量跨度分析"""
+    span_table = None
+    if span_params is not None:
+        job.update(stage="能量跨度分析")
+        span_table = pf.energetic_span(df, **span_params)
+    images = pf.render_pages(job, pf.draw_energy_profile, df, font_size=font_size, fmt=fmt,
+                             highlight_span=span_params is not None)
+    return images, span_table
+
+def show_energy(result, file_stem):
+    images, span_table = result
+    show_images(images, file_stem)
+    if span_table is not None:
+        st.subheader("能量跨度排名 (δE 越小 TOF 越高)")
+        st.dataframe(span_table)
+        st.download_button("下载排名表 (CSV)", span_table.to_csv(index=False).encode("utf-8-sig"),
+                           file_name=f"{file_stem}_energetic_span.csv", mime="text/csv", key=f"{file_stem}_span_csv")
+
+def select_smiles_col(df, key):
+    """结构式缩略图的 SMILES 列选择 (默认不绘制)"""
+    text_cols = [c for c in df.columns[1:] if not pd.api.types.is_numeric_dtype(df[c])]
+    if not text_cols:
+        return None
+    choice = st.selectbox("结构式缩略图 (SMILES 列)", ["(不显示)"] + text_cols, key=key,
+                          help="需要安装 rdkit；结构式按规范化 SMILES 缓存，只在首次使用时绘制")
+    return None if choice == "(不显示)" else choice
+
+def plate_reader_import(df, key):
+    """可选：用酶标仪板布局导出文件 + 板图生成 生测编号 × 浓度 宽表，替换当前工作表数据"""
+    with st.expander("🧪 从酶标仪原始数据导入", expanded=False):
+        export_file = st.file_uploader("板布局导出 (CSV / TXT / Excel)", type=["csv", "tsv", "txt", "xlsx", "xls"],
+                                       key=f"{key}_plate_export")
+        map_file = st.file_uploader("板图 (Well / 生测编号 / 浓度，可选 Plate 列)", type=["xlsx", "xls", "csv"],
+                                    key=f"{key}_plate_map")
+        method_label = st.radio("归一化方式", ["自动", "CK + 对照药剂", "仅 CK"], horizontal=True, key=f"{key}_plate_norm",
+                                help="自动：板上有对照药剂时按 CK=0、对照药剂=100 归一化，否则计算相对 CK 的抑制率")
+        if export_file is None or map_file is None:
+            return df
+        try:
+            plate_map = clean_data(load_table_source(map_file).parse(0))
+            conc_col = next((c for c in ["浓度", "靶标", "作物"] if c in plate_map.columns), "浓度")
+            method = {"自动": "auto", "CK + 对照药剂": "ck_ref", "仅 CK": "ck"}[method_label]
+            tidy, summary, wide = ingest.load_plate_data(export_file, plate_map, conc_col=conc_col, method=method)
+        except Exception as e:
+            st.error(f"板数据解析失败: {e}")
+            return df
+        st.success(f"已解析 {tidy['Plate'].nunique()} 块板、{len(tidy)} 个孔，汇总为 {len(wide)} 个编号")
+        st.dataframe(summary)
+    return wide
+
 def get_download_link_for_template():
     """读取本地生成的模板文件并返回"""
     file_path = "test_data.xlsx"
@@ -54,6 +301,9 @@ st.markdown("上传 Excel 文件，自动生成热图、柱状图。")
 with st.sidebar.expander("🎨 全局绘图设置", expanded=False):
     global_font_size = st.slider("基准字体大小", 10, 24, 16)
     heatmap_cmap = st.selectbox("热图配色方案", ["academic_red", "coolwarm", "viridis", "YlOrRd"], index=0)
+    vector_label = st.selectbox("矢量图下载", ["不需要", "SVG", "PDF"], index=0,
+                                help="矢量图只嵌入图中用到的字形，文件较小")
+    export_formats = "png" if vector_label == "不需要" else ("png", vector_label.lower())
 
 # 侧边栏：功能选择
 mode = st.sidebar.selectbox(
@@ -77,20 +327,48 @@ else:
     st.sidebar.warning("⚠️ 未找到模板文件 test_data.xlsx")
 
 # 通用文件上传
-uploaded_file = st.sidebar.file_uploader("上传 Excel 文件", type=["xlsx", "xls"])
+uploaded_file = st.sidebar.file_uploader("上传数据文件", type=ingest.UPLOAD_TYPES,
+                                         help="支持 Excel、CSV、Parquet、Feather；ZIP 中的每个表作为一个工作表")
 
-if uploaded_file is not None:
+# 能级图模式可直接上传计算输出文件
+qchem_files = []
+if mode == "反应能级图 (Energy Profile)":
+    qchem_files = st.sidebar.file_uploader("或上传 Gaussian/ORCA 输出文件", type=["log", "out"],
+                                           accept_multiple_files=True,
+                                           help="文件名格式: 路径_步骤.log，例如 Catalyzed_TS1.log")
+
+if uploaded_file is not None or qchem_files:
     try:
-        # 读取 Excel
-        xl = load_excel(uploaded_file)
-        sheet_names = xl.sheet_names
-        
-        st.sidebar.markdown("---")
-        selected_sheet = st.sidebar.selectbox("选择工作表 (Sheet)", sheet_names)
-        
-        # 读取并清洗数据
-        raw_df = xl.parse(selected_sheet)
-        df = clean_data(raw_df)
+        if qchem_files:
+            step_text = st.sidebar.text_input("步骤顺序 (逗号分隔，留空按上传顺序)", value="")
+            steps = [s.strip() for s in step_text.split(",") if s.strip()] or None
+            reference = st.sidebar.text_input("参考步骤 (留空取第一个步骤)", value="").strip() or None
+            with warnings.catch_warnings(record=True) as caught:
+                warnings.simplefilter("always")
+                df = ingest.build_energy_table(qchem_files, steps=steps, reference=reference)
+            for w in caught:
+                st.sidebar.warning(str(w.message))
+            selected_sheet = "qchem"
+        else:
+            # 读取数据文件
+            xl = load_table_source(uploaded_file)
+            sheet_names = xl.sheet_names
+            
+            st.sidebar.markdown("---")
+            selected_sheet = st.sidebar.selectbox("选择工作表 (Sheet)", sheet_names)
+            
+            # 读取并清洗数据
+            raw_df = xl.parse(selected_sheet)
+            df = clean_data(raw_df)
+            report_upload_changes(xl, uploaded_file.name, selected_sheet)
+            
+            with st.sidebar.expander("📦 一键导出全部图表", expanded=False):
+                bundle_label = st.radio("导出格式", ["ZIP (PNG)", "ZIP (SVG)", "PDF (多页)"], horizontal=True)
+                bundle_fmt = "zip" if bundle_label.startswith("ZIP") else "pdf"
+                image_fmt = "svg" if bundle_label == "ZIP (SVG)" else "png"
+                if st.button("生成导出包"):
+                    start_bundle_job(xl, sheet_names, bundle_fmt, image_fmt)
+                show_job("bundle", display=show_bundle)
         
         st.subheader("数据预览")
         st.dataframe(df.head())
@@ -100,31 +378,26 @@ if uploaded_file is not None:
         # ==========================================
         if mode == "热图生成 (Heatmap)":
             st.header("🔥 活性热图")
+            df = plate_reader_import(df, "heatmap")
             
             with st.expander("高级设置", expanded=True):
-                split_index = st.text_input("分割点编号 (例如: Ⅲ2-16)", value="Ⅲ2-16")
+                split_index = st.text_input("分割点编号 (例如: Ⅲ2-16)", value=DEFAULT_SPLIT_INDEX)
+                order_label = st.radio("行排序方式", ["按编号排序", "按活性谱聚类"], horizontal=True)
+                heatmap_order = "cluster" if order_label == "按活性谱聚类" else "sort"
+                show_dendrogram = st.checkbox("显示聚类树状图", value=False, disabled=heatmap_order != "cluster",
+                                              help="仅在未分割且行数不超过精确聚类阈值时显示")
+                overview = st.checkbox("概览模式 (大数据量)", value=pf.chart_defaults("heatmap", df)["overview"],
+                                       help="整个矩阵绘制为一张固定尺寸的图像，行数超过像素数时分块聚合，不标注数值")
+                reduce_label = st.radio("概览聚合方式", ["均值", "最大值", "最小值"], horizontal=True, disabled=not overview)
+                heatmap_reduce = {"均值": "mean", "最大值": "max", "最小值": "min"}[reduce_label]
+                heatmap_smiles = select_smiles_col(df, "heatmap_smiles")
             
             if st.button("生成热图"):
-                with st.spinner("正在绘制热图..."):
-                    try:
-                        # 传递 UI 参数
-                        figures = pf.draw_heatmap(df.copy(), split_index, cmap_name=heatmap_cmap, font_size=global_font_size)
-                        
-                        for i, fig in enumerate(figures):
-                            st.pyplot(fig)
-                            
-                            # 下载按钮
-                            buf = BytesIO()
-                            fig.savefig(buf, format="png", dpi=300, bbox_inches='tight')
-                            st.download_button(
-                                label=f"下载图表 {i+1} (PNG)",
-                                data=buf.getvalue(),
-                                file_name=f"heatmap_{selected_sheet}_{i+1}.png",
-                                mime="image/png"
-                            )
-                    except Exception as e:
-                        st.error(f"绘图失败: {e}")
-                        st.exception(e)
+                # 传递 UI 参数
+                start_render("heatmap", pf.draw_heatmap, df.copy(), split_index, cmap_name=heatmap_cmap,
+                             order=heatmap_order, dendrogram=show_dendrogram, overview=overview,
+                             reduce=heatmap_reduce, smiles_col=heatmap_smiles, file_stem=f"heatmap_{selected_sheet}")
+            show_job("heatmap", numbered=True)
 
         # ==========================================
         # 模式 2: 除草柱图 (极坐标)
@@ -132,47 +405,31 @@ if uploaded_file is not None:
         elif mode == "除草活性柱图 (Polar Bar)":
             st.header("🌿 除草活性极坐标图")
             st.info("说明：请确保第一列为编号，后续列为不同作物的数据。")
+            df = plate_reader_import(df, "polar")
             
             if st.button("生成图表"):
-                with st.spinner("正在绘制..."):
-                    try:
-                        fig = pf.draw_polar_bar(df.copy(), font_size=global_font_size)
-                        st.pyplot(fig)
-                        
-                        buf = BytesIO()
-                        fig.savefig(buf, format="png", dpi=300, bbox_inches='tight')
-                        st.download_button(
-                            label="下载图表 (PNG)",
-                            data=buf.getvalue(),
-                            file_name=f"polar_bar_{selected_sheet}.png",
-                            mime="image/png"
-                        )
-                    except Exception as e:
-                        st.error(f"绘图失败: {e}")
+                start_render("polar", pf.draw_polar_bar, df.copy(), file_stem=f"polar_bar_{selected_sheet}")
+            show_job("polar")
 
         # ==========================================
         # 模式 3: 除菌柱图
         # ==========================================
         elif mode == "除菌活性柱图 (Bar Chart)":
             st.header("🍄 除菌活性柱状图")
-            st.info("说明：需要包含 '生测编号', '灰霉', '赤霉' 列。如果列名不匹配，将默认使用第1、2、3列。")
-            
-            if st.button("生成图表"):
-                with st.spinner("正在绘制..."):
-                    try:
-                        fig = pf.draw_fungicide_bar(df.copy(), font_size=global_font_size)
-                        st.pyplot(fig)
-
-                        buf = BytesIO()
-                        fig.savefig(buf, format="png", dpi=300, bbox_inches='tight')
-                        st.download_button(
-                            label="下载图表 (PNG)",
-                            data=buf.getvalue(),
-                            file_name=f"fungicide_bar_{selected_sheet}.png",
-                            mime="image/png"
-                        )
-                    except Exception as e:
-                        st.error(f"绘图失败: {e}")
+            st.info("说明：第一列 (或 '生测编号' 列) 为编号，可选择任意多个指标列并排绘制；编号较多时自动分页。")
+
+            id_col = '生测编号' if '生测编号' in df.columns else df.columns[0]
+            numeric_cols = [c for c in df.columns if c != id_col and pd.api.types.is_numeric_dtype(df[c])]
+            default_series = ['灰霉', '赤霉'] if {'灰霉', '赤霉'} <= set(numeric_cols) else numeric_cols
+            series = st.multiselect("选择指标列", numeric_cols, default=default_series)
+            bar_smiles = select_smiles_col(df, "bar_smiles")
+
+            if not series:
+                st.info("请至少选择一个指标列")
+            elif st.button("生成图表"):
+                start_render("bar", pf.draw_grouped_bar, df.copy(), series=series, smiles_col=bar_smiles,
+                             file_stem=f"fungicide_bar_{selected_sheet}")
+            show_job("bar")
 
         # ==========================================
         # 模式 4: 数据分布箱线图
@@ -180,23 +437,19 @@ if uploaded_file is not None:
         elif mode == "数据分布箱线图 (Boxplot)":
             st.header("📦 活性数据分布箱线图")
             st.info("说明：用于展示不同测试指标（作物/菌种）的数据分布情况，快速发现异常值。")
-            
+
+            show_ci = st.checkbox("标注 Bootstrap 置信区间", value=False)
+            if show_ci:
+                c1, c2, c3 = st.columns(3)
+                n_resamples = c1.number_input("重抽样次数", min_value=200, max_value=20000, value=2000, step=500)
+                ci_level = c2.selectbox("置信水平", [0.90, 0.95, 0.99], index=1)
+                seed = c3.number_input("随机种子", min_value=0, value=0, step=1)
+
             if st.button("生成箱线图"):
-                with st.spinner("正在绘制..."):
-                    try:
-                        fig = pf.draw_boxplot(df.copy(), font_size=global_font_size)
-                        st.pyplot(fig)
-
-                        buf = BytesIO()
-                        fig.savefig(buf, format="png", dpi=300, bbox_inches='tight')
-                        st.download_button(
-                            label="下载图表 (PNG)",
-                            data=buf.getvalue(),
-                            file_name=f"boxplot_{selected_sheet}.png",
-                            mime="image/png"
-                        )
-                    except Exception as e:
-                        st.error(f"绘图失败: {e}")
+                ci_params = dict(n_resamples=int(n_resamples), ci=ci_level, seed=int(seed)) if show_ci else None
+                submit_job("boxplot", boxplot_job, df.copy(), ci_params, global_font_size, export_formats,
+                           name=f"boxplot_{selected_sheet}")
+            show_job("boxplot", display=show_boxplot)
 
         # ==========================================
         # 模式 5: 广谱活性雷达图
@@ -204,23 +457,12 @@ if uploaded_file is not None:
         elif mode == "广谱活性雷达图 (Radar Chart)":
             st.header("🕸️ 广谱活性雷达图")
             st.info("说明：第一列为化合物编号，其余列为各靶标活性。建议数据量不要过多（只展示前6个）。")
+            radar_smiles = select_smiles_col(df, "radar_smiles")
             
             if st.button("生成雷达图"):
-                with st.spinner("正在绘制..."):
-                    try:
-                        fig = pf.draw_radar_chart(df.copy(), font_size=global_font_size)
-                        st.pyplot(fig)
-
-                        buf = BytesIO()
-                        fig.savefig(buf, format="png", dpi=300, bbox_inches='tight')
-                        st.download_button(
-                            label="下载图表 (PNG)",
-                            data=buf.getvalue(),
-                            file_name=f"radar_{selected_sheet}.png",
-                            mime="image/png"
-                        )
-                    except Exception as e:
-                        st.error(f"绘图失败: {e}")
+                start_render("radar", pf.draw_radar_chart, df.copy(), smiles_col=radar_smiles,
+                             file_stem=f"radar_{selected_sheet}")
+            show_job("radar")
 
         # ==========================================
         # 模式 6: 反应条件筛选气泡图
@@ -230,38 +472,47 @@ if uploaded_file is not None:
             st.markdown("**列映射设置**：请选择对应的列")
             
             cols = df.columns.tolist()
-            c1, c2, c3, c4 = st.columns(4)
+            plate_mode = st.checkbox("HTE 板图模式 (按孔位绘制)", value=False,
+                                     help="适用于 96/384/1536 孔高通量实验，数据需包含孔位列 (如 A01)")
             
-            # 智能默认值
-            def_x = cols[0] if len(cols) > 0 else None
-            def_y = cols[1] if len(cols) > 1 else None
-            def_size = cols[2] if len(cols) > 2 else None
-            def_color = cols[3] if len(cols) > 3 else None
-            
-            x_col = c1.selectbox("X轴 (如: 催化剂)", cols, index=cols.index(def_x) if def_x else 0)
-            y_col = c2.selectbox("Y轴 (如: 溶剂)", cols, index=cols.index(def_y) if def_y else 0)
-            size_col = c3.selectbox("大小 (如: 产率)", cols, index=cols.index(def_size) if def_size else 0)
-            color_col = c4.selectbox("颜色 (如: ee值)", cols, index=cols.index(def_color) if def_color else 0)
+            if plate_mode:
+                c1, c2, c3, c4 = st.columns(4)
+                well_col = c1.selectbox("孔位 (如: A01)", cols, index=0)
+                size_col = c2.selectbox("大小 (如: 产率)", cols, index=min(1, len(cols) - 1))
+                color_col = c3.selectbox("颜色 (如: ee值)", cols, index=min(2, len(cols) - 1))
+                plate_col = c4.selectbox("板号 (可选)", ["(无)"] + cols, index=0)
+                plot_cols = [well_col, size_col, color_col] + ([plate_col] if plate_col != "(无)" else [])
+                facet_col = None
+            else:
+                c1, c2, c3, c4 = st.columns(4)
+                
+                # 智能默认值
+                def_x = cols[0] if len(cols) > 0 else None
+                def_y = cols[1] if len(cols) > 1 else None
+                def_size = cols[2] if len(cols) > 2 else None
+                def_color = cols[3] if len(cols) > 3 else None
+                
+                x_col = c1.selectbox("X轴 (如: 催化剂)", cols, index=cols.index(def_x) if def_x else 0)
+                y_col = c2.selectbox("Y轴 (如: 溶剂)", cols, index=cols.index(def_y) if def_y else 0)
+                size_col = c3.selectbox("大小 (如: 产率)", cols, index=cols.index(def_size) if def_size else 0)
+                color_col = c4.selectbox("颜色 (如: ee值)", cols, index=cols.index(def_color) if def_color else 0)
+                facet_sel = st.selectbox("分面列 (可选，如: 温度)", ["(无)"] + cols, index=0)
+                plot_cols = [x_col, y_col, size_col, color_col]
+                facet_col = None
+                if facet_sel != "(无)":
+                    facet_col = facet_sel
+                    if facet_col not in plot_cols:
+                        plot_cols.append(facet_col)
             
             if st.button("生成气泡图"):
-                with st.spinner("正在绘制..."):
-                    try:
-                        # 构建新的 DF 传递给绘图函数，以适配旧接口
-                        plot_df = df[[x_col, y_col, size_col, color_col]].copy()
-                        fig = pf.draw_optimization_bubble(plot_df, font_size=global_font_size)
-                        st.pyplot(fig)
-
-                        buf = BytesIO()
-                        fig.savefig(buf, format="png", dpi=300, bbox_inches='tight')
-                        st.download_button(
-                            label="下载图表 (PNG)",
-                            data=buf.getvalue(),
-                            file_name=f"bubble_opt_{selected_sheet}.png",
-                            mime="image/png"
-                        )
-                    except Exception as e:
-                        st.error(f"绘图失败: {e}")
-                        st.exception(e)
+                # 构建新的 DF 传递给绘图函数，以适配旧接口
+                plot_df = df[plot_cols].copy()
+                if plate_mode:
+                    start_render("bubble", pf.draw_hte_plate, plot_df, file_stem=f"bubble_opt_{selected_sheet}")
+                else:
+                    start_render("bubble", pf.draw_optimization_bubble, plot_df, facet_col=facet_col,
+                                 file_stem=f"bubble_opt_{selected_sheet}")
+            show_job("bubble")
 
         # ==========================================
         # 模式 7: 反应能级图
@@ -271,31 +522,27 @@ if uploaded_file is not None:
             
             cols = df.columns.tolist()
             step_col = st.selectbox("步骤名称列 (Step)", cols, index=0)
-            energy_cols = st.multiselect("能量数据列 (Energy Paths)", cols, default=cols[1:] if len(cols) > 1 else [])
+            numeric_paths = [c for c in cols[1:] if pd.api.types.is_numeric_dtype(df[c])]
+            energy_cols = st.multiselect("能量数据列 (Energy Paths)", cols, default=numeric_paths)
+            
+            show_span = st.checkbox("能量跨度分析 (Energetic Span)", value=False,
+                                    help="按步骤名识别过渡态 (TS / ‡ / 过渡态)，计算每条路径的 TDTS、TDI、δE 与 TOF，并在图中标出")
+            if show_span:
+                c1, c2 = st.columns(2)
+                span_temperature = c1.number_input("温度 (K)", min_value=1.0, value=298.15, step=10.0)
+                span_unit = c2.selectbox("能量单位", ["kcal/mol", "kJ/mol", "eV"], index=0)
             
             if not energy_cols:
                 st.warning("请至少选择一列作为能量数据")
             
             if st.button("生成能级图"):
                 if energy_cols:
-                    with st.spinner("正在绘制..."):
-                        try:
-                            # 重组数据
-                            plot_df = df[[step_col] + energy_cols].copy()
-                            fig = pf.draw_energy_profile(plot_df, font_size=global_font_size)
-                            st.pyplot(fig)
-
-                            buf = BytesIO()
-                            fig.savefig(buf, format="png", dpi=300, bbox_inches='tight')
-                            st.download_button(
-                                label="下载图表 (PNG)",
-                                data=buf.getvalue(),
-                                file_name=f"energy_profile_{selected_sheet}.png",
-                                mime="image/png"
-                            )
-                        except Exception as e:
-                            st.error(f"绘图失败: {e}")
-                            st.exception(e)
+                    # 重组数据
+                    plot_df = df[[step_col] + energy_cols].copy()
+                    span_params = dict(temperature=span_temperature, unit=span_unit) if show_span else None
+                    submit_job("energy", energy_job, plot_df, span_params, global_font_size, export_formats,
+                               name=f"energy_profile_{selected_sheet}")
+            show_job("energy", display=show_energy)
 
         # ==========================================
         # 模式 8: 反应动力学曲线
@@ -307,33 +554,29 @@ if uploaded_file is not None:
             time_col = st.selectbox("时间列 (Time)", cols, index=0)
             yield_cols = st.multiselect("产率数据列 (Yields)", cols, default=cols[1:] if len(cols) > 1 else [])
             
+            with st.expander("缩放与降采样", expanded=False):
+                zoom = st.checkbox("只显示指定时间范围 (全分辨率)", value=False)
+                t_values = pd.to_numeric(df[time_col], errors="coerce")
+                z1, z2 = st.columns(2)
+                t_min = z1.number_input("起始时间", value=float(t_values.min()) if t_values.notna().any() else 0.0, disabled=not zoom)
+                t_max = z2.number_input("结束时间", value=float(t_values.max()) if t_values.notna().any() else 1.0, disabled=not zoom)
+                ds_label = st.radio("降采样方式 (点数超过像素时)", ["最小/最大包络", "LTTB"], horizontal=True)
+                kinetics_ds = "minmax" if ds_label == "最小/最大包络" else "lttb"
+            
             if not yield_cols:
                 st.warning("请至少选择一列作为产率数据")
                 
             if st.button("生成动力学曲线"):
                 if yield_cols:
-                    with st.spinner("正在绘制..."):
-                        try:
-                            plot_df = df[[time_col] + yield_cols].copy()
-                            fig = pf.draw_kinetics(plot_df, font_size=global_font_size)
-                            st.pyplot(fig)
-
-                            buf = BytesIO()
-                            fig.savefig(buf, format="png", dpi=300, bbox_inches='tight')
-                            st.download_button(
-                                label="下载图表 (PNG)",
-                                data=buf.getvalue(),
-                                file_name=f"kinetics_{selected_sheet}.png",
-                                mime="image/png"
-                            )
-                        except Exception as e:
-                            st.error(f"绘图失败: {e}")
-                            st.exception(e)
+                    plot_df = df[[time_col] + yield_cols].copy()
+                    start_render("kinetics", pf.draw_kinetics, plot_df, downsample=kinetics_ds,
+                                 xlim=(t_min, t_max) if zoom else None, file_stem=f"kinetics_{selected_sheet}")
+            show_job("kinetics")
 
     except Exception as e:
         st.error(f"无法读取文件: {e}")
 else:
-    st.info("请在左侧上传 Excel 文件以开始。")
+    st.info("请在左侧上传数据文件 (Excel / CSV / Parquet / Feather) 以开始。")
     
     # 显示示例说明
     st.markdown("### 数据格式说明")
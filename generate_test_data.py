@@ -1,3 +1,5 @@
+import argparse
+import os
 import pandas as pd
 import numpy as np
 
@@ -148,12 +150,161 @@ def create_kinetics_data():
         
     return df
 
+# ==========================================
+# 大规模数据生成 (压测用)
+# ==========================================
+# 每个生成器按块产出 DataFrame，块之间互不依赖，内存占用只与 chunk_size 有关。
+SHEET_NAMES = ['除草&广谱测试', '除菌测试', '热图测试', '反应条件筛选', '反应能级数据', '反应动力学']
+EXCEL_MAX_ROWS = 1048575  # 单个工作表最多数据行数 (不含表头)
+
+def _chunks(n_rows, chunk_size):
+    for start in range(0, n_rows, chunk_size):
+        yield start, min(start + chunk_size, n_rows)
+
+def iter_herbicidal_data(n_rows, rng, chunk_size):
+    crops = ['稗草', '马唐', '狗尾草', '反枝苋', '苘麻', '小麦', '玉米']
+    for start, stop in _chunks(n_rows, chunk_size):
+        df = pd.DataFrame(rng.integers(0, 101, size=(stop - start, len(crops))), columns=crops)
+        df.insert(0, '生测编号', [f"化合物-{i+1:07d}" for i in range(start, stop)])
+        yield df
+
+def iter_fungicidal_data(n_rows, rng, chunk_size):
+    diseases = ['灰霉', '赤霉', '白粉', '锈病']
+    for start, stop in _chunks(n_rows, chunk_size):
+        df = pd.DataFrame(rng.integers(0, 101, size=(stop - start, len(diseases))), columns=diseases)
+        df.insert(0, '生测编号', [f"B-{i+1:07d}" for i in range(start, stop)])
+        yield df
+
+def iter_heatmap_data(n_rows, rng, chunk_size):
+    cols = ['100 ppm', '50 ppm', '25 ppm', '12.5 ppm', '6.25 ppm', '3.125 ppm']
+    romans = ['Ⅰ', 'Ⅱ', 'Ⅲ', 'Ⅳ', 'Ⅴ', 'Ⅵ', 'Ⅶ', 'Ⅷ', 'Ⅸ', 'Ⅹ']
+    n_compounds = max(n_rows - 2, 0)
+    for start, stop in _chunks(n_compounds, chunk_size):
+        idx = np.arange(start, stop)
+        # 模拟剂量效应：浓度越低活性越低
+        base = rng.integers(60, 101, size=(len(idx), 1))
+        drops = rng.integers(10, 20, size=(len(idx), len(cols))) * np.arange(len(cols))
+        df = pd.DataFrame(np.clip(base - drops, 0, 100), columns=cols)
+        # 每个罗马数字 100 批、每批 1000 个化合物；超过 100 万个时其余批次都归入 Ⅹ，批号继续递增，编号不重复
+        batch = idx // 1000
+        series = np.minimum(batch // 100, len(romans) - 1)
+        df.insert(0, '生测编号', [f"{romans[r]} {b - 100 * r + 1}-{i % 1000 + 1:03d}"
+                                for r, b, i in zip(series, batch, idx)])
+        yield df
+    controls = pd.DataFrame([[0] * len(cols), [100, 100, 100, 95, 80, 60]], columns=cols)
+    controls.insert(0, '生测编号', ['CK', '阿维菌素'])
+    yield controls.iloc[:min(n_rows, 2)]
+
+def iter_optimization_data(n_rows, rng, chunk_size):
+    solvents = np.array(['THF', 'DCM', 'Toluene', 'MeCN', 'DMF', 'DMSO', 'EtOAc', 'MeOH'])
+    n_cat = max(5, int(np.sqrt(n_rows / len(solvents))))
+    cat_effect = rng.normal(0, 15, size=n_cat)
+    solv_effect = rng.normal(0, 10, size=len(solvents))
+    for start, stop in _chunks(n_rows, chunk_size):
+        n = stop - start
+        cat = rng.integers(0, n_cat, size=n)
+        solv = rng.integers(0, len(solvents), size=n)
+        yields = np.clip(50 + cat_effect[cat] + solv_effect[solv] + rng.normal(0, 5, size=n), 0, 99).round(1)
+        ee = np.clip(40 + cat_effect[cat] * 1.5 + rng.normal(0, 8, size=n), 0, 99).round(1)
+        yield pd.DataFrame({
+            'Catalyst': [f"Cat. {c+1}" for c in cat],
+            'Solvent': solvents[solv],
+            'Yield': yields,
+            'ee': ee,
+        })
+
+def iter_energy_profile_data(n_rows, rng, chunk_size):
+    paths = ['Uncatalyzed_Energy', 'Catalyzed_Energy', 'Ligand_A_Energy', 'Ligand_B_Energy']
+    for start, stop in _chunks(n_rows, chunk_size):
+        idx = np.arange(start, stop)
+        # 过渡态与中间体交替出现
+        is_ts = idx % 2 == 1
+        steps = np.where(idx == 0, 'Reactant',
+                         np.where(is_ts, ['TS' + str(i // 2 + 1) for i in idx], ['INT' + str(i // 2) for i in idx]))
+        base = np.where(is_ts, 20.0, 5.0)[:, None] - np.arange(len(paths)) * 3.0
+        energies = np.round(base + rng.normal(0, 2, size=(len(idx), len(paths))), 1)
+        energies[idx == 0] = 0.0
+        df = pd.DataFrame(energies, columns=paths)
+        df.insert(0, 'Step', steps)
+        yield df
+
+def iter_kinetics_data(n_rows, rng, chunk_size):
+    conditions = {'Condition A (Standard)': (0.02, 95), 'Condition B (No Catalyst)': (0.002, 20),
+                  'Condition C (New Solvent)': (0.05, 98), 'Condition D (Low Temp)': (0.008, 85)}
+    t_max = 480.0
+    for start, stop in _chunks(n_rows, chunk_size):
+        t = np.arange(start, stop) * (t_max / max(n_rows - 1, 1))
+        df = pd.DataFrame({'Time (min)': t})
+        for name, (k, max_yield) in conditions.items():
+            df[name] = np.clip(max_yield * (1 - np.exp(-k * t)) + rng.normal(0, 1, len(t)), 0, 100)
+        yield df
+
+SHEET_GENERATORS = dict(zip(SHEET_NAMES, [iter_herbicidal_data, iter_fungicidal_data, iter_heatmap_data,
+                                          iter_optimization_data, iter_energy_profile_data, iter_kinetics_data]))
+
+def _iter_sheets(n_rows, seed, chunk_size):
+    for k, (name, gen) in enumerate(SHEET_GENERATORS.items()):
+        # 每个工作表使用独立的随机流，结果与生成顺序无关
+        rng = np.random.default_rng([seed, k])
+        yield name, gen(n_rows, rng, chunk_size)
+
+def write_large_xlsx(path, n_rows, seed=42, chunk_size=50000):
+    """使用 openpyxl 只写模式逐行写出，超过 Excel 行数上限时拆分为多个工作表"""
+    from openpyxl import Workbook
+    wb = Workbook(write_only=True)
+    for name, chunks in _iter_sheets(n_rows, seed, chunk_size):
+        ws, part, rows_in_sheet, header = None, 0, EXCEL_MAX_ROWS, None
+        for chunk in chunks:
+            header = list(chunk.columns)
+            for row in chunk.itertuples(index=False, name=None):
+                if rows_in_sheet >= EXCEL_MAX_ROWS:
+                    part += 1
+                    ws = wb.create_sheet(name if part == 1 else f"{name}_{part}")
+                    ws.append(header)
+                    rows_in_sheet = 0
+                ws.append(row)
+                rows_in_sheet += 1
+    wb.save(path)
+
+def write_large_csv(out_dir, n_rows, seed=42, chunk_size=50000):
+    """每个工作表写为一个 CSV 文件"""
+    os.makedirs(out_dir, exist_ok=True)
+    for name, chunks in _iter_sheets(n_rows, seed, chunk_size):
+        path = os.path.join(out_dir, f"{name}.csv")
+        for i, chunk in enumerate(chunks):
+            chunk.to_csv(path, mode='w' if i == 0 else 'a', header=i == 0, index=False, encoding='utf-8')
+
+def write_large_parquet(out_dir, n_rows, seed=42, chunk_size=50000):
+    """每个工作表写为一个 Parquet 文件，每块一个 row group"""
+    import pyarrow as pa
+    import pyarrow.parquet as pq
+    os.makedirs(out_dir, exist_ok=True)
+    for name, chunks in _iter_sheets(n_rows, seed, chunk_size):
+        writer = None
+        try:
+            for chunk in chunks:
+                table = pa.Table.from_pandas(chunk, preserve_index=False)
+                if writer is None:
+                    writer = pq.ParquetWriter(os.path.join(out_dir, f"{name}.parquet"), table.schema)
+                writer.write_table(table.cast(writer.schema))
+        finally:
+            if writer is not None:
+                writer.close()
+
 # ==========================================
 # 保存到 Excel
 # ==========================================
-if __name__ == "__main__":
-    file_name = "test_data.xlsx"
-    
+def parse_args():
+    parser = argparse.ArgumentParser(description="生成测试数据。不带参数时生成小型示例模板 test_data.xlsx")
+    parser.add_argument('--rows', type=int, default=None, help="每个工作表的数据行数 (指定后进入大规模生成模式)")
+    parser.add_argument('--seed', type=int, default=42, help="随机种子")
+    parser.add_argument('--format', nargs='+', choices=['xlsx', 'csv', 'parquet'], default=['xlsx'],
+                        help="输出格式，可同时指定多个")
+    parser.add_argument('--out', default='load_test_data', help="输出文件名前缀 / 目录")
+    parser.add_argument('--chunk-size', type=int, default=50000, help="每块生成的行数，决定内存占用")
+    return parser.parse_args()
+
+def write_template(file_name="test_data.xlsx"):
     with pd.ExcelWriter(file_name, engine='openpyxl') as writer:
         df1 = create_herbicidal_data()
         df1.to_excel(writer, sheet_name='除草&广谱测试', index=False)
@@ -174,4 +325,19 @@ if __name__ == "__main__":
         df6.to_excel(writer, sheet_name='反应动力学', index=False)
         
     print(f"成功生成测试文件: {file_name}")
-    print("包含工作表: '除草&广谱测试', '除菌测试', '热图测试', '反应条件筛选', '反应能级数据', '反应动力学'")
\ No newline at end of file
+    print("包含工作表: '除草&广谱测试', '除菌测试', '热图测试', '反应条件筛选', '反应能级数据', '反应动力学'")
+
+if __name__ == "__main__":
+    args = parse_args()
+    if args.rows is None:
+        write_template()
+    else:
+        if 'xlsx' in args.format:
+            write_large_xlsx(f"{args.out}.xlsx", args.rows, seed=args.seed, chunk_size=args.chunk_size)
+            print(f"成功生成: {args.out}.xlsx")
+        if 'csv' in args.format:
+            write_large_csv(os.path.join(args.out, 'csv'), args.rows, seed=args.seed, chunk_size=args.chunk_size)
+            print(f"成功生成: {os.path.join(args.out, 'csv')}")
+        if 'parquet' in args.format:
+            write_large_parquet(os.path.join(args.out, 'parquet'), args.rows, seed=args.seed, chunk_size=args.chunk_size)
+            print(f"成功生成: {os.path.join(args.out, 'parquet')}")
@@ -0,0 +1,49 @@
+import threading
+from collections import OrderedDict
+import pandas as pd
+
+# ==============================
+# 通用缓存工具
+# ==============================
+# ingest (解析缓存、内容指纹) 与 plots (渲染缓存) 共用，不依赖任何一方。
+
+class LRUCache:
+    """按总字节数限制大小的线程安全 LRU 缓存"""
+
+    def __init__(self, max_bytes, sizeof=len):
+        self.max_bytes = max_bytes
+        self._sizeof = sizeof
+        self._items = OrderedDict()
+        self._bytes = 0
+        self._lock = threading.Lock()
+
+    def get(self, key):
+        with self._lock:
+            if key not in self._items:
+                return None
+            self._items.move_to_end(key)
+            return self._items[key][0]
+
+    def put(self, key, value):
+        size = self._sizeof(value)
+        if size > self.max_bytes:
+            return
+        with self._lock:
+            if key in self._items:
+                self._bytes -= self._items.pop(key)[1]
+            self._items[key] = (value, size)
+            self._bytes += size
+            while self._bytes > self.max_bytes:
+                self._bytes -= self._items.popitem(last=False)[1][1]
+
+    def clear(self):
+        with self._lock:
+            self._items.clear()
+            self._bytes = 0
+
+    def __len__(self):
+        return len(self._items)
+
+def row_hashes(obj, index=True):
+    """每行一个 uint64 哈希 (pd.util.hash_pandas_object)"""
+    return pd.util.hash_pandas_object(obj, index=index).to_numpy()
@@ -0,0 +1,6 @@
+from .qchem import parse_qchem_output, parse_qchem_outputs, build_energy_table
+from .shared import SharedSheet, save_shared_sheet, load_shared_sheet
+from .tabular import TableSource, open_table_source, detect_format, UPLOAD_TYPES
+from .plate import parse_plate_export, normalize_to_controls, aggregate_replicates, load_plate_data
+from .incremental import (IncrementalSource, open_incremental, sheet_signatures, sheet_fingerprint,
+                          diff_fingerprints, compare_signatures)
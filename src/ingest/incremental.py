@@ -0,0 +1,186 @@
+import io
+import os
+import hashlib
+import zipfile
+import xml.etree.ElementTree as ET
+from cacheutil import LRUCache, row_hashes
+from .tabular import open_table_source, detect_format, _is_xlsx, _zip_members, _group_members
+
+# ==============================
+# 重复上传的增量读取
+# ==============================
+# 同一工作簿改几个单元格后重新上传时，只重新解析发生变化的工作表：
+#   1. 工作表签名：xlsx 取 ZIP 目录中该表 XML 的 CRC (以及共享字符串、样式的 CRC)，
+#      ZIP 数据包取各成员的 CRC，不需要解压即可判断哪些表变了；其他文件取整个文件的哈希。
+#   2. 解析结果按签名缓存，签名未变的表直接返回缓存的 DataFrame。
+#   3. 每张解析过的表记录内容指纹 (整表哈希 + 每 BLOCK_ROWS 行一个哈希)，用于与上一次上传比较。
+# 图表渲染结果另按数据内容缓存 (plots.cache)，签名变化但内容未变的表也不会重新绘图。
+# 局限：xlsx 的文本单元格存放在所有工作表共用的 sharedStrings.xml 中，任何一张表新增或修改文本
+# 都会改变全部工作表的签名，这些表在下次读取时都要重新解析 (不解析就无法判断字符串索引是否仍然有效)。
+# 此时比较变化以内容指纹为准 (compare_signatures 传入指纹)，内容未变的表仍报告为未变化、图表仍取缓存。
+
+BLOCK_ROWS = 1024
+FRAME_CACHE_BYTES = 512 * 1024 * 1024
+
+_NS_MAIN = '{http://schemas.openxmlformats.org/spreadsheetml/2006/main}'
+_NS_REL = '{http://schemas.openxmlformats.org/officeDocument/2006/relationships}'
+# 所有工作表共用、会影响解析结果的部件
+_XLSX_SHARED_PARTS = ('xl/sharedStrings.xml', 'xl/styles.xml')
+
+_frame_cache = LRUCache(FRAME_CACHE_BYTES, sizeof=lambda df: int(df.memory_usage(index=True).sum()))
+_fingerprint_cache = LRUCache(64 * 1024 * 1024, sizeof=lambda fp: 64 + 40 * len(fp['blocks']))
+
+def _digest(*parts):
+    return hashlib.sha1(repr(parts).encode('utf-8')).hexdigest()
+
+def _xlsx_signatures(zf):
+    """xlsx 各工作表的签名：表 XML 的 CRC + 共享部件的 CRC + 日期基准"""
+    crc = {i.filename: i.CRC for i in zf.infolist()}
+    workbook = ET.fromstring(zf.read('xl/workbook.xml'))
+    rels = ET.fromstring(zf.read('xl/_rels/workbook.xml.rels'))
+    targets = {r.get('Id'): r.get('Target') for r in rels}
+    pr = workbook.find(f'{_NS_MAIN}workbookPr')
+    common = [crc.get(p) for p in _XLSX_SHARED_PARTS] + [pr.get('date1904') if pr is not None else None]
+
+    signatures = {}
+    for sheet in workbook.iter(f'{_NS_MAIN}sheet'):
+        target = targets.get(sheet.get(f'{_NS_REL}id'), '')
+        path = target.lstrip('/') if target.startswith('/') else 'xl/' + target
+        if path not in crc:
+            return None
+        signatures[sheet.get('name')] = _digest(crc[path], *common)
+    return signatures
+
+def sheet_signatures(data, name=''):
+    """
+    不解析数据，计算各工作表的签名
+    :param data: 文件的二进制内容
+    :return: {工作表名: 签名}；无法按表区分时 (如 .xls、单个 CSV) 返回 None
+    """
+    if detect_format(name, data[:8]) not in ('excel', 'zip') or not data.startswith(b'PK\x03\x04'):
+        return None
+    try:
+        with zipfile.ZipFile(io.BytesIO(data)) as zf:
+            if _is_xlsx(data):
+                return _xlsx_signatures(zf)
+            members = {i.filename: i for i in _zip_members(zf)}
+            groups = _group_members(members)
+            return {table: _digest(*[(m, members[m].CRC) for m, _ in ms]) for table, ms in groups.items()}
+    except (zipfile.BadZipFile, KeyError, ET.ParseError):
+        return None
+
+def sheet_fingerprint(df, block_rows=BLOCK_ROWS):
+    """
+    工作表内容指纹
+    :return: {'digest': 整表哈希, 'columns': 列名列表, 'n_rows': 行数, 'blocks': 每 block_rows 行一个哈希}
+    """
+    h = row_hashes(df, index=False)
+    columns = [(str(c), str(t)) for c, t in df.dtypes.items()]
+    blocks = [hashlib.sha1(h[i:i + block_rows].tobytes()).hexdigest() for i in range(0, len(h), block_rows)]
+    return {'digest': _digest(columns, blocks), 'columns': [c for c, _ in columns], 'n_rows': len(df),
+            'blocks': blocks, 'block_rows': block_rows}
+
+def diff_fingerprints(old, new):
+    """
+    比较同一工作表的两个版本
+    :return: {'unchanged': bool, 'columns_changed': bool, 'changed_rows': [(起始行, 结束行), ...] (左闭右开)}
+    行块按位置比较：中间插入或删除行时，其后的块都会记为变化；两个指纹的 block_rows 需相同
+    """
+    if old['digest'] == new['digest']:
+        return {'unchanged': True, 'columns_changed': False, 'changed_rows': []}
+    step = new['block_rows']
+    n_blocks = max(len(old['blocks']), len(new['blocks']))
+    ranges = []
+    for k in range(n_blocks):
+        a = old['blocks'][k] if k < len(old['blocks']) else None
+        b = new['blocks'][k] if k < len(new['blocks']) else None
+        if a == b:
+            continue
+        start, stop = k * step, min((k + 1) * step, max(old['n_rows'], new['n_rows']))
+        if ranges and ranges[-1][1] == start:
+            ranges[-1] = (ranges[-1][0], stop)
+        else:
+            ranges.append((start, stop))
+    return {'unchanged': False, 'columns_changed': old['columns'] != new['columns'], 'changed_rows': ranges}
+
+def compare_signatures(old, new, old_fingerprints=None, new_fingerprints=None):
+    """
+    按签名比较两次上传的工作表
+    :param old_fingerprints / new_fingerprints: 可选，两次上传已记录的内容指纹 {工作表名: 指纹}；
+           签名不同但两边都有指纹且内容相同的表 (例如只有共享字符串表变化) 归为未变化
+    :return: {'unchanged': [...], 'changed': [...], 'added': [...], 'removed': [...]}
+    """
+    old_fp, new_fp = old_fingerprints or {}, new_fingerprints or {}
+
+    def same(s):
+        if old[s] == new[s]:
+            return True
+        return s in old_fp and s in new_fp and old_fp[s]['digest'] == new_fp[s]['digest']
+
+    return {
+        'unchanged': [s for s in new if s in old and same(s)],
+        'changed': [s for s in new if s in old and not same(s)],
+        'added': [s for s in new if s not in old],
+        'removed': [s for s in old if s not in new],
+    }
+
+class IncrementalSource:
+    """
+    包装 open_table_source 的结果，接口相同 (sheet_names / parse)
+    parse 按工作表签名缓存，并记录每张表的内容指纹
+    """
+
+    def __init__(self, source, data, name=''):
+        self._source = source
+        self.version = hashlib.sha1(data).hexdigest() if data is not None else None
+        sheet_sigs = sheet_signatures(data, name) if data is not None else None
+        self.signatures = {s: (sheet_sigs or {}).get(s) or (self.version and _digest(self.version, s))
+                           for s in source.sheet_names}
+        self.fingerprints = {}
+
+    @property
+    def sheet_names(self):
+        return self._source.sheet_names
+
+    def parse(self, sheet_name=0):
+        """读取工作表，签名未变时返回缓存结果的副本"""
+        if isinstance(sheet_name, int):
+            sheet_name = self.sheet_names[sheet_name]
+        key = self.signatures.get(sheet_name)
+        df = _frame_cache.get(key) if key else None
+        if df is None:
+            df = self._source.parse(sheet_name)
+            if key:
+                _frame_cache.put(key, df)
+        if sheet_name not in self.fingerprints:
+            self.fingerprints[sheet_name] = self.fingerprint(sheet_name, df)
+        return df.copy()
+
+    def fingerprint(self, sheet_name, df=None):
+        """工作表内容指纹 (按签名缓存)"""
+        key = self.signatures.get(sheet_name)
+        fp = _fingerprint_cache.get(key) if key else None
+        if fp is None:
+            fp = sheet_fingerprint(df if df is not None else self.parse(sheet_name))
+            if key:
+                _fingerprint_cache.put(key, fp)
+        return fp
+
+def open_incremental(source, name=None):
+    """
+    打开数据文件，重复上传同一工作簿时只重新解析发生变化的工作表
+    :param source: 同 open_table_source
+    :return: IncrementalSource
+    """
+    if isinstance(source, (str, os.PathLike)):
+        path = os.fspath(source)
+        name = name or path
+        data = None
+        if not os.path.isdir(path):
+            with open(path, 'rb') as f:
+                data = f.read()
+    else:
+        name = name or getattr(source, 'name', '')
+        data = source.getvalue() if hasattr(source, 'getvalue') else source.read()
+        source = io.BytesIO(data)
+    return IncrementalSource(open_table_source(source, name=name), data, name)
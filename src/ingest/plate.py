@@ -0,0 +1,253 @@
+import io
+import os
+import re
+import csv
+import numpy as np
+import pandas as pd
+from wells import sort_key, parse_wells, PLATE_FORMATS
+from .tabular import detect_format
+
+# ==============================
+# 酶标仪原始数据 (板布局) 导入
+# ==============================
+# 导出文件中每块板是一个网格：表头行为列号 1..12 / 1..24 / 1..48，其下各行以行字母 A.. 开头。
+# 网格按孔位与板图 (plate map: 孔位 -> 生测编号 / 浓度) 关联后，按板以 CK 与对照药剂归一化，
+# 再按 (生测编号, 浓度) 聚合重复孔，输出绘图可直接使用的宽表。
+
+REFERENCE_KEY = 998     # sort_key 中对照药剂 (阿维菌素) 的排序值
+CK_KEY = 999            # sort_key 中空白对照 (CK / 对照) 的排序值
+
+_PLATE_LABEL = re.compile(r'(?:plate|板号?)\s*[:：#]?\s*(\S+)', re.IGNORECASE)
+_ROWS_BY_COLS = {cols: rows for rows, cols in PLATE_FORMATS.values()}
+
+def _read_grids(source, name=None):
+    """读取导出文件为若干二维网格 (object 数组)：Excel 每个工作表一个网格，文本文件一个网格"""
+    if isinstance(source, (str, os.PathLike)):
+        name = name or os.fspath(source)
+        with open(source, 'rb') as f:
+            data = f.read()
+    else:
+        name = name or getattr(source, 'name', '')
+        data = source.getvalue() if hasattr(source, 'getvalue') else source.read()
+
+    if detect_format(name, data[:8]) in ('excel', 'zip'):
+        sheets = pd.read_excel(io.BytesIO(data), sheet_name=None, header=None)
+        return [(sheet, df.to_numpy(dtype=object)) for sheet, df in sheets.items()]
+
+    text = data.decode('utf-8-sig', errors='replace')
+    head = text[:4096]
+    delimiter = max(',\t;', key=head.count)
+    rows = list(csv.reader(io.StringIO(text), delimiter=delimiter))
+    width = max((len(r) for r in rows), default=0)
+    grid = np.full((len(rows), width), None, dtype=object)
+    for i, r in enumerate(rows):
+        grid[i, :len(r)] = [c if c.strip() else None for c in r]
+    return [(os.path.splitext(os.path.basename(str(name)))[0] or 'plate', grid)]
+
+def _cell_text(cell):
+    """单元格转为去除首尾空白的文本；Excel 空单元格读入为 NaN，与 None 一样视为空字符串"""
+    return '' if cell is None or pd.isna(cell) else str(cell).strip()
+
+def _is_text(cell):
+    return isinstance(cell, str) and bool(cell.strip()) and pd.isna(pd.to_numeric(cell, errors='coerce'))
+
+def _plate_label(grid, r, c):
+    """
+    板号：依次取表头行左上角的文字、表头上方三行内形如 'Plate: P1' 的文字、
+    紧邻表头上方且只有一个单元格的标题行
+    """
+    corner = grid[r, c - 1] if c > 0 else None
+    if _is_text(corner):
+        return corner.strip()
+    for i in range(r - 1, max(r - 4, -1), -1):
+        for cell in grid[i]:
+            if isinstance(cell, str):
+                m = _PLATE_LABEL.search(cell)
+                if m:
+                    return m.group(1)
+    if r > 0:
+        above = [cell for cell in grid[r - 1] if _cell_text(cell)]
+        if len(above) == 1 and _is_text(above[0]):
+            return above[0].strip()
+    return None
+
+def _find_plates(grid):
+    """在网格中定位所有板：返回 [(板号, 值矩阵)]"""
+    num = pd.DataFrame(grid).apply(pd.to_numeric, errors='coerce').to_numpy(dtype=float)
+    n_rows, n_cols = num.shape
+    plates = []
+    for r, c in np.argwhere(num == 1):
+        for width in sorted(_ROWS_BY_COLS, reverse=True):
+            if c + width > n_cols or not np.array_equal(num[r, c:c + width], np.arange(1, width + 1)):
+                continue
+            height = _ROWS_BY_COLS[width]
+            if r + 1 + height > n_rows:
+                continue
+            # 若有行字母列，需与 A.. 对应
+            if c > 0:
+                letters = [_cell_text(x).upper() for x in grid[r + 1:r + 1 + height, c - 1]]
+                expected = [chr(65 + i) if i < 26 else 'A' + chr(65 + i - 26) for i in range(height)]
+                if any(letters) and letters != expected:
+                    continue
+            plates.append((_plate_label(grid, r, c), num[r + 1:r + 1 + height, c:c + width]))
+            break
+    return plates
+
+def parse_plate_export(source, name=None):
+    """
+    解析酶标仪板布局导出文件 (xlsx / csv / tsv / txt)，支持一个文件中包含多块板
+    :return: 每孔一行的 DataFrame，列为 [Plate, Well, Row, Col, Value]
+    """
+    blocks = []
+    for sheet, grid in _read_grids(source, name):
+        for k, (label, values) in enumerate(_find_plates(grid)):
+            blocks.append((label or f"{sheet}-{k + 1}", values))
+    if not blocks:
+        raise ValueError("未在文件中找到 96 / 384 / 1536 孔板的数据网格")
+
+    # 同规格的板一次性展开
+    frames = []
+    for shape in sorted({v.shape for _, v in blocks}):
+        labels = [lab for lab, v in blocks if v.shape == shape]
+        stack = np.stack([v for _, v in blocks if v.shape == shape])
+        n_plates, h, w = stack.shape
+        rows = np.tile(np.repeat(np.arange(h), w), n_plates)
+        cols = np.tile(np.tile(np.arange(w), h), n_plates)
+        letters = np.array([chr(65 + i) if i < 26 else 'A' + chr(65 + i - 26) for i in range(h)], dtype=object)
+        frames.append(pd.DataFrame({
+            'Plate': np.repeat(np.array(labels, dtype=object), h * w),
+            'Well': letters[rows] + (cols + 1).astype(str).astype(object),
+            'Row': rows,
+            'Col': cols,
+            'Value': stack.reshape(-1),
+        }))
+    return pd.concat(frames, ignore_index=True)
+
+def _find_col(df, candidates):
+    lowered = {str(c).strip().lower(): c for c in df.columns}
+    for cand in candidates:
+        if cand.lower() in lowered:
+            return lowered[cand.lower()]
+    return None
+
+def _normalize_map(plate_map, id_col, conc_col):
+    """统一板图列名：Plate (可选) / Row / Col / 生测编号 / 浓度"""
+    well_col = _find_col(plate_map, ['Well', '孔位', '孔'])
+    if well_col is None:
+        raise ValueError("板图缺少孔位列 (Well / 孔位)")
+    if id_col not in plate_map.columns:
+        raise ValueError(f"板图缺少 '{id_col}' 列")
+    if conc_col not in plate_map.columns:
+        raise ValueError(f"板图缺少 '{conc_col}' 列")
+    plate_col = _find_col(plate_map, ['Plate', '板号', '板'])
+
+    pm = plate_map.dropna(subset=[well_col, id_col])
+    rows, cols = parse_wells(pm[well_col].values)
+    out = pd.DataFrame({'Row': rows, 'Col': cols, id_col: pm[id_col].map(_cell_text).values,
+                        conc_col: pm[conc_col].values})
+    if plate_col is not None:
+        out.insert(0, 'Plate', pm[plate_col].map(_cell_text).values)
+    return out
+
+def normalize_to_controls(tidy, id_col='生测编号', method='auto'):
+    """
+    按板以对照归一化，新增列 Activity (%)
+    - 'ck_ref': (x - CK) / (对照药剂 - CK) × 100，CK 为 0，对照药剂为 100
+    - 'ck':     (CK - x) / CK × 100，相对空白对照的抑制率
+    - 'auto':   板上有对照药剂时用 'ck_ref'，否则用 'ck'
+    CK / 对照药剂按 wells.sort_key 识别 (与热图排序规则一致)
+    """
+    codes, uniques = pd.factorize(tidy[id_col])
+    kind = np.array([sort_key(u)[0] for u in uniques])[codes]
+    value = tidy['Value'].to_numpy(dtype=float)
+
+    plate_codes, _ = pd.factorize(tidy['Plate'])
+    n_plates = plate_codes.max() + 1 if len(plate_codes) else 0
+
+    def plate_mean(mask):
+        sums = np.bincount(plate_codes[mask], weights=value[mask], minlength=n_plates)
+        counts = np.bincount(plate_codes[mask], minlength=n_plates)
+        with np.errstate(invalid='ignore', divide='ignore'):
+            return (sums / counts)[plate_codes]
+
+    valid = ~np.isnan(value)
+    ck = plate_mean(valid & (kind == CK_KEY))
+    ref = plate_mean(valid & (kind == REFERENCE_KEY))
+    if np.isnan(ck).all():
+        raise ValueError("板上未找到 CK / 对照孔，无法归一化")
+
+    with np.errstate(invalid='ignore', divide='ignore'):
+        two_point = (value - ck) / (ref - ck) * 100
+        one_point = (ck - value) / ck * 100
+    if method == 'ck_ref':
+        activity = two_point
+    elif method == 'ck':
+        activity = one_point
+    elif method == 'auto':
+        activity = np.where(np.isnan(ref), one_point, two_point)
+    else:
+        raise ValueError(f"不支持的归一化方式: {method}")
+
+    tidy = tidy.copy()
+    tidy['Activity'] = activity
+    return tidy
+
+def aggregate_replicates(tidy, id_col='生测编号', conc_col='浓度', value_col='Activity'):
+    """按 (生测编号, 浓度) 聚合重复孔：均值 / 标准差 / 重复数"""
+    # CK 等对照孔可能没有浓度，保留为单独一组
+    grouped = tidy.groupby([id_col, conc_col], sort=False, dropna=False)[value_col]
+    out = grouped.agg(['mean', 'std', 'count']).reset_index()
+    out.columns = [id_col, conc_col, 'mean', 'sd', 'n']
+    return out
+
+def to_wide(summary, id_col='生测编号', conc_col='浓度', unit='ppm'):
+    """
+    整理为 生测编号 × 浓度 宽表 (draw_heatmap / draw_polar_bar 的输入格式)
+    数值浓度按从高到低排列并加单位，非数值 (例如靶标名) 保持出现顺序；
+    没有浓度的对照孔 (例如 CK) 的均值填入该行所有列
+    """
+    no_conc = summary[summary[conc_col].isna()]
+    summary = summary[summary[conc_col].notna()].copy()
+    conc = pd.to_numeric(summary[conc_col], errors='coerce')
+    if conc.notna().all():
+        order = sorted(conc.unique(), reverse=True)
+        labels = {c: f"{c:g} {unit}".strip() for c in order}
+        summary[conc_col] = conc.map(labels)
+        columns = [labels[c] for c in order]
+    else:
+        summary[conc_col] = summary[conc_col].astype(str)
+        columns = list(pd.unique(summary[conc_col]))
+
+    wide = summary.pivot(index=id_col, columns=conc_col, values='mean').reindex(columns=columns)
+    if not no_conc.empty:
+        fill = no_conc.groupby(id_col)['mean'].mean()
+        wide = wide.reindex(wide.index.union(fill.index, sort=False))
+        filled = pd.DataFrame(np.repeat(fill.values[:, None], len(columns), axis=1), index=fill.index, columns=columns)
+        wide = wide.fillna(filled)
+    wide = wide.reindex(sorted(wide.index, key=sort_key))
+    wide.columns.name = None
+    return wide.reset_index()
+
+def load_plate_data(export_source, plate_map, id_col='生测编号', conc_col='浓度', method='auto', unit='ppm'):
+    """
+    完整流程：解析导出文件 -> 关联板图 -> 按板归一化 -> 聚合重复孔
+    :param export_source: 酶标仪导出文件 (路径或上传文件对象)
+    :param plate_map: 板图 DataFrame，列为 [Plate (可选), Well, 生测编号, 浓度]；无 Plate 列时所有板共用
+    :return: (tidy, summary, wide)
+        tidy    每孔一行，含原始值与归一化活性 (%)
+        summary 每个 (生测编号, 浓度) 一行：mean / sd / n
+        wide    生测编号 × 浓度 的平均活性宽表
+    """
+    readings = parse_plate_export(export_source)
+    pm = _normalize_map(plate_map, id_col, conc_col)
+    keys = ['Plate', 'Row', 'Col'] if 'Plate' in pm.columns else ['Row', 'Col']
+    if 'Plate' in pm.columns:
+        readings['Plate'] = readings['Plate'].astype(str)
+    tidy = readings.merge(pm, on=keys, how='inner')
+    if tidy.empty:
+        raise ValueError("导出文件与板图没有匹配的孔位")
+
+    tidy = normalize_to_controls(tidy, id_col=id_col, method=method)
+    summary = aggregate_replicates(tidy, id_col=id_col, conc_col=conc_col)
+    wide = to_wide(summary, id_col=id_col, conc_col=conc_col, unit=unit)
+    return tidy, summary, wide
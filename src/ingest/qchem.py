@@ -0,0 +1,223 @@
+import hashlib
+import io
+import json
+import os
+import re
+import threading
+import warnings
+from collections import OrderedDict
+from concurrent.futures import ProcessPoolExecutor, ThreadPoolExecutor
+import pandas as pd
+
+# ==============================
+# Gaussian / ORCA 输出文件解析
+# ==============================
+HARTREE_TO_KCAL = 627.509474
+
+_FLOAT = rb'(-?\d+\.\d+)'
+# (程序, 能量类型, 预筛选关键字, 正则)，同一文件中取最后一次出现的值
+_PATTERNS = [
+    ('gaussian', 'G', b'Free Energies=', re.compile(rb'Sum of electronic and thermal Free Energies=\s*' + _FLOAT)),
+    ('gaussian', 'E', b'SCF Done', re.compile(rb'SCF Done:\s+E\([^)]*\)\s*=\s*' + _FLOAT)),
+    ('orca', 'G', b'Final Gibbs free', re.compile(rb'Final Gibbs free (?:energy|enthalpy)\s*\.*\s*' + _FLOAT)),
+    ('orca', 'E', b'FINAL SINGLE POINT', re.compile(rb'FINAL SINGLE POINT ENERGY\s+' + _FLOAT)),
+]
+
+# 内存中的解析缓存：文件哈希 -> 解析结果，LRU 淘汰，长期运行的服务内存不会无限增长
+_PARSE_CACHE_SIZE = 4096
+_parse_cache = OrderedDict()
+_cache_lock = threading.Lock()     # 多个会话可能同时解析上传文件
+
+def _cache_get(digest):
+    with _cache_lock:
+        if digest in _parse_cache:
+            _parse_cache.move_to_end(digest)
+            return _parse_cache[digest]
+    return None
+
+def _cache_put(digest, result):
+    with _cache_lock:
+        _parse_cache[digest] = result
+        _parse_cache.move_to_end(digest)
+        if len(_parse_cache) > _PARSE_CACHE_SIZE:
+            _parse_cache.popitem(last=False)
+
+def _open_binary(source):
+    if isinstance(source, (str, os.PathLike)):
+        return open(source, 'rb'), True
+    if hasattr(source, 'seek'):
+        source.seek(0)
+    return source, False
+
+def file_digest(source, chunk_size=1 << 20):
+    """流式计算文件内容的 SHA-1 (用作解析缓存键)"""
+    f, owned = _open_binary(source)
+    try:
+        h = hashlib.sha1()
+        for chunk in iter(lambda: f.read(chunk_size), b''):
+            h.update(chunk)
+        return h.hexdigest()
+    finally:
+        if owned:
+            f.close()
+
+def parse_qchem_output(source):
+    """
+    逐行流式解析 Gaussian / ORCA 输出文件，内存占用与文件大小无关
+    :param source: 文件路径或二进制文件对象
+    :return: {'program', 'G', 'E'}，能量单位为 Hartree，未找到时为 None
+    """
+    result = {'program': None, 'G': None, 'E': None}
+    f, owned = _open_binary(source)
+    try:
+        for line in f:
+            for program, kind, token, pattern in _PATTERNS:
+                if token in line:
+                    m = pattern.search(line)
+                    if m:
+                        result['program'] = program
+                        result[kind] = float(m.group(1))
+                    break
+    finally:
+        if owned:
+            f.close()
+    return result
+
+def _parse_bytes(data):
+    """子进程入口：解析已读入内存的上传文件"""
+    return parse_qchem_output(io.BytesIO(data))
+
+def _read_bytes(source):
+    if hasattr(source, 'getvalue'):
+        return source.getvalue()
+    f, _ = _open_binary(source)
+    return f.read()
+
+def _source_name(source):
+    if isinstance(source, (str, os.PathLike)):
+        return os.path.basename(os.fspath(source))
+    return getattr(source, 'name', 'unnamed')
+
+def default_name_parser(file_name):
+    """按 '<路径>_<步骤>.log' 约定拆分文件名，无下划线时归入同一路径"""
+    stem = os.path.splitext(os.path.basename(file_name))[0]
+    if '_' in stem:
+        path, step = stem.rsplit('_', 1)
+        return path, step
+    return 'Energy', stem
+
+def _load_disk_cache(cache_dir, digest):
+    fp = os.path.join(cache_dir, digest + '.json')
+    if os.path.exists(fp):
+        with open(fp, 'r', encoding='utf-8') as f:
+            return json.load(f)
+    return None
+
+def parse_qchem_outputs(sources, max_workers=None, cache_dir=None):
+    """
+    批量解析输出文件：先并行计算文件哈希，命中缓存的直接复用，其余并行解析
+    :param sources: 文件路径或文件对象列表
+    :param cache_dir: 可选的磁盘缓存目录 (按文件哈希保存解析结果)
+    :return: 与 sources 等长的解析结果列表
+    """
+    sources = list(sources)
+    with ThreadPoolExecutor(max_workers=max_workers) as pool:
+        digests = list(pool.map(file_digest, sources))
+
+    # 本次调用的结果单独保存，即使缓存在调用期间淘汰了其中的条目也不受影响
+    found = {}
+    missing = {}
+    for src, digest in zip(sources, digests):
+        if digest in found or digest in missing:
+            continue
+        cached = _cache_get(digest)
+        if cached is None and cache_dir:
+            cached = _load_disk_cache(cache_dir, digest)
+            if cached is not None:
+                _cache_put(digest, cached)
+        if cached is not None:
+            found[digest] = cached
+        else:
+            missing[digest] = src
+
+    if missing:
+        items = list(missing.items())
+        srcs = [src for _, src in items]
+        # 文件较多时分发给子进程：路径直接传递，已在内存中的上传文件以字节传递
+        if len(srcs) > 4:
+            on_disk = all(isinstance(s, (str, os.PathLike)) for s in srcs)
+            func, args = (parse_qchem_output, srcs) if on_disk else (_parse_bytes, [_read_bytes(s) for s in srcs])
+            with ProcessPoolExecutor(max_workers=max_workers) as pool:
+                parsed = list(pool.map(func, args, chunksize=8))
+        else:
+            parsed = [parse_qchem_output(s) for s in srcs]
+
+        for (digest, _), res in zip(items, parsed):
+            found[digest] = res
+            _cache_put(digest, res)
+            if cache_dir:
+                os.makedirs(cache_dir, exist_ok=True)
+                with open(os.path.join(cache_dir, digest + '.json'), 'w', encoding='utf-8') as f:
+                    json.dump(res, f)
+
+    return [found[d] for d in digests]
+
+def build_energy_table(sources, steps=None, reference=None, name_parser=None,
+                       max_workers=None, cache_dir=None):
+    """
+    由输出文件构建 Step × Path 相对自由能表 (kcal/mol)，可直接用于 draw_energy_profile
+    :param sources: 文件路径或文件对象列表
+    :param steps: 步骤顺序，默认按文件出现顺序；指定时不在其中的步骤被舍弃，没有对应文件的步骤为空行 (均给出警告)
+    :param reference: 参考步骤名 (各路径相对于该步骤取零)，默认第一个步骤
+    :param name_parser: 文件名 -> (路径, 步骤) 的函数，默认 default_name_parser
+    :return: 第一列为 Step，其后为各路径，最后一列 Energy_Type 记录所用能量 (G: 自由能，E: 电子能)
+    全部文件都有自由能时使用 G，否则整表统一使用 E (部分文件有 G 时给出警告)，不会在同一张表中混用两种能量
+    """
+    sources = list(sources)
+    if not sources:
+        raise ValueError("未提供任何输出文件")
+    name_parser = name_parser or default_name_parser
+    results = parse_qchem_outputs(sources, max_workers=max_workers, cache_dir=cache_dir)
+
+    names = [_source_name(src) for src in sources]
+    has_g = [res['G'] is not None for res in results]
+    kind = 'G' if all(has_g) else 'E'
+    if kind == 'E' and any(has_g):
+        missing_g = [n for n, g in zip(names, has_g) if not g]
+        warnings.warn(f"{len(missing_g)} 个文件缺少自由能 (如 {missing_g[0]})，全部改用电子能 E 计算相对能量")
+
+    records = []
+    for name, res in zip(names, results):
+        energy = res[kind]
+        if energy is None:
+            label = '自由能' if kind == 'G' else '单点能'
+            raise ValueError(f"文件 {name} 中未找到{label}")
+        path, step = name_parser(name)
+        records.append((path, step, energy))
+
+    long_df = pd.DataFrame(records, columns=['Path', 'Step', 'Hartree'])
+    if long_df.duplicated(['Path', 'Step']).any():
+        dup = long_df[long_df.duplicated(['Path', 'Step'])].iloc[0]
+        raise ValueError(f"路径 {dup['Path']} 的步骤 {dup['Step']} 对应多个文件")
+
+    table = long_df.pivot(index='Step', columns='Path', values='Hartree')
+    parsed_steps = list(dict.fromkeys(long_df['Step']))
+    step_order = list(steps) if steps else parsed_steps
+    dropped = [s for s in parsed_steps if s not in step_order]
+    if dropped:
+        warnings.warn(f"{len(dropped)} 个步骤不在指定的步骤顺序中，已舍弃: {', '.join(map(str, dropped))}")
+    empty = [s for s in step_order if s not in table.index]
+    if empty:
+        warnings.warn(f"{len(empty)} 个步骤没有对应的输出文件，能量为空: {', '.join(map(str, empty))}")
+    table = table.reindex(step_order)
+    path_order = list(dict.fromkeys(long_df['Path']))
+    table = table[path_order]
+
+    ref = reference if reference is not None else step_order[0]
+    if ref not in table.index:
+        raise ValueError(f"参考步骤 {ref} 不存在")
+    table = ((table - table.loc[ref]) * HARTREE_TO_KCAL).round(2)
+
+    table.columns.name = None
+    table['Energy_Type'] = kind
+    return table.rename_axis('Step').reset_index()
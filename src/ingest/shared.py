@@ -0,0 +1,103 @@
+import json
+import os
+import hashlib
+import numpy as np
+import pandas as pd
+
+# ==============================
+# 共享内存映射数值矩阵
+# ==============================
+# 一个工作表保存为两个文件：
+#   <name>.npy   清洗后的数值块 (float64, 行 × 数值列)
+#   <name>.json  列名与顺序、各列原始类型、非数值列 (编号 / SMILES 等) 的内容、内容哈希
+# 各渲染进程只需传递路径，np.load(mmap_mode) 打开后共享同一份页缓存。
+# 一键导出时每个工作表只写一次，所有图表任务都从同一份映射内存构建 DataFrame。
+
+class SharedSheet:
+    """
+    内存映射的工作表视图，可直接传给 plots.draw_* 函数
+    序列化时只携带路径，传给子进程不会复制数据
+    """
+
+    def __init__(self, path):
+        self.path = os.path.splitext(os.fspath(path))[0]
+        with open(self.path + '.json', 'r', encoding='utf-8') as f:
+            self.meta = json.load(f)
+        # 'c' 为写时复制：绘图函数的原地修改只作用于本进程的私有页
+        self.values = np.load(self.path + '.npy', mmap_mode='c')
+
+    def __reduce__(self):
+        return (SharedSheet, (self.path,))
+
+    def __repr__(self):
+        # 按内容标识，渲染缓存以 repr 作为参数键时不会因内存地址复用而误命中
+        return f"SharedSheet({self.digest})"
+
+    def __len__(self):
+        return self.values.shape[0]
+
+    @property
+    def digest(self):
+        """内容哈希 (保存时计算)"""
+        return self.meta['digest']
+
+    @property
+    def columns(self):
+        return list(self.meta['columns'])
+
+    @property
+    def numeric_columns(self):
+        return [c for c, numeric in zip(self.meta['columns'], self.meta['numeric']) if numeric]
+
+    def to_frame(self):
+        """
+        构建 DataFrame，列名与类型与保存前一致
+        float64 数值列引用映射内存；绘图函数对已是数值类型的列不再做类型转换 (plots.utils.coerce_numeric)，
+        但填充缺失值、缩放等会修改数据的步骤仍在本进程中生成新的数组
+        """
+        columns = self.meta['columns']
+        numeric = self.meta['numeric']
+        df = pd.DataFrame(self.values, columns=pd.Index(self.numeric_columns, dtype=object), copy=False)
+        others = iter(self.meta['other_values'])
+        for pos, (col, is_numeric) in enumerate(zip(columns, numeric)):
+            if not is_numeric:
+                df.insert(pos, col, next(others))
+        # 整数、布尔、日期等列恢复原始类型 (只复制这些列)
+        for pos, dtype in enumerate(self.meta['dtypes']):
+            if str(df.dtypes.iloc[pos]) != dtype:
+                df.isetitem(pos, df.iloc[:, pos].astype(dtype))
+        df.columns = pd.Index(columns)
+        return df
+
+def save_shared_sheet(df, directory, name):
+    """
+    将清洗后的工作表写为 .npy + .json，返回可共享的 SharedSheet
+    :param df: clean_data 之后的 DataFrame
+    :param directory: 输出目录 (建议使用临时目录或 /dev/shm)
+    :param name: 文件名 (不含扩展名)
+    """
+    os.makedirs(directory, exist_ok=True)
+    path = os.path.join(directory, name)
+
+    numeric = [pd.api.types.is_numeric_dtype(df.dtypes.iloc[i]) for i in range(df.shape[1])]
+    block = np.ascontiguousarray(df.iloc[:, [i for i, n in enumerate(numeric) if n]].to_numpy(dtype=np.float64))
+    np.save(path + '.npy', block)
+
+    # 列名保持原始类型 (例如整数列名)，JSON 无法表示的列名才转为字符串
+    meta = {
+        'columns': [c if isinstance(c, (str, int, float, bool)) or c is None else str(c) for c in df.columns],
+        'numeric': numeric,
+        'dtypes': [str(t) for t in df.dtypes],
+        'other_values': [df.iloc[:, i].astype(object).where(df.iloc[:, i].notna(), None).tolist()
+                         for i, n in enumerate(numeric) if not n],
+    }
+    text = json.dumps(meta, ensure_ascii=False, default=str)
+    meta['digest'] = hashlib.sha1(block.tobytes() + text.encode('utf-8')).hexdigest()
+    with open(path + '.json', 'w', encoding='utf-8') as f:
+        json.dump(meta, f, ensure_ascii=False, default=str)
+
+    return SharedSheet(path)
+
+def load_shared_sheet(path):
+    """打开已保存的共享工作表"""
+    return SharedSheet(path)
@@ -0,0 +1,272 @@
+import io
+import os
+import re
+import zipfile
+from collections import defaultdict
+import pandas as pd
+
+# ==============================
+# 多格式表格数据源
+# ==============================
+# Excel 仍使用 pd.ExcelFile；CSV / Parquet / Feather 以及由它们组成的 ZIP 或目录
+# 统一包装为 TableSource，接口与 ExcelFile 相同 (sheet_names / parse)，
+# 后续的 clean_data、工作表选择、一键导出等流程无需区分格式。
+# 列式文件通过 Arrow 读取，数值列转换为 DataFrame 时不做复制；CSV 使用 Arrow 的多线程解析器。
+# CSV 先按 UTF-8 (可带 BOM) 解析，失败时按 GB18030 重试 (中文 Windows 下 Excel“另存为 CSV”的默认编码为 GBK)。
+
+EXCEL_EXTS = ('.xlsx', '.xlsm', '.xls')
+CSV_EXTS = ('.csv', '.tsv', '.txt')
+PARQUET_EXTS = ('.parquet', '.pq')
+FEATHER_EXTS = ('.feather', '.arrow', '.ipc')
+TABLE_EXTS = CSV_EXTS + PARQUET_EXTS + FEATHER_EXTS
+
+# 上传组件可接受的扩展名
+UPLOAD_TYPES = ['xlsx', 'xls', 'csv', 'tsv', 'parquet', 'feather', 'arrow', 'zip']
+
+# CSV 依次尝试的编码
+CSV_ENCODINGS = ('utf-8', 'gb18030')
+
+def _require_pyarrow(what):
+    try:
+        import pyarrow  # noqa: F401
+    except ImportError:
+        raise ValueError(f"读取 {what} 需要安装 pyarrow (pip install pyarrow)")
+
+def detect_format(name, head=b''):
+    """
+    根据扩展名判断格式，扩展名缺失或未知时根据文件头判断
+    :return: 'excel' / 'csv' / 'parquet' / 'feather' / 'zip'
+    """
+    ext = os.path.splitext(str(name or ''))[1].lower()
+    if ext in EXCEL_EXTS:
+        return 'excel'
+    if ext in CSV_EXTS:
+        return 'csv'
+    if ext in PARQUET_EXTS:
+        return 'parquet'
+    if ext in FEATHER_EXTS:
+        return 'feather'
+    if ext == '.zip':
+        return 'zip'
+    if head.startswith(b'PAR1'):
+        return 'parquet'
+    if head.startswith(b'ARROW1'):
+        return 'feather'
+    if head.startswith(b'\xd0\xcf\x11\xe0'):
+        return 'excel'
+    if head.startswith(b'PK\x03\x04'):
+        # 无扩展名的 xlsx 也会走到这里，打开时再区分
+        return 'zip'
+    return 'csv'
+
+def _to_frame(table):
+    """Arrow Table -> DataFrame，无缺失值的数值列直接引用 Arrow 内存"""
+    if isinstance(table, pd.DataFrame):
+        return table.copy()
+    return table.to_pandas(split_blocks=True)
+
+def read_arrow_table(source, fmt, name=''):
+    """
+    读取单个 CSV / Parquet / Feather 为 Arrow Table
+    :param source: 文件路径或二进制数据 (bytes)
+    """
+    _require_pyarrow(fmt)
+    import pyarrow as pa
+    is_bytes = isinstance(source, (bytes, bytearray, memoryview))
+
+    if fmt == 'parquet':
+        import pyarrow.parquet as pq
+        return pq.read_table(pa.BufferReader(source) if is_bytes else source, memory_map=isinstance(source, str))
+    if fmt == 'feather':
+        import pyarrow.feather as feather
+        return feather.read_table(pa.BufferReader(source) if is_bytes else source, memory_map=isinstance(source, str))
+
+    import pyarrow.csv as pacsv
+    delimiter = '\t' if str(name).lower().endswith('.tsv') else ','
+    for encoding in CSV_ENCODINGS:
+        try:
+            table = pacsv.read_csv(pa.BufferReader(source) if is_bytes else source,
+                                   parse_options=pacsv.ParseOptions(delimiter=delimiter),
+                                   read_options=pacsv.ReadOptions(use_threads=True, encoding=encoding))
+            # 列名与字符串列在转换为 DataFrame 时才解码，这里提前校验，编码不对时立即重试
+            table.column_names
+            table.validate(full=True)
+            return table
+        except (UnicodeDecodeError, pa.ArrowInvalid):
+            if encoding == CSV_ENCODINGS[-1]:
+                raise
+
+def _read_csv_pandas(source, sep):
+    """没有 pyarrow 时的 CSV 读取，编码回退规则与 read_arrow_table 相同"""
+    for encoding in CSV_ENCODINGS:
+        try:
+            return pd.read_csv(io.BytesIO(source) if isinstance(source, (bytes, bytearray)) else source,
+                               sep=sep, encoding=encoding)
+        except UnicodeDecodeError:
+            if encoding == CSV_ENCODINGS[-1]:
+                raise
+
+class TableSource:
+    """
+    CSV / Parquet / Feather 数据源，接口与 pd.ExcelFile 一致
+    每个表 (文件或分片目录) 对应一个“工作表”，首次 parse 时才读取
+    """
+
+    def __init__(self, loaders):
+        """
+        :param loaders: {表名: 返回 Arrow Table (或 DataFrame) 的无参函数}，顺序即 sheet_names 的顺序
+        """
+        self._loaders = dict(loaders)
+        self._tables = {}
+
+    @property
+    def sheet_names(self):
+        return list(self._loaders)
+
+    def table(self, sheet_name):
+        """返回读取结果 (缓存在对象内)"""
+        if sheet_name not in self._loaders:
+            raise ValueError(f"未找到数据表: {sheet_name}")
+        if sheet_name not in self._tables:
+            self._tables[sheet_name] = self._loaders[sheet_name]()
+        return self._tables[sheet_name]
+
+    def parse(self, sheet_name=0):
+        """读取为 DataFrame，sheet_name 可为表名或序号"""
+        if isinstance(sheet_name, int):
+            sheet_name = self.sheet_names[sheet_name]
+        return _to_frame(self.table(sheet_name))
+
+_PART_FILE = re.compile(r'^(part[-_.]?\d+.*|\d+|.*[-_.]\d{3,})$', re.IGNORECASE)
+
+def _table_name(path):
+    return os.path.splitext(path.replace('\\', '/'))[0]
+
+def _dataset_root(norm):
+    """
+    Parquet 分片所属数据集的根目录，不是分片时返回 None
+    分片：位于 hive 分区目录 (key=value) 下，或文件名形如 part-0 / 00000 / data-00001
+    """
+    parts = norm.split('/')
+    for i, comp in enumerate(parts[:-1]):
+        if '=' in comp:
+            return '/'.join(parts[:i]) or None
+    stem = os.path.splitext(parts[-1])[0]
+    if len(parts) > 1 and _PART_FILE.match(stem):
+        return '/'.join(parts[:-1])
+    return None
+
+def _group_members(paths):
+    """
+    将文件分组为表：普通文件各为一张表 (以相对路径命名)；
+    同一数据集的 Parquet 分片合并为一张以数据集目录命名的表
+    :return: {表名: [(文件路径, 分片相对数据集根目录的路径)]}
+    """
+    groups = defaultdict(list)
+    for p in sorted(paths):
+        norm = p.replace('\\', '/')
+        ext = os.path.splitext(norm)[1].lower()
+        if ext not in TABLE_EXTS:
+            continue
+        root = _dataset_root(norm) if ext in PARQUET_EXTS else None
+        if root:
+            groups[root].append((p, norm[len(root) + 1:]))
+        else:
+            groups[_table_name(norm)].append((p, ''))
+    return groups
+
+def _add_partition_columns(table, rel):
+    """hive 分区目录 (key=value) 还原为常量列"""
+    import pyarrow as pa
+    for comp in rel.split('/')[:-1]:
+        if '=' in comp:
+            key, value = comp.split('=', 1)
+            if key not in table.column_names:
+                table = table.append_column(key, pa.array([value] * table.num_rows, type=pa.string()))
+    return table
+
+def _concat_loader(read_one, members):
+    def load():
+        import pyarrow as pa
+        tables = [_add_partition_columns(read_one(m), rel) for m, rel in members]
+        return tables[0] if len(tables) == 1 else pa.concat_tables(tables, promote_options='default')
+    return load
+
+def _zip_members(zf):
+    """ZIP 中的数据文件 (跳过目录、隐藏文件与 macOS 元数据)"""
+    return [i for i in zf.infolist() if not i.is_dir() and not os.path.basename(i.filename).startswith('.')
+            and not i.filename.startswith('__MACOSX/')]
+
+def _zip_source(data):
+    zf = zipfile.ZipFile(io.BytesIO(data))
+    groups = _group_members([i.filename for i in _zip_members(zf)])
+    if not groups:
+        raise ValueError("ZIP 中未找到 CSV / Parquet / Feather 文件")
+
+    def read_one(member):
+        return read_arrow_table(zf.read(member), detect_format(member), member)
+
+    return TableSource({name: _concat_loader(read_one, ms) for name, ms in groups.items()})
+
+def _directory_source(root):
+    paths = []
+    for dirpath, _, files in os.walk(root):
+        for f in files:
+            if not f.startswith('.'):
+                paths.append(os.path.relpath(os.path.join(dirpath, f), root))
+    groups = _group_members(paths)
+    if not groups:
+        raise ValueError(f"目录中未找到 CSV / Parquet / Feather 文件: {root}")
+
+    def read_one(rel):
+        return read_arrow_table(os.path.join(root, rel), detect_format(rel), rel)
+
+    return TableSource({name: _concat_loader(read_one, ms) for name, ms in groups.items()})
+
+def open_table_source(source, name=None):
+    """
+    打开任意支持格式的数据文件
+    :param source: 文件路径、目录路径，或带 name 属性的上传文件对象
+    :return: pd.ExcelFile 或 TableSource，均提供 sheet_names 与 parse(sheet_name)
+    """
+    if isinstance(source, (str, os.PathLike)):
+        path = os.fspath(source)
+        if os.path.isdir(path):
+            return _directory_source(path)
+        name = name or path
+        with open(path, 'rb') as f:
+            head = f.read(8)
+        data = None
+    else:
+        name = name or getattr(source, 'name', '')
+        data = source.getvalue() if hasattr(source, 'getvalue') else source.read()
+        head = data[:8]
+
+    fmt = detect_format(name, head)
+    if fmt == 'excel':
+        return pd.ExcelFile(source if data is None else io.BytesIO(data))
+    if fmt == 'zip':
+        if data is None:
+            with open(path, 'rb') as f:
+                data = f.read()
+        if _is_xlsx(data):
+            return pd.ExcelFile(io.BytesIO(data))
+        return _zip_source(data)
+
+    sheet = _table_name(os.path.basename(str(name))) or 'data'
+    target = path if data is None else data
+    if fmt == 'csv':
+        try:
+            _require_pyarrow('CSV')
+        except ValueError:
+            # 没有 pyarrow 时退回 pandas 自带的 CSV 解析器
+            sep = '\t' if str(name).lower().endswith('.tsv') else ','
+            return TableSource({sheet: lambda: _read_csv_pandas(target, sep)})
+    return TableSource({sheet: lambda: read_arrow_table(target, fmt, name)})
+
+def _is_xlsx(data):
+    try:
+        with zipfile.ZipFile(io.BytesIO(data)) as zf:
+            return '[Content_Types].xml' in zf.namelist() and any(n.startswith('xl/') for n in zf.namelist())
+    except zipfile.BadZipFile:
+        return False
@@ -1,7 +1,12 @@
 from .heatmap import draw_heatmap
 from .polar import draw_polar_bar, draw_radar_chart
-from .bar import draw_fungicide_bar
+from .bar import draw_fungicide_bar, draw_grouped_bar
 from .boxplot import draw_boxplot
-from .scatter import draw_optimization_bubble
+from .stats import bootstrap_ci
+from .scatter import draw_optimization_bubble, draw_hte_plate, aggregate_conditions
 from .energy import draw_energy_profile
-from .kinetics import draw_kinetics
\ No newline at end of file
+from .energetics import energetic_span
+from .kinetics import draw_kinetics
+from .render import render, render_cached, submit_render, figure_to_bytes
+from .jobs import RenderJob, JobCancelled, JobQueueFull, start_job, start_render_job, render_pages
+from .export import detect_chart_types, chart_defaults, iter_bundle, write_zip_bundle, write_pdf_bundle
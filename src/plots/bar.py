@@ -1,49 +1,147 @@
-import matplotlib.pyplot as plt
-from .utils import configure_mpl_fonts
+import numpy as np
+import pandas as pd
+from matplotlib.collections import PolyCollection
+from .utils import configure_mpl_fonts, as_frame, new_figure, coerce_numeric
+from .depict import get_thumbnails, add_thumbnails
 
-def draw_fungicide_bar(df, font_size=14):
+SERIES_COLORS = ['#4a90c0', '#d9534f', '#5cb85c', '#f0ad4e', '#9467bd', '#8c564b', '#17becf', '#7f7f7f']
+GROUP_WIDTH = 0.7           # 每组柱子占据的总宽度 (x 轴单位)
+AXES_WIDTH_FRACTION = 0.85  # 坐标轴约占图宽的比例
+MAX_FIG_WIDTH = 40          # 单页最大宽度 (英寸)，超过后分页
+MAX_TICK_LABELS = 60        # 单页最多显示的编号标签数
+MIN_THUMB_PT = 14           # 结构式缩略图小于该尺寸 (磅) 时不绘制
+
+def _default_series(df, id_col):
+    """默认系列：同时有 '灰霉'、'赤霉' 时使用这两列，否则使用全部数值列"""
+    if '灰霉' in df.columns and '赤霉' in df.columns:
+        return ['灰霉', '赤霉']
+    return [c for c in df.columns if c != id_col and pd.api.types.is_numeric_dtype(df[c])]
+
+def _add_bar_series(ax, x, heights, width, label, color):
+    """一个系列的所有柱子作为单个集合添加 (避免逐根创建 Rectangle)；缺失值不画柱子，避免与实测的 0 混淆"""
+    keep = ~np.isnan(heights)
+    x, h = x[keep], heights[keep]
+    left, right = x - width / 2, x + width / 2
+    zeros = np.zeros_like(h)
+    verts = np.stack([np.column_stack([left, zeros]), np.column_stack([left, h]),
+                      np.column_stack([right, h]), np.column_stack([right, zeros])], axis=1)
+    coll = PolyCollection(verts, facecolors=color, edgecolors='none', label=label)
+    # 与 ax.bar 一致：y=0 处不留边距
+    coll.sticky_edges.y.append(0)
+    ax.add_collection(coll, autolim=True)
+    return coll
+
+def draw_grouped_bar(df, series=None, font_size=14, dpi=300, min_bar_px=2, smiles_col=None):
     """
-    绘制除菌柱状图（灰霉 vs 赤霉）
+    绘制分组柱状图 (任意数量的测试指标)
+    :param df: 第一列 (或 '生测编号' 列) 为编号，其余为各指标数值
+    :param series: 要绘制的指标列，默认见 _default_series
+    :param dpi: 目标输出分辨率，用于判断柱宽是否小于 min_bar_px 像素
+    :param min_bar_px: 单根柱子的最小像素宽度，不满足时自动分页
+    :param smiles_col: 可选的 SMILES 列名，给出时在编号标签上方绘制结构式缩略图 (需要 rdkit)
+    :return: Figure 列表
     """
     global_font = configure_mpl_fonts()
-    
-    # 确保有需要的列
+    df = as_frame(df)
+
+    id_col = '生测编号' if '生测编号' in df.columns else df.columns[0]
+    series = list(series) if series is not None else _default_series(df, id_col)
+    missing = [c for c in series if c not in df.columns]
+    if missing:
+        raise ValueError(f"未找到数据列: {', '.join(map(str, missing))}")
+    if not series:
+        raise ValueError("未找到可绘制的数值列")
+
+    if smiles_col is not None and smiles_col not in df.columns:
+        raise ValueError(f"未找到 SMILES 列: {smiles_col}")
+
+    labels = df[id_col].astype(str).values
+    values = coerce_numeric(df[series]).to_numpy(dtype=float)
+    n_groups, n_series = values.shape
+
+    bar_width = GROUP_WIDTH / n_series
+    # 所有系列的偏移量一次算出: (n_series,)
+    offsets = (np.arange(n_series) - (n_series - 1) / 2) * bar_width
+
+    # 每页最多容纳的编号数：保证单根柱子不窄于 min_bar_px 像素
+    px_per_unit_max = MAX_FIG_WIDTH * AXES_WIDTH_FRACTION * dpi
+    per_page = max(int(px_per_unit_max * bar_width / min_bar_px), 1)
+    n_pages = -(-n_groups // per_page)
+    per_page = -(-n_groups // n_pages)
+
+    thumbnails = get_thumbnails(df[smiles_col].tolist()) if smiles_col is not None else None
+
+    figures = []
+    for page in range(n_pages):
+        start, stop = page * per_page, min((page + 1) * per_page, n_groups)
+        page_labels = labels[start:stop]
+        page_values = values[start:stop]
+        n = stop - start
+
+        fig_w = min(max(14, n * (0.25 * n_series + 0.2)), MAX_FIG_WIDTH)
+        fig, ax = new_figure(figsize=(fig_w, 7))
+
+        x = np.arange(n)
+        positions = x[:, None] + offsets[None, :]
+        for k, name in enumerate(series):
+            _add_bar_series(ax, positions[:, k], page_values[:, k], bar_width, str(name),
+                            SERIES_COLORS[k % len(SERIES_COLORS)])
+        ax.autoscale_view()
+
+        ax.axhline(y=0, color='black', linewidth=1.5, linestyle='-', zorder=1)
+
+        # 编号过多时间隔显示标签
+        step = max(-(-n // MAX_TICK_LABELS), 1)
+        ax.set_xticks(x[::step])
+        ax.set_xticklabels(page_labels[::step], rotation=0 if n <= 20 else 90, ha='center',
+                           fontproperties=global_font, fontsize=font_size)
+        ax.set_xlim(-0.6, n - 0.4)
+
+        if thumbnails is not None:
+            spacing_pt = fig_w * AXES_WIDTH_FRACTION * 72 / n * step
+            thumb_pt = min(spacing_pt * 0.9, 72)
+            if thumb_pt >= MIN_THUMB_PT:
+                add_thumbnails(ax, thumbnails[start:stop:step], [(i, 0) for i in x[::step]], thumb_pt,
+                               xycoords=('data', 'axes fraction'), offset=(0, -3), box_alignment=(0.5, 1))
+                ax.xaxis.set_tick_params(pad=thumb_pt + 6)
+
+        for label in ax.get_yticklabels():
+            label.set_fontproperties(global_font)
+
+        ax.set_ylabel('抑制率 / 相对值', fontproperties=global_font, fontsize=font_size)
+        xlabel = '生测编号' if n_pages == 1 else f'生测编号 ({page + 1}/{n_pages})'
+        ax.set_xlabel(xlabel, fontproperties=global_font, fontsize=font_size)
+
+        ax.legend(fontsize=font_size, frameon=False, prop=global_font, loc='upper left', bbox_to_anchor=(0.02, 0.98),
+                  ncol=1 if n_series <= 4 else 2)
+
+        ax.spines['top'].set_visible(False)
+        ax.spines['right'].set_visible(False)
+
+        fig.tight_layout()
+        figures.append(fig)
+
+    return figures
+
+def draw_fungicide_bar(df, font_size=14, smiles_col=None):
+    """
+    绘制除菌柱状图（灰霉 vs 赤霉）
+    """
+    df = as_frame(df)
+
+    # 确保有需要的列 (列名不匹配时按位置推断，不修改传入的 DataFrame)
+    rename = {}
     if '生测编号' not in df.columns:
-        df.rename(columns={df.columns[0]: '生测编号'}, inplace=True)
-    
+        rename[df.columns[0]] = '生测编号'
     if '灰霉' not in df.columns and len(df.columns) > 1:
-        df.rename(columns={df.columns[1]: '灰霉'}, inplace=True)
+        rename[df.columns[1]] = '灰霉'
     if '赤霉' not in df.columns and len(df.columns) > 2:
-        df.rename(columns={df.columns[2]: '赤霉'}, inplace=True)
-        
+        rename[df.columns[2]] = '赤霉'
+    df = df.rename(columns=rename)
+
     if '灰霉' not in df.columns or '赤霉' not in df.columns:
         raise ValueError("数据缺少 '灰霉' 或 '赤霉' 列，且无法自动推断。")
 
-    fig, ax = plt.subplots(figsize=(14, 7))
-    
-    x_labels = df['生测编号']
-    x = range(len(x_labels))
-    bar_width = 0.35
-    colors = ['#4a90c0', '#d9534f']
-    
-    ax.bar([i - bar_width/2 for i in x], df['灰霉'], width=bar_width, label='灰霉', color=colors[0])
-    ax.bar([i + bar_width/2 for i in x], df['赤霉'], width=bar_width, label='赤霉', color=colors[1])
-    
-    ax.axhline(y=0, color='black', linewidth=1.5, linestyle='-', zorder=1)
-    
-    ax.set_xticks(x)
-    ax.set_xticklabels(x_labels, rotation=0, ha='center', fontproperties=global_font, fontsize=font_size)
-    
-    for label in ax.get_yticklabels():
-        label.set_fontproperties(global_font)
-        
-    ax.set_ylabel('抑制率 / 相对值', fontproperties=global_font, fontsize=font_size)
-    ax.set_xlabel('生测编号', fontproperties=global_font, fontsize=font_size)
-    
-    ax.legend(fontsize=font_size, frameon=False, prop=global_font, loc='upper left', bbox_to_anchor=(0.02, 0.98))
-    
-    ax.spines['top'].set_visible(False)
-    ax.spines['right'].set_visible(False)
-    
-    plt.tight_layout()
-    return fig
\ No newline at end of file
+    # 保持单图输出，不分页
+    return draw_grouped_bar(df, series=['灰霉', '赤霉'], font_size=font_size, min_bar_px=0.01,
+                            smiles_col=smiles_col)[0]
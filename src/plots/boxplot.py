@@ -1,27 +1,29 @@
 import numpy as np
-import matplotlib.pyplot as plt
 import seaborn as sns
-from .utils import configure_mpl_fonts
+from .utils import configure_mpl_fonts, as_frame, new_figure
+from .stats import numeric_frame
 
-def draw_boxplot(df, font_size=14):
+def draw_boxplot(df, font_size=14, ci_table=None):
     """
     绘制数据分布箱线图
+    :param ci_table: 可选，stats.bootstrap_ci 返回的 summary 表，在箱体右侧标注中位数/均值的置信区间
     """
     global_font = configure_mpl_fonts()
+    df = as_frame(df)
     
-    if df.columns[0] not in df.select_dtypes(include=[np.number]).columns:
-        df = df.set_index(df.columns[0])
-    
-    numeric_df = df.select_dtypes(include=[np.number])
+    numeric_df = numeric_frame(df)
     
     if numeric_df.empty:
         raise ValueError("未找到有效的数值列用于绘制箱线图")
 
-    fig, ax = plt.subplots(figsize=(12, 8))
+    fig, ax = new_figure(figsize=(12, 8))
     
     sns.boxplot(data=numeric_df, ax=ax, palette="Set3", width=0.5)
     sns.stripplot(data=numeric_df, ax=ax, color=".25", size=4, alpha=0.6, jitter=True)
     
+    if ci_table is not None:
+        _draw_ci(ax, numeric_df, ci_table, global_font, font_size)
+
     ax.set_title('各指标活性数据分布', fontproperties=global_font, fontsize=int(font_size*1.3), pad=20)
     ax.set_ylabel('活性数值', fontproperties=global_font, fontsize=font_size)
     ax.set_xlabel('测试指标', fontproperties=global_font, fontsize=font_size)
@@ -32,5 +34,21 @@ def draw_boxplot(df, font_size=14):
     ax.spines['right'].set_visible(False)
     ax.grid(axis='y', linestyle='--', alpha=0.5)
     
-    plt.tight_layout()
-    return fig
\ No newline at end of file
+    fig.tight_layout()
+    return fig
+
+def _draw_ci(ax, numeric_df, ci_table, global_font, font_size):
+    """在每个箱体右侧绘制中位数 (红) 与均值 (蓝) 的置信区间误差线"""
+    table = ci_table.set_index('indicator')
+    names = [str(c) for c in numeric_df.columns]
+    x = np.arange(len(names))
+    present = np.array([n in table.index for n in names])
+    if not present.any():
+        return
+    t = table.reindex(names)
+    for key, offset, color, label in (('median', 0.32, '#d9534f', '中位数 CI'), ('mean', 0.40, '#4a90c0', '均值 CI')):
+        center = t[key].to_numpy(dtype=float)
+        yerr = np.vstack([center - t[f'{key}_lo'].to_numpy(dtype=float), t[f'{key}_hi'].to_numpy(dtype=float) - center])
+        ax.errorbar(x[present] + offset, center[present], yerr=yerr[:, present], fmt='D', markersize=4,
+                    color=color, ecolor=color, elinewidth=1.5, capsize=4, zorder=5, label=label)
+    ax.legend(prop=global_font, fontsize=int(font_size*0.85), frameon=False, loc='best')
@@ -0,0 +1,43 @@
+import hashlib
+import pandas as pd
+from cacheutil import LRUCache, row_hashes
+
+# ==============================
+# 按内容寻址的渲染缓存
+# ==============================
+# 键 = 数据内容哈希 + 绘图参数 + 导出格式，与文件名、上传次数无关：
+# 同一份数据重复上传、或工作簿中只有其他工作表被修改时，图表直接取缓存。
+# 热图按页缓存，分割后只有数据变化的那一页需要重新绘制。
+RENDER_CACHE_BYTES = 512 * 1024 * 1024
+
+def frame_digest(obj):
+    """DataFrame / Series 的内容哈希：列名、类型、索引与全部数值"""
+    h = hashlib.sha1()
+    if isinstance(obj, pd.DataFrame):
+        h.update(repr([(str(c), str(t)) for c, t in obj.dtypes.items()]).encode('utf-8'))
+    else:
+        h.update(f"{obj.name}|{obj.dtype}".encode('utf-8'))
+    h.update(row_hashes(obj).tobytes())
+    return h.hexdigest()
+
+def _param_repr(value):
+    if isinstance(value, (pd.DataFrame, pd.Series)):
+        return frame_digest(value)
+    if callable(value):
+        return f"{value.__module__}.{value.__qualname__}"
+    if isinstance(value, dict):
+        return repr(sorted((str(k), _param_repr(v)) for k, v in value.items()))
+    if isinstance(value, (list, tuple)):
+        return repr([_param_repr(v) for v in value])
+    return repr(value)
+
+def params_digest(*args, **kwargs):
+    """绘图参数的哈希 (数据框按内容，函数按名称)"""
+    text = _param_repr(list(args)) + _param_repr(kwargs)
+    return hashlib.sha1(text.encode('utf-8')).hexdigest()
+
+def _outputs_size(outputs):
+    return sum(sum(len(v) for v in out.values()) if isinstance(out, dict) else len(out) for out in outputs)
+
+# 缓存值为一页 (或一次绘图) 导出的图片列表
+render_cache = LRUCache(RENDER_CACHE_BYTES, sizeof=_outputs_size)
@@ -0,0 +1,108 @@
+import hashlib
+import threading
+from collections import OrderedDict
+import numpy as np
+
+# ==============================
+# 活性谱聚类排序工具
+# ==============================
+EXACT_THRESHOLD = 3000      # 超过该行数时改用近似聚类
+_CHUNK_ROWS = 1024          # 分块计算距离时每块的行数
+_CACHE_SIZE = 16
+
+_order_cache = OrderedDict()
+_cache_lock = threading.Lock()     # 热图在渲染线程池中绘制，缓存可能被并发访问
+
+def _condensed_distances(X):
+    """分块计算 float32 压缩距离向量（欧氏距离），避免构造 n×n 矩阵"""
+    n = X.shape[0]
+    out = np.empty(n * (n - 1) // 2, dtype=np.float32)
+    sq = np.einsum('ij,ij->i', X, X)
+    pos = 0
+    for start in range(0, n - 1, _CHUNK_ROWS):
+        stop = min(start + _CHUNK_ROWS, n - 1)
+        block = X[start:stop]
+        d2 = sq[start:stop, None] + sq[None, :] - 2.0 * (block @ X.T)
+        np.maximum(d2, 0, out=d2)
+        np.sqrt(d2, out=d2)
+        for k, i in enumerate(range(start, stop)):
+            m = n - i - 1
+            out[pos:pos + m] = d2[k, i + 1:]
+            pos += m
+    return out
+
+def _kmeans(X, k, seed=0, n_iter=15):
+    """向量化的 Lloyd k-means，分块计算最近中心以限制内存"""
+    rng = np.random.default_rng(seed)
+    centers = X[rng.choice(len(X), size=k, replace=False)].copy()
+    labels = np.zeros(len(X), dtype=np.int64)
+    for _ in range(n_iter):
+        c_sq = np.einsum('ij,ij->i', centers, centers)
+        for start in range(0, len(X), 65536):
+            block = X[start:start + 65536]
+            d2 = c_sq[None, :] - 2.0 * (block @ centers.T)
+            labels[start:start + 65536] = d2.argmin(axis=1)
+        counts = np.bincount(labels, minlength=k).astype(np.float32)
+        sums = np.zeros_like(centers)
+        np.add.at(sums, labels, X)
+        filled = counts > 0
+        centers[filled] = sums[filled] / counts[filled, None]
+    return labels, centers
+
+def _exact_order(X, method):
+    from scipy.cluster.hierarchy import linkage, leaves_list, optimal_leaf_ordering
+    if len(X) < 2:
+        return np.arange(len(X)), None
+    y = _condensed_distances(X)
+    Z = linkage(y, method=method)
+    if len(X) <= 500:
+        Z = optimal_leaf_ordering(Z, y)
+    return leaves_list(Z), Z
+
+def _approx_order(X, method, n_clusters, seed):
+    """近似排序：k-means 分桶 -> 对中心做层次聚类 -> 桶内按主成分投影排序"""
+    k = min(n_clusters, len(X))
+    labels, centers = _kmeans(X, k, seed=seed)
+    center_order, _ = _exact_order(centers, method)
+    rank = np.empty(k, dtype=np.int64)
+    rank[center_order] = np.arange(k)
+
+    centered = X - X.mean(axis=0)
+    _, _, vt = np.linalg.svd(centered[:min(len(X), 20000)], full_matrices=False)
+    proj = centered @ vt[0]
+    return np.lexsort((proj, rank[labels]))
+
+def cluster_order(matrix, method='average', exact_threshold=EXACT_THRESHOLD, n_clusters=256, seed=0):
+    """
+    按活性谱相似性计算行顺序
+    :param matrix: 数值矩阵 (n_rows, n_cols)
+    :param method: 层次聚类连接方式 (average / complete / single / ward)
+    :param exact_threshold: 行数不超过该值时做精确层次聚类，否则用近似聚类
+    :return: (行顺序数组, linkage 矩阵)，近似模式下 linkage 为 None
+    """
+    X = np.ascontiguousarray(matrix, dtype=np.float32)
+    h = hashlib.sha1(X.tobytes())
+    h.update(repr((X.shape, method, exact_threshold, n_clusters, seed)).encode())
+    key = h.hexdigest()
+
+    with _cache_lock:
+        if key in _order_cache:
+            _order_cache.move_to_end(key)
+            return _order_cache[key]
+
+    try:
+        import scipy  # noqa: F401
+    except ImportError:
+        raise ValueError("聚类排序需要安装 scipy (pip install scipy)")
+
+    if len(X) <= exact_threshold:
+        result = _exact_order(X, method)
+    else:
+        result = (_approx_order(X, method, n_clusters, seed), None)
+
+    with _cache_lock:
+        _order_cache[key] = result
+        _order_cache.move_to_end(key)
+        if len(_order_cache) > _CACHE_SIZE:
+            _order_cache.popitem(last=False)
+    return result
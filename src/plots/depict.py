@@ -0,0 +1,194 @@
+import os
+import io
+import hashlib
+import tempfile
+import threading
+import multiprocessing
+from collections import OrderedDict
+from concurrent.futures import ProcessPoolExecutor
+from concurrent.futures.process import BrokenProcessPool
+import matplotlib.image as mpimg
+from matplotlib.offsetbox import OffsetImage, AnnotationBbox
+
+# ==============================
+# 化合物结构式缩略图
+# ==============================
+# 每个规范化 SMILES + 尺寸只绘制一次：内存中缓存解码后的图像，磁盘上缓存 PNG，
+# 磁盘缓存按访问时间 (mtime) 淘汰最久未使用的文件。未命中的结构在子进程中并行绘制。
+# 绘图函数在渲染线程池中执行：内存缓存由锁保护；子进程池全局共用一个，以 spawn 方式启动，
+# 不会在多线程进程中 fork，也不会在每次调用时重新创建进程。
+
+THUMB_SIZE = 160                    # 缩略图边长 (像素)
+DEFAULT_CACHE_DIR = os.path.join(tempfile.gettempdir(), 'bioassay_viz', 'depict')
+CACHE_MAX_BYTES = 256 * 1024 * 1024
+PARALLEL_THRESHOLD = 16             # 未命中数超过该值时使用进程池
+_MEMORY_CACHE_SIZE = 4096
+
+_image_cache = OrderedDict()
+_cache_lock = threading.Lock()
+_pool = None
+_pool_lock = threading.Lock()
+
+def _require_rdkit():
+    try:
+        from rdkit import Chem  # noqa: F401
+    except ImportError:
+        raise ValueError("结构式缩略图需要安装 rdkit (pip install rdkit)")
+
+def canonical_smiles(smiles):
+    """返回规范化 SMILES，无法解析时返回 None"""
+    from rdkit import Chem, rdBase
+    if smiles is None or not isinstance(smiles, str) or not smiles.strip():
+        return None
+    with rdBase.BlockLogs():
+        mol = Chem.MolFromSmiles(smiles.strip())
+    return Chem.MolToSmiles(mol) if mol is not None else None
+
+def _cache_key(canon, size):
+    return hashlib.sha1(f"{canon}|{size}".encode('utf-8')).hexdigest()
+
+def render_structure_png(canon, size=THUMB_SIZE):
+    """绘制单个结构式 (透明背景 PNG 字节)，供子进程调用"""
+    from rdkit import Chem
+    from rdkit.Chem.Draw import rdMolDraw2D
+    mol = Chem.MolFromSmiles(canon)
+    drawer = rdMolDraw2D.MolDraw2DCairo(size, size)
+    drawer.drawOptions().clearBackground = False
+    drawer.DrawMolecule(mol)
+    drawer.FinishDrawing()
+    return drawer.GetDrawingText()
+
+def _lookup(key):
+    with _cache_lock:
+        image = _image_cache.get(key)
+        if image is not None:
+            _image_cache.move_to_end(key)
+        return image
+
+def _remember(key, image):
+    with _cache_lock:
+        _image_cache[key] = image
+        _image_cache.move_to_end(key)
+        while len(_image_cache) > _MEMORY_CACHE_SIZE:
+            _image_cache.popitem(last=False)
+
+def _get_pool(max_workers=None):
+    """共用的绘图子进程池 (首次调用时创建，max_workers 只在创建时生效)"""
+    global _pool
+    with _pool_lock:
+        if _pool is None:
+            _pool = ProcessPoolExecutor(max_workers=max_workers, mp_context=multiprocessing.get_context('spawn'))
+        return _pool
+
+def _discard_pool():
+    """子进程异常退出后丢弃进程池，下次调用时重新创建"""
+    global _pool
+    with _pool_lock:
+        if _pool is not None:
+            _pool.shutdown(wait=False, cancel_futures=True)
+            _pool = None
+
+def _evict(cache_dir, max_bytes):
+    """磁盘缓存超过上限时，按 mtime 删除最久未使用的文件"""
+    entries = []
+    total = 0
+    with os.scandir(cache_dir) as it:
+        for entry in it:
+            if entry.name.endswith('.png'):
+                st = entry.stat()
+                entries.append((st.st_mtime, st.st_size, entry.path))
+                total += st.st_size
+    if total <= max_bytes:
+        return
+    for _, nbytes, path in sorted(entries):
+        try:
+            os.remove(path)
+        except OSError:
+            continue
+        total -= nbytes
+        if total <= max_bytes:
+            break
+
+def get_thumbnails(smiles_list, size=THUMB_SIZE, cache_dir=DEFAULT_CACHE_DIR, max_workers=None,
+                   max_bytes=CACHE_MAX_BYTES):
+    """
+    批量获取结构式缩略图
+    :param smiles_list: SMILES 序列，可包含空值
+    :param cache_dir: 磁盘缓存目录，为 None 时只使用内存缓存
+    :return: 与输入等长的列表，元素为 RGBA 图像数组，无法解析的 SMILES 为 None
+    """
+    _require_rdkit()
+    canon_of = {}
+    for s in smiles_list:
+        if s not in canon_of:
+            canon_of[s] = canonical_smiles(s)
+    keys = {c: _cache_key(c, size) for c in set(canon_of.values()) if c is not None}
+
+    # 本次调用的结果单独保存，结构数超过内存缓存上限时也不会在返回前被淘汰
+    images = {}
+    missing = []
+    for canon, key in keys.items():
+        image = _lookup(key)
+        path = os.path.join(cache_dir, key + '.png') if cache_dir else None
+        if image is None and path and os.path.exists(path):
+            os.utime(path)
+            image = mpimg.imread(path)
+            _remember(key, image)
+        if image is None:
+            missing.append(canon)
+        else:
+            images[key] = image
+
+    if missing:
+        pngs = None
+        if len(missing) > PARALLEL_THRESHOLD:
+            try:
+                pngs = list(_get_pool(max_workers).map(render_structure_png, missing, [size] * len(missing),
+                                                       chunksize=16))
+            except BrokenProcessPool:
+                _discard_pool()
+        if pngs is None:
+            pngs = [render_structure_png(c, size) for c in missing]
+
+        if cache_dir:
+            os.makedirs(cache_dir, exist_ok=True)
+        for canon, png in zip(missing, pngs):
+            key = keys[canon]
+            images[key] = mpimg.imread(io.BytesIO(png), format='png')
+            _remember(key, images[key])
+            if cache_dir:
+                # 先写临时文件再改名，并发渲染时不会读到半个文件
+                path = os.path.join(cache_dir, key + '.png')
+                tmp = f"{path}.{os.getpid()}.tmp"
+                with open(tmp, 'wb') as f:
+                    f.write(png)
+                os.replace(tmp, path)
+        if cache_dir:
+            _evict(cache_dir, max_bytes)
+
+    return [images[keys[canon_of[s]]] if canon_of[s] is not None else None for s in smiles_list]
+
+def add_thumbnails(ax, images, positions, size_pt, xycoords='data', offset=(0, 0), box_alignment=(0.5, 0.5),
+                   frame_colors=None):
+    """
+    以图像元素的形式在坐标轴上放置缩略图
+    :param positions: 每个缩略图的锚点坐标 (xycoords 坐标系)
+    :param size_pt: 缩略图显示边长 (磅)
+    :param offset: 相对锚点的偏移 (磅)
+    :param frame_colors: 可选，每个缩略图的边框颜色
+    :return: AnnotationBbox 列表 (不参与 tight_layout 计算)
+    """
+    boxes = []
+    for k, (image, xy) in enumerate(zip(images, positions)):
+        if image is None:
+            continue
+        color = frame_colors[k] if frame_colors is not None else None
+        box = AnnotationBbox(OffsetImage(image, zoom=size_pt / image.shape[0]), xy, xycoords=xycoords,
+                             xybox=offset, boxcoords='offset points', box_alignment=box_alignment,
+                             frameon=color is not None, pad=0.1,
+                             bboxprops=dict(edgecolor=color, linewidth=1.5) if color is not None else None,
+                             annotation_clip=False)
+        box.set_in_layout(False)
+        ax.add_artist(box)
+        boxes.append(box)
+    return boxes
@@ -0,0 +1,97 @@
+import numpy as np
+
+# ==============================
+# 时间序列降采样
+# ==============================
+# 输入为共享的 x (升序) 与多列 Y (n_points, n_series)，所有列一次性处理。
+# 缺失值 (NaN) 不参与比较，整段缺失时输出 NaN，绘图时自然断开。
+# x 为 NaN 的点无法分桶，先行剔除。
+
+def _finite_x(x, Y):
+    """统一为 float 数组 (Y 为二维)，并去掉 x 为 NaN 的行"""
+    x = np.asarray(x, dtype=float)
+    Y = np.asarray(Y, dtype=float)
+    if Y.ndim == 1:
+        Y = Y[:, None]
+    keep = ~np.isnan(x)
+    if not keep.all():
+        x, Y = x[keep], Y[keep]
+    return x, Y
+
+def minmax_downsample(x, Y, n_bins):
+    """
+    最小/最大值包络降采样：x 轴等分为 n_bins 段 (通常等于输出像素列数)，
+    每段保留各列的最小值点和最大值点 (按时间先后)，折线在像素级与原始数据一致
+    :return: (X_out, Y_out)，形状均为 (2 * 非空段数, n_series)
+    """
+    x, Y = _finite_x(x, Y)
+    n = len(x)
+    if n <= 2 * n_bins:
+        return np.repeat(x[:, None], Y.shape[1], axis=1), Y
+
+    span = x[-1] - x[0]
+    bins = np.minimum(((x - x[0]) / span * n_bins).astype(np.int64), n_bins - 1) if span > 0 else np.zeros(n, dtype=np.int64)
+    starts = np.flatnonzero(np.r_[True, bins[1:] != bins[:-1]])
+    seg = np.cumsum(np.r_[False, bins[1:] != bins[:-1]])
+
+    nan = np.isnan(Y)
+    rows = np.arange(n)[:, None]
+    big = np.iinfo(np.int64).max
+
+    lo = np.where(nan, np.inf, Y)
+    seg_min = np.minimum.reduceat(lo, starts, axis=0)
+    i_min = np.minimum.reduceat(np.where(lo == seg_min[seg], rows, big), starts, axis=0)
+
+    hi = np.where(nan, -np.inf, Y)
+    seg_max = np.maximum.reduceat(hi, starts, axis=0)
+    i_max = np.minimum.reduceat(np.where(hi == seg_max[seg], rows, big), starts, axis=0)
+
+    # 全部缺失的段：两个索引都指向段首，对应的值为 NaN
+    empty = np.isinf(seg_min)
+    i_min = np.where(empty, starts[:, None], i_min)
+    i_max = np.where(empty, starts[:, None], i_max)
+
+    first = np.minimum(i_min, i_max)
+    second = np.maximum(i_min, i_max)
+    idx = np.stack([first, second], axis=1).reshape(-1, Y.shape[1])
+
+    cols = np.arange(Y.shape[1])[None, :]
+    return x[idx], Y[idx, cols]
+
+def lttb_downsample(x, Y, n_out):
+    """
+    Largest-Triangle-Three-Buckets 降采样，每列保留 n_out 个点
+    逐桶推进 (算法本身有顺序依赖)，桶内计算对所有点、所有列向量化
+    :return: (X_out, Y_out)，形状均为 (n_out, n_series)
+    """
+    x, Y = _finite_x(x, Y)
+    n, m = Y.shape
+    if n <= n_out or n_out < 3:
+        return np.repeat(x[:, None], m, axis=1), Y
+
+    edges = np.linspace(1, n - 1, n_out - 1).astype(np.int64)
+    idx = np.empty((n_out, m), dtype=np.int64)
+    idx[0] = 0
+    idx[-1] = n - 1
+    cols = np.arange(m)
+
+    prev = np.zeros(m, dtype=np.int64)
+    for b in range(n_out - 2):
+        lo, hi = edges[b], edges[b + 1]
+        nxt_lo, nxt_hi = hi, edges[b + 2] if b + 2 < len(edges) else n
+        # 下一个桶的平均点：只对有效值求和计数，整段缺失的列得到 NaN (不经过 nanmean，不产生警告)
+        avg_x = x[nxt_lo:nxt_hi].mean()
+        block = Y[nxt_lo:nxt_hi]
+        valid = ~np.isnan(block)
+        with np.errstate(invalid='ignore'):
+            avg_y = np.where(valid, block, 0.0).sum(axis=0) / valid.sum(axis=0)
+        px, py = x[prev], Y[prev, cols]
+
+        bx = x[lo:hi, None]
+        by = Y[lo:hi]
+        area = np.abs((px - avg_x) * (by - py) - (px - bx) * (avg_y - py))
+        area = np.where(np.isnan(area), -1.0, area)
+        prev = lo + area.argmax(axis=0)
+        idx[b + 1] = prev
+
+    return x[idx], Y[idx, cols]
@@ -0,0 +1,108 @@
+import re
+import numpy as np
+import pandas as pd
+
+# ==============================
+# 能量跨度模型 (Kozuch–Shaik energetic span)
+# ==============================
+# 催化循环的 TOF 由一对状态决定：TOF 决定过渡态 (TDTS) 与 TOF 决定中间体 (TDI)。
+#   δE = T_TDTS - I_TDI            (TDTS 在 TDI 之后)
+#   δE = T_TDTS - I_TDI + ΔG_r     (TDTS 在 TDI 之前)
+#   TOF ≈ (k_B T / h) · exp(-δE / RT)
+# 所有路径 (列) 一起计算：过渡态 × 中间体 × 路径 的三维数组上一次取最大值，不需要逐条路径循环。
+
+BOLTZMANN = 1.380649e-23        # J/K
+PLANCK = 6.62607015e-34         # J·s
+GAS_CONSTANT = {'kcal/mol': 1.987204259e-3, 'kJ/mol': 8.314462618e-3, 'eV': 8.617333262e-5}
+
+# 步骤名中的 TS / ‡ / 过渡态 视为过渡态，例如 TS1、TS-2、Int1-TS2
+TS_PATTERN = re.compile(r'(?:^|[^A-Za-z])TS|‡|过渡态', re.IGNORECASE)
+
+def is_transition_state(steps, pattern=TS_PATTERN):
+    """按步骤名判断过渡态，返回布尔数组"""
+    return np.array([bool(pattern.search(str(s))) for s in steps])
+
+def span_states(energies, ts_mask):
+    """
+    对能量矩阵的每一列计算能量跨度
+    :param energies: (步骤, 路径) 能量数组，缺失值为 NaN
+    :param ts_mask: 每个步骤是否为过渡态；最后一个步骤若不是过渡态，视为再生的催化剂 (= 起点 + ΔG_r)，不作为中间体
+    :return: dict，各项均为长度等于路径数的数组：
+             span (δE)、tdts / tdi (步骤序号，无法计算时为 -1)、reaction_energy (ΔG_r)、tdts_after_tdi
+    """
+    E = np.asarray(energies, dtype=float)
+    if E.ndim == 1:
+        E = E[:, None]
+    n_steps, n_paths = E.shape
+    ts_mask = np.asarray(ts_mask, dtype=bool)
+    int_mask = ~ts_mask
+    if n_steps > 1 and not ts_mask[-1]:
+        int_mask[-1] = False
+
+    # ΔG_r：每条路径最后一个有效能量减第一个有效能量
+    valid = ~np.isnan(E)
+    cols = np.arange(n_paths)
+    first = valid.argmax(axis=0)
+    last = n_steps - 1 - valid[::-1].argmax(axis=0)
+    reaction_energy = np.where(valid.any(axis=0), E[last, cols] - E[first, cols], np.nan)
+
+    ts_idx = np.flatnonzero(ts_mask)
+    int_idx = np.flatnonzero(int_mask)
+    span = np.full(n_paths, np.nan)
+    tdts = np.full(n_paths, -1)
+    tdi = np.full(n_paths, -1)
+    if len(ts_idx) and len(int_idx):
+        after = ts_idx[:, None] > int_idx[None, :]                       # (TS, I)
+        spans = E[ts_idx][:, None, :] - E[int_idx][None, :, :]          # (TS, I, 路径)
+        spans = spans + np.where(after[:, :, None], 0.0, reaction_energy[None, None, :])
+        flat = np.where(np.isnan(spans), -np.inf, spans).reshape(-1, n_paths)
+        k = flat.argmax(axis=0)
+        best = flat[k, cols]
+        ok = np.isfinite(best)
+        span[ok] = best[ok]
+        tdts[ok] = ts_idx[k[ok] // len(int_idx)]
+        tdi[ok] = int_idx[k[ok] % len(int_idx)]
+
+    return {'span': span, 'tdts': tdts, 'tdi': tdi, 'reaction_energy': reaction_energy,
+            'tdts_after_tdi': tdts > tdi}
+
+def turnover_frequency(span, temperature=298.15, unit='kcal/mol'):
+    """能量跨度近似下的 TOF (s⁻¹)"""
+    if unit not in GAS_CONSTANT:
+        raise ValueError(f"不支持的能量单位: {unit}，可选 {', '.join(GAS_CONSTANT)}")
+    prefactor = BOLTZMANN * temperature / PLANCK
+    return prefactor * np.exp(-np.asarray(span, dtype=float) / (GAS_CONSTANT[unit] * temperature))
+
+def energetic_span(df, temperature=298.15, unit='kcal/mol', ts_mask=None):
+    """
+    批量能量跨度分析
+    :param df: 第一列为步骤名，其余数值列为各路径的相对自由能 (与 draw_energy_profile 相同)
+    :param temperature: 温度 (K)
+    :param unit: 能量单位 kcal/mol / kJ/mol / eV
+    :param ts_mask: 可选，每个步骤是否为过渡态；默认按步骤名识别 (TS / ‡ / 过渡态)
+    :return: 按 δE 从小到大排序的 DataFrame，
+             列为 rank, path, energetic_span, tdts, tdi, tdts_after_tdi, reaction_energy, tof
+    """
+    steps = df.iloc[:, 0].astype(str).values
+    path_cols = df.iloc[:, 1:].select_dtypes(include=[np.number]).columns
+    if len(path_cols) == 0:
+        raise ValueError("未找到数值列作为能量数据")
+    if ts_mask is None:
+        ts_mask = is_transition_state(steps)
+    if not np.any(ts_mask):
+        raise ValueError("未识别到过渡态，步骤名需包含 TS (例如 TS1)")
+
+    states = span_states(df[path_cols].to_numpy(dtype=float), ts_mask)
+    found = states['tdts'] >= 0
+    table = pd.DataFrame({
+        'path': [str(c) for c in path_cols],
+        'energetic_span': states['span'],
+        'tdts': np.where(found, steps[states['tdts']], None),
+        'tdi': np.where(found, steps[states['tdi']], None),
+        'tdts_after_tdi': np.where(found, states['tdts_after_tdi'], None),
+        'reaction_energy': states['reaction_energy'],
+        'tof': turnover_frequency(states['span'], temperature, unit),
+    })
+    table = table.sort_values('energetic_span', kind='stable', na_position='last').reset_index(drop=True)
+    table.insert(0, 'rank', np.arange(1, len(table) + 1))
+    return table
@@ -1,82 +1,151 @@
 import numpy as np
-import matplotlib.pyplot as plt
-from .utils import configure_mpl_fonts
+from matplotlib.collections import LineCollection
+from .utils import configure_mpl_fonts, as_frame, new_figure
+from .labels import place_labels
+from .energetics import is_transition_state, span_states
 
-def draw_energy_profile(df, font_size=12):
+LEVEL_WIDTH = 0.6
+GAP = 0.4
+CURVE_POINTS = 32           # 每段连接曲线的采样点数
+LABEL_PAD_PT = 3            # 标签与能级线的间距 (磅)
+MAX_LEGEND_PATHS = 20       # 路径数超过该值时不绘制图例
+
+def draw_energy_profile(df, font_size=12, highlight_span=False):
     """
     绘制反应能级图 (Reaction Energy Profile)
+    每条路径的能级线与全部连接曲线各为一个图元集合，能量标签按步骤列自动避让，数百条路径也能快速绘制
+    :param highlight_span: 标出每条路径的 TOF 决定过渡态 (▲) 与中间体 (▼)，并为 δE 最小的路径标注能量跨度
     """
     global_font = configure_mpl_fonts()
-    
+    df = as_frame(df)
+
     if df.shape[1] < 2:
         raise ValueError("数据列数不足，至少需要 2 列 (Step, Energy...)")
-    
+
     steps = df.iloc[:, 0].astype(str).values
     n_steps = len(steps)
-    
+
     path_cols = df.iloc[:, 1:].select_dtypes(include=[np.number]).columns
-    
+
     if len(path_cols) == 0:
         raise ValueError("未找到数值列作为能量数据")
-        
-    fig, ax = plt.subplots(figsize=(10, 7))
-    
+
+    energies = df[path_cols].to_numpy(dtype=float)      # (步骤, 路径)
+    centers = np.arange(n_steps) * (LEVEL_WIDTH + GAP)
+
+    fig, ax = new_figure(figsize=(min(max(10, n_steps * 0.9), 40), 7))
+
     colors = ['#d62728', '#1f77b4', '#2ca02c', '#ff7f0e', '#9467bd', '#8c564b']
-    
-    level_width = 0.6
-    gap = 0.4
-    
+    path_colors = [colors[idx % len(colors)] for idx in range(len(path_cols))]
+
+    # 连接曲线：相邻两个步骤都有能量时，用余弦插值连接前一能级的右端与后一能级的左端
+    t = np.linspace(0, 1, CURVE_POINTS)
+    ease = (1 - np.cos(t * np.pi)) / 2
+    segments = []
+    segment_colors = []
+
     for idx, col in enumerate(path_cols):
-        energies = df[col].values
-        color = colors[idx % len(colors)]
+        E = energies[:, idx]
+        valid = ~np.isnan(E)
+        color = path_colors[idx]
         label = str(col).replace('_Energy', '').replace('_', ' ')
-        
-        connector_x = []
-        connector_y = []
-        
-        for i, E in enumerate(energies):
-            if np.isnan(E): 
-                connector_x.append(None)
-                connector_y.append(None)
-                continue
-                
-            center_x = i * (level_width + gap)
-            
-            x_start = center_x - level_width / 2
-            x_end = center_x + level_width / 2
-            ax.plot([x_start, x_end], [E, E], color=color, linewidth=2.5, label=label if i == 0 else "")
-            
-            connector_x.append(center_x)
-            connector_y.append(E)
-            
-            ax.text(center_x, E + (1.0 if E >= 0 else -1.5), f"{E:.1f}", ha='center', va='bottom', 
-                    fontsize=int(font_size*0.8), color=color, fontweight='bold', fontproperties=global_font)
-
-        for i in range(len(connector_x) - 1):
-            if connector_x[i] is None or connector_x[i+1] is None:
-                continue
-                
-            x1 = connector_x[i] + level_width / 2
-            y1 = connector_y[i]
-            x2 = connector_x[i+1] - level_width / 2
-            y2 = connector_y[i+1]
-            
-            t = np.linspace(0, 1, 50)
-            x_smooth = x1 + (x2 - x1) * t
-            y_smooth = y1 + (y2 - y1) * (1 - np.cos(t * np.pi)) / 2
-            
-            ax.plot(x_smooth, y_smooth, color=color, linestyle='--', linewidth=1.2, alpha=0.6)
-            
-    ax.set_xticks([i * (level_width + gap) for i in range(n_steps)])
+
+        ax.hlines(E[valid], centers[valid] - LEVEL_WIDTH / 2, centers[valid] + LEVEL_WIDTH / 2,
+                  colors=color, linewidth=2.5, label=label)
+
+        pairs = valid[:-1] & valid[1:]
+        x1 = centers[:-1][pairs] + LEVEL_WIDTH / 2
+        x2 = centers[1:][pairs] - LEVEL_WIDTH / 2
+        y1 = E[:-1][pairs]
+        y2 = E[1:][pairs]
+        xs = x1[:, None] + (x2 - x1)[:, None] * t
+        ys = y1[:, None] + (y2 - y1)[:, None] * ease
+        segments.append(np.stack([xs, ys], axis=-1))
+        segment_colors += [color] * len(x1)
+
+    if segment_colors:
+        ax.add_collection(LineCollection(np.concatenate(segments), colors=segment_colors,
+                                         linestyles='--', linewidths=1.2, alpha=0.6))
+    ax.autoscale_view()
+
+    ax.set_xticks(centers)
     ax.set_xticklabels(steps, fontsize=font_size, fontweight='semibold', fontproperties=global_font)
-    
+
     ax.set_ylabel('相对吉布斯自由能 (kcal/mol)', fontsize=font_size, fontproperties=global_font)
-    
+
     ax.spines['top'].set_visible(False)
     ax.spines['right'].set_visible(False)
-    
-    ax.legend(frameon=False, loc='best', prop=global_font)
+
+    if highlight_span:
+        _draw_span_highlight(ax, centers, steps, energies, path_colors, font_size, global_font)
+
+    if len(path_cols) <= MAX_LEGEND_PATHS:
+        ax.legend(frameon=False, loc='best', prop=global_font)
     ax.set_title('反应能级图 (Reaction Energy Profile)', fontsize=int(font_size*1.3), pad=15, fontproperties=global_font)
-    
-    plt.tight_layout()
-    return fig
\ No newline at end of file
+
+    fig.tight_layout()
+    _draw_energy_labels(fig, ax, centers, energies, path_colors, int(font_size * 0.8), global_font)
+    return fig
+
+def _draw_span_highlight(ax, centers, steps, energies, path_colors, font_size, font):
+    """标出 TDTS / TDI (能级线左端的标记)，并用箭头标注 δE 最小路径的能量跨度"""
+    ts_mask = is_transition_state(steps)
+    if not ts_mask.any():
+        return
+    states = span_states(energies, ts_mask)
+    paths = np.flatnonzero(states['tdts'] >= 0)
+    if len(paths) == 0:
+        return
+    tdts, tdi = states['tdts'][paths], states['tdi'][paths]
+    colors = [path_colors[p] for p in paths]
+    x_left = -LEVEL_WIDTH / 2
+    ax.scatter(centers[tdts] + x_left, energies[tdts, paths], marker='^', s=60, c=colors,
+               edgecolors='black', linewidths=0.8, zorder=4, label='TDTS')
+    ax.scatter(centers[tdi] + x_left, energies[tdi, paths], marker='v', s=60, c=colors,
+               edgecolors='black', linewidths=0.8, zorder=4, label='TDI')
+
+    best = paths[np.argmin(states['span'][paths])]
+    t, i = states['tdts'][best], states['tdi'][best]
+    x = centers[t] + LEVEL_WIDTH / 2 + 0.05
+    y_ts, y_int = energies[t, best], energies[i, best]
+    ax.hlines(y_int, min(centers[i], x), max(centers[i], x), colors=path_colors[best], linestyles=':', linewidth=1.2)
+    ax.annotate('', xy=(x, y_ts), xytext=(x, y_int),
+                arrowprops=dict(arrowstyle='<->', color=path_colors[best], linewidth=1.5))
+    ax.text(x + 0.05, (y_ts + y_int) / 2, f"δE = {states['span'][best]:.1f}", ha='left', va='center',
+            fontsize=int(font_size * 0.9), color=path_colors[best], fontweight='bold', fontproperties=font)
+
+def _draw_energy_labels(fig, ax, centers, energies, path_colors, fontsize, font):
+    """
+    能量数值标签：正值放在能级线上方 (只向上避让)，负值放在下方 (只向下避让)，
+    同一步骤的标签按 place_labels 排开，并且不压在其他路径的能级线上
+    标签高度与坐标轴的像素高度换算为数据坐标；放下所有标签需要扩展 y 轴范围时重新换算
+    """
+    step_idx, path_idx = np.nonzero(~np.isnan(energies))
+    if len(step_idx) == 0:
+        return
+    values = energies[step_idx, path_idx]
+
+    axes_px = ax.get_window_extent().height
+    label_px = fontsize * 1.2 * fig.dpi / 72
+    pad_px = LABEL_PAD_PT * fig.dpi / 72
+    y0, y1 = ax.get_ylim()
+    for _ in range(4):
+        per_unit = axes_px / (y1 - y0)
+        height, pad = label_px / per_unit, pad_px / per_unit
+        positions = np.empty_like(values)
+        above = values >= 0
+        positions[above] = place_labels(step_idx[above], values[above] + pad, height,
+                                        obstacles=values, obstacle_groups=step_idx, pad=pad)
+        positions[~above] = place_labels(step_idx[~above], values[~above] - pad - height, height, direction=-1,
+                                         obstacles=values, obstacle_groups=step_idx, pad=pad)
+        lo, hi = min(y0, positions.min() - pad), max(y1, positions.max() + height + pad)
+        if lo >= y0 and hi <= y1:
+            break
+        y0, y1 = lo, hi
+        ax.set_ylim(y0, y1)
+
+    # 标签都在坐标轴范围内，不参与 bbox_inches='tight' 的边界计算
+    for s, p, v, y in zip(step_idx, path_idx, values, positions):
+        text = ax.text(centers[s], y, f"{v:.1f}", ha='center', va='bottom', fontsize=fontsize,
+                       color=path_colors[p], fontweight='bold', fontproperties=font)
+        text.set_in_layout(False)
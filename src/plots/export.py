@@ -0,0 +1,188 @@
+import re
+import zipfile
+from concurrent.futures import wait, FIRST_COMPLETED
+import pandas as pd
+from matplotlib.backends.backend_pdf import PdfPages
+from .heatmap import draw_heatmap, OVERVIEW_ROWS
+from .polar import draw_polar_bar, draw_radar_chart
+from .bar import draw_grouped_bar
+from .boxplot import draw_boxplot
+from .scatter import draw_optimization_bubble
+from .energy import draw_energy_profile
+from .kinetics import draw_kinetics
+from .render import submit, render_cached, MAX_BACKGROUND
+from .utils import as_frame
+
+# ==============================
+# 整个工作簿一键导出
+# ==============================
+# 图表类型 -> (绘图函数, 文件名前缀)，前缀与单独导出时一致
+CHART_TYPES = {
+    'heatmap': (draw_heatmap, 'heatmap'),
+    'polar': (draw_polar_bar, 'polar_bar'),
+    'bar': (draw_grouped_bar, 'fungicide_bar'),
+    'boxplot': (draw_boxplot, 'boxplot'),
+    'radar': (draw_radar_chart, 'radar'),
+    'bubble': (draw_optimization_bubble, 'bubble_opt'),
+    'energy': (draw_energy_profile, 'energy_profile'),
+    'kinetics': (draw_kinetics, 'kinetics'),
+}
+
+# 单个导出包同时在渲染池中的任务数 (排队 + 运行中 + 已完成待按序产出)，
+# 多个会话同时导出时也只占用少量渲染线程，不会挤占其他会话的交互式渲染
+BUNDLE_CONCURRENCY = min(2, MAX_BACKGROUND)
+
+_STEP_PATTERN = re.compile(r'^(TS|INT|IM)\d*', re.IGNORECASE)
+
+def detect_chart_types(df):
+    """
+    根据列结构判断工作表适合的图表类型
+    :return: CHART_TYPES 中的键列表
+    """
+    cols = list(df.columns)
+    if len(cols) < 2:
+        return []
+    numeric = {c for c in cols if pd.api.types.is_numeric_dtype(df[c])}
+
+    # 第一列为数值：时间 + 各组产率 -> 动力学曲线
+    if cols[0] in numeric:
+        if len(numeric) == len(cols) and df[cols[0]].dropna().is_monotonic_increasing:
+            return ['kinetics']
+        return []
+
+    # [条件A, 条件B, 产率, ee] -> 气泡图
+    if len(cols) >= 4 and cols[1] not in numeric and cols[2] in numeric and cols[3] in numeric:
+        return ['bubble']
+
+    rest_numeric = [c for c in cols[1:] if c in numeric]
+    if not rest_numeric:
+        return []
+
+    # 第一列为步骤名 (TS1 / INT2 ...) -> 能级图
+    first = df[cols[0]].astype(str).str.strip()
+    if str(cols[0]).strip().lower() in ('step', 'steps', '步骤') or first.str.match(_STEP_PATTERN).any():
+        return ['energy']
+
+    types = []
+    if len(rest_numeric) == len(cols) - 1:
+        types += ['heatmap', 'polar']
+    if len(rest_numeric) >= 2:
+        types.append('bar')
+    types.append('boxplot')
+    if len(rest_numeric) >= 3:
+        types.append('radar')
+    return types
+
+def chart_defaults(key, df):
+    """
+    随数据变化的默认参数，与单独绘制页面上各控件的默认值一致
+    :return: 参数字典，例如行数较多的热图默认使用概览模式
+    """
+    if key == 'heatmap':
+        return {'overview': len(df) > OVERVIEW_ROWS}
+    return {}
+
+def _bundle_tasks(sheets, font_size, chart_kwargs):
+    for sheet_name, sheet in sheets.items():
+        df = as_frame(sheet)
+        for key in detect_chart_types(df):
+            draw_func, prefix = CHART_TYPES[key]
+            kwargs = {**chart_defaults(key, df), **chart_kwargs.get(key, {})}
+            kwargs.setdefault('font_size', font_size)
+            yield sheet_name, key, prefix, draw_func, sheet, kwargs
+
+def _run_task(draw_func, sheet, kwargs, fmt, dpi):
+    # 同一工作表的多个图表并发绘制，各自使用独立的 DataFrame：
+    # 共享工作表每次从映射内存构建 (写时复制，不复制数据)，普通 DataFrame 复制一份
+    df = sheet.copy() if isinstance(sheet, pd.DataFrame) else as_frame(sheet)
+    if fmt != 'pdf':
+        return render_cached(draw_func, df, fmt=fmt, dpi=dpi, **kwargs)
+    result = draw_func(df, **kwargs)
+    return result if isinstance(result, (list, tuple)) else [result]
+
+def iter_bundle(sheets, font_size=16, chart_kwargs=None, fmt='png', dpi=300, errors=None):
+    """
+    并发渲染工作簿中所有适用的图表，按任务顺序 (工作表顺序 + 图表类型顺序) 逐个产出，每次运行的顺序相同
+    :param sheets: {工作表名: 清洗后的 DataFrame 或 ingest.SharedSheet}
+    :param chart_kwargs: {图表类型: 额外参数}，例如 {'heatmap': {'split_index': ...}}
+    :param fmt: 'png' / 'svg' 时产出图片字节，'pdf' 时产出 Figure 对象
+    :param errors: 可选列表，绘图失败的 (工作表, 图表类型, 错误信息) 追加到其中并跳过
+    :return: 生成器，产出 (文件名, 字节或 Figure, 已完成任务数, 任务总数)
+    """
+    tasks = list(_bundle_tasks(sheets, font_size, chart_kwargs or {}))
+    total = len(tasks)
+    pending = {}
+    finished = {}
+    next_submit = 0
+    next_yield = 0
+
+    # 在途 (渲染中 + 已完成但排在前面的任务尚未完成) 的任务数不超过 BUNDLE_CONCURRENCY，
+    # 结果按顺序产出后即可释放，内存不随工作簿大小增长；任务以批量优先级提交，为交互式渲染保留线程
+    try:
+        while next_yield < total:
+            while next_submit < total and len(pending) + len(finished) < BUNDLE_CONCURRENCY:
+                _, _, _, draw_func, df, kwargs = tasks[next_submit]
+                future = submit(_run_task, draw_func, df, kwargs, fmt, dpi, timeout=None, background=True)
+                pending[future] = next_submit
+                next_submit += 1
+
+            if next_yield not in finished:
+                done, _ = wait(pending, return_when=FIRST_COMPLETED)
+                for future in done:
+                    finished[pending.pop(future)] = future
+
+            while next_yield in finished:
+                future = finished.pop(next_yield)
+                sheet_name, key, prefix = tasks[next_yield][:3]
+                next_yield += 1
+                try:
+                    outputs = future.result()
+                except Exception as e:
+                    if errors is None:
+                        raise
+                    errors.append((sheet_name, key, str(e)))
+                    continue
+                numbered = key == 'heatmap' or len(outputs) > 1
+                for i, out in enumerate(outputs):
+                    stem = f"{prefix}_{sheet_name}_{i+1}" if numbered else f"{prefix}_{sheet_name}"
+                    yield f"{stem}.{fmt}", out, next_yield, total
+    finally:
+        # 调用方提前停止 (例如后台任务被取消) 时，撤销尚未开始的渲染
+        for future in pending:
+            future.cancel()
+
+def write_zip_bundle(sheets, out, progress=None, dpi=300, fmt='png', **kwargs):
+    """
+    将所有图表逐个写入 ZIP，每张图完成后立即落盘
+    :param out: 可写的二进制文件对象或路径
+    :param fmt: 'png' 或 'svg' (SVG 内嵌字体子集)
+    :param progress: 可选回调 progress(已完成, 总数, 文件名)
+    :return: (写入的图片数, 失败列表)
+    """
+    n = 0
+    errors = []
+    with zipfile.ZipFile(out, 'w', compression=zipfile.ZIP_STORED) as zf:
+        for name, data, done, total in iter_bundle(sheets, fmt=fmt, dpi=dpi, errors=errors, **kwargs):
+            zf.writestr(name, data)
+            n += 1
+            if progress:
+                progress(done, total, name)
+        if errors:
+            zf.writestr('errors.txt', '\n'.join(f"{s} / {k}: {msg}" for s, k, msg in errors))
+    return n, errors
+
+def write_pdf_bundle(sheets, out, progress=None, **kwargs):
+    """
+    将所有图表写入多页 PDF，每张图一页，按任务顺序追加
+    :param out: 可写的二进制文件对象或路径
+    :return: (写入的页数, 失败列表)
+    """
+    n = 0
+    errors = []
+    with PdfPages(out) as pdf:
+        for name, fig, done, total in iter_bundle(sheets, fmt='pdf', errors=errors, **kwargs):
+            pdf.savefig(fig, bbox_inches='tight')
+            n += 1
+            if progress:
+                progress(done, total, name)
+    return n, errors
@@ -0,0 +1,118 @@
+import re
+import base64
+from io import BytesIO
+from functools import lru_cache
+import xml.etree.ElementTree as ET
+from fontTools import subset
+from fontTools.ttLib import TTFont
+import matplotlib.font_manager as fm
+from matplotlib.font_manager import FontProperties
+from .utils import get_chinese_font
+
+# ==============================
+# 矢量图字体子集化
+# ==============================
+# PDF: pdf.fonttype = 42 时 matplotlib 自动只嵌入用到的字形 (见 configure_mpl_fonts)。
+# SVG: svg.fonttype = 'none' 时文字以 <text> 保存，这里把图中用到的每种字体 (中文字体、刻度标签的
+#      西文字体等) 裁剪为实际用到的字符，以 WOFF 数据 URI 的形式内嵌 @font-face，
+#      文件既小又能在未安装这些字体的电脑上正确显示。
+
+_SVG_OPEN = re.compile(rb'<svg\b[^>]*>')
+_GENERIC_FAMILIES = {'serif', 'sans-serif', 'monospace', 'cursive', 'fantasy'}
+
+@lru_cache(maxsize=64)
+def subset_font(path, chars):
+    """
+    将字体裁剪为只包含指定字符的 WOFF 字节 (按字体文件 + 字符集缓存)
+    :param chars: 排序去重后的字符串
+    """
+    options = subset.Options()
+    options.drop_tables += ['FFTM']
+    # .ttc 字体集合取第一个字体，与 matplotlib 使用的字体一致
+    font = TTFont(path, fontNumber=0) if path.lower().endswith(('.ttc', '.otc')) else TTFont(path)
+    subsetter = subset.Subsetter(options)
+    subsetter.populate(text=chars)
+    subsetter.subset(font)
+    font.flavor = 'woff'
+    buf = BytesIO()
+    font.save(buf)
+    return buf.getvalue()
+
+def _parse_style(style):
+    """解析 style 属性为 {属性: 值}"""
+    items = (part.split(':', 1) for part in (style or '').split(';') if ':' in part)
+    return {k.strip(): v.strip() for k, v in items}
+
+def _font_key(style):
+    """(字体族列表, 字重, 字形)；字体族按 CSS 列表顺序，去掉引号"""
+    families = tuple(f.strip().strip('\'"') for f in style.get('font-family', '').split(',') if f.strip())
+    return families, style.get('font-weight', 'normal'), style.get('font-style', 'normal')
+
+def svg_text_fonts(svg_bytes):
+    """
+    收集 SVG 中 <text> / <tspan> 用到的字符，按字体分组 (子元素继承父元素的字体样式)
+    :return: {(字体族列表, 字重, 字形): 排序去重后的字符串}
+    """
+    groups = {}
+
+    def walk(el, inherited):
+        style = {**inherited, **_parse_style(el.get('style'))}
+        is_text = el.tag.rsplit('}', 1)[-1] in ('text', 'tspan')
+        if is_text and el.text:
+            groups.setdefault(_font_key(style), set()).update(el.text)
+        for child in el:
+            walk(child, style)
+            if is_text and child.tail:
+                groups.setdefault(_font_key(style), set()).update(child.tail)
+
+    walk(ET.fromstring(svg_bytes), {})
+    result = {}
+    for key, chars in groups.items():
+        chars.discard('\n')
+        if key[0] and chars:
+            result[key] = ''.join(sorted(chars))
+    return result
+
+def _font_file(families, weight, style):
+    """按 matplotlib 的字体查找规则解析实际使用的字体文件 (与绘图排版时一致)"""
+    cjk = get_chinese_font()
+    if families[0] == cjk.get_name() and cjk.get_file():
+        return str(cjk.get_file())
+    try:
+        weight = int(weight)
+    except ValueError:
+        pass
+    return fm.findfont(FontProperties(family=list(families), weight=weight, style=style))
+
+def embed_svg_fonts(svg_bytes):
+    """
+    为 SVG 中用到的每种字体 (字体族 + 字重 + 字形) 内嵌字体子集，包括中文字体与刻度标签等使用的西文字体；
+    @font-face 以 SVG 中列出的首选字体族命名，查看器按名称匹配后使用与 matplotlib 排版时相同的字体文件。
+    找不到字体文件或没有文字时原样返回
+    """
+    fonts = svg_text_fonts(svg_bytes)
+    m = _SVG_OPEN.search(svg_bytes)
+    if not fonts or m is None:
+        return svg_bytes
+
+    # @font-face 按 (首选字体族, 字重, 字形) 区分，同名的多个字体列表合并字符后只声明一次
+    merged = {}
+    for (families, weight, style), chars in fonts.items():
+        if families[0] in _GENERIC_FAMILIES:
+            continue
+        key = (families[0], weight, style)
+        prev = merged.get(key)
+        merged[key] = (families, chars) if prev is None else (prev[0], ''.join(sorted(set(prev[1] + chars))))
+
+    faces = []
+    for (_, weight, style), (families, chars) in merged.items():
+        path = _font_file(families, weight, style)
+        if not path:
+            continue
+        data = base64.b64encode(subset_font(path, chars)).decode('ascii')
+        faces.append(f"@font-face {{font-family: '{families[0]}'; font-weight: {weight}; font-style: {style}; "
+                     f"src: url(data:font/woff;base64,{data}) format('woff');}}")
+    if not faces:
+        return svg_bytes
+    block = f"<defs><style type=\"text/css\">{' '.join(faces)}</style></defs>".encode('utf-8')
+    return svg_bytes[:m.end()] + block + svg_bytes[m.end():]
@@ -1,26 +1,37 @@
-import pandas as pd
-import matplotlib.pyplot as plt
+import numpy as np
 import seaborn as sns
 import matplotlib.colors as mcolors
-from .utils import configure_mpl_fonts, sort_key
+from wells import sort_key
+from .utils import configure_mpl_fonts, as_frame, new_figure, coerce_numeric
+from .cluster import cluster_order
+from .depict import get_thumbnails, add_thumbnails
+from .cache import frame_digest
 
-def draw_heatmap(df, split_index=None, cmap_name="academic_red", font_size=16):
+OVERVIEW_ROWS = 2000        # 行数超过该值时默认使用概览模式 (页面与一键导出共用)
+
+def _prepare_pages(df, split_index=None, order="sort", linkage_method="average", smiles_col=None):
     """
-    绘制热图
-    :param df: 数据 DataFrame
-    :param split_index: 分割点索引
-    :param cmap_name: 颜色主题名
-    :param font_size: 基础字体大小
+    数据清洗、排序 / 聚类与分页
+    :return: (整理后的 DataFrame, 各页 DataFrame 列表, 对齐的 SMILES 或 None, 聚类连接矩阵或 None)
     """
-    global_font = configure_mpl_fonts()
+    df = as_frame(df)
     
-    # 数据清洗
+    # 数据清洗 (不修改调用方的数据，按页缓存时同一份数据会被多次使用)
     if '生测编号' in df.columns:
-        df.set_index('生测编号', inplace=True)
+        df = df.set_index('生测编号')
     else:
-        df.set_index(df.columns[0], inplace=True)
+        df = df.set_index(df.columns[0])
+
+    # SMILES 列不参与数值计算
+    smiles = None
+    for c in [c for c in df.columns if c == smiles_col or str(c).strip().lower() == 'smiles']:
+        col = df.pop(c)
+        if c == smiles_col:
+            smiles = col
+    if smiles_col is not None and smiles is None:
+        raise ValueError(f"未找到 SMILES 列: {smiles_col}")
     
-    df = df.apply(pd.to_numeric, errors='coerce').fillna(0)
+    df = coerce_numeric(df).fillna(0)
     
     if df.max().max() <= 1.0:
          df = df * 100
@@ -28,9 +39,18 @@ def draw_heatmap(df, split_index=None, cmap_name="academic_red", font_size=16):
     try:
         sorted_index = sorted(df.index, key=sort_key)
         df = df.reindex(sorted_index)
+        if smiles is not None:
+            smiles = smiles.reindex(sorted_index)
     except Exception:
         pass
 
+    linkage_matrix = None
+    if order == "cluster" and len(df) > 1:
+        row_order, linkage_matrix = cluster_order(df.values, method=linkage_method)
+        df = df.iloc[row_order]
+        if smiles is not None:
+            smiles = smiles.iloc[row_order]
+
     dfs_to_plot = []
     if split_index and split_index in df.index:
         split_pos = df.index.get_loc(split_index)
@@ -39,6 +59,51 @@ def draw_heatmap(df, split_index=None, cmap_name="academic_red", font_size=16):
             dfs_to_plot.append(df.iloc[split_pos+1:])
     else:
         dfs_to_plot.append(df)
+
+    return df, dfs_to_plot, smiles, linkage_matrix
+
+def heatmap_page_digests(df, split_index=None, order="sort", linkage_method="average", smiles_col=None, **_):
+    """
+    各页内容的哈希 (数值、行列标签与 SMILES)，用于按页缓存渲染结果
+    其余绘图参数 (配色、字体等) 由调用方另行计入缓存键
+    """
+    _, dfs_to_plot, smiles, _ = _prepare_pages(df, split_index, order, linkage_method, smiles_col)
+    digests = []
+    row_start = 0
+    for df_sub in dfs_to_plot:
+        page_start, row_start = row_start, row_start + len(df_sub)
+        digest = frame_digest(df_sub)
+        if smiles is not None:
+            digest += frame_digest(smiles.iloc[page_start:row_start])
+        digests.append(digest)
+    return digests
+
+def draw_heatmap(df, split_index=None, cmap_name="academic_red", font_size=16,
+                 order="sort", dendrogram=False, linkage_method="average",
+                 overview=False, reduce="mean", dpi=300, smiles_col=None, pages=None):
+    """
+    绘制热图
+    :param df: 数据 DataFrame
+    :param split_index: 分割点索引
+    :param cmap_name: 颜色主题名
+    :param font_size: 基础字体大小
+    :param order: 行排序方式，"sort" 按编号排序，"cluster" 按活性谱相似性聚类排序
+    :param dendrogram: 聚类排序时是否在左侧绘制树状图（仅精确聚类且未分割时有效）
+    :param linkage_method: 层次聚类连接方式
+    :param overview: 概览模式，整个矩阵绘制为一张图像，行数超过像素数时按像素分块聚合，不标注数值
+    :param reduce: 概览模式下的分块聚合方式 (mean / max / min)
+    :param dpi: 概览模式的目标输出分辨率，用于计算像素行数
+    :param smiles_col: 可选的 SMILES 列名，给出时在行标签旁绘制结构式缩略图 (需要 rdkit，概览模式下不绘制)
+    :param pages: 可选，只绘制指定序号的页 (按页缓存时使用)，返回的图按页序排列
+    """
+    global_font = configure_mpl_fonts()
+    df, dfs_to_plot, smiles, linkage_matrix = _prepare_pages(df, split_index, order, linkage_method, smiles_col)
+
+    thumbnails = None
+    if smiles is not None and not overview:
+        thumbnails = get_thumbnails(smiles.tolist())
+
+    show_dendrogram = dendrogram and linkage_matrix is not None and len(dfs_to_plot) == 1
         
     figures = []
     
@@ -53,16 +118,28 @@ def draw_heatmap(df, split_index=None, cmap_name="academic_red", font_size=16):
     else:
         cmap = "YlOrRd"
 
+    if overview:
+        return [_draw_overview(df, cmap, font_size, global_font, reduce, dpi)]
+
     cell_width = 1.15
     cell_height = 0.65
     
-    for df_sub in dfs_to_plot:
+    row_start = 0
+    for page, df_sub in enumerate(dfs_to_plot):
+        page_start, row_start = row_start, row_start + len(df_sub)
         if df_sub.empty: continue
+        if pages is not None and page not in pages: continue
         
         n_rows, n_cols = df_sub.shape
         fig_w = n_cols * cell_width + 3
         fig_h = n_rows * cell_height + 2
-        fig, ax = plt.subplots(figsize=(fig_w, fig_h))
+        if show_dendrogram:
+            dendro_w = 1.5
+            fig, (dax, ax) = new_figure(1, 2, figsize=(fig_w + dendro_w, fig_h),
+                                          gridspec_kw={'width_ratios': [dendro_w, fig_w]})
+            _draw_dendrogram(dax, linkage_matrix, n_rows)
+        else:
+            fig, ax = new_figure(figsize=(fig_w, fig_h))
         
         sns.heatmap(df_sub, ax=ax, cmap=cmap, vmin=0, vmax=100, annot=False,
                     linewidths=0.4, linecolor="white", cbar_kws={'fraction': 0.04, 'pad': 0.04})
@@ -80,6 +157,13 @@ def draw_heatmap(df, split_index=None, cmap_name="academic_red", font_size=16):
         ax.yaxis.set_tick_params(length=0)
         ax.set_yticklabels(ax.get_yticklabels(), rotation=0, ha='right', fontproperties=global_font, fontsize=font_size)
         ax.set_ylabel('生测编号', fontproperties=global_font, fontsize=int(font_size*1.5))
+
+        if thumbnails is not None:
+            # 缩略图放在坐标轴与行标签之间
+            thumb_pt = cell_height * 72 * 0.92
+            add_thumbnails(ax, thumbnails[page_start:row_start], [(0, i + 0.5) for i in range(n_rows)], thumb_pt,
+                           xycoords=('axes fraction', 'data'), offset=(-3, 0), box_alignment=(1, 0.5))
+            ax.yaxis.set_tick_params(pad=thumb_pt + 6)
         
         ax.text(0.5, 1.04, '处理浓度 (ppm)', transform=ax.transAxes, ha='center', va='bottom',
                 fontsize=font_size, fontweight='semibold', fontproperties=global_font)
@@ -88,7 +172,77 @@ def draw_heatmap(df, split_index=None, cmap_name="academic_red", font_size=16):
         cbar.set_label('死亡率 (%)', fontproperties=global_font, fontsize=int(font_size*0.875))
         
         ax.spines['bottom'].set_visible(False)
-        plt.tight_layout()
+        fig.tight_layout()
         figures.append(fig)
         
-    return figures
\ No newline at end of file
+    return figures
+
+# 按页缓存渲染结果时使用 (见 render.render_cached)
+draw_heatmap.page_digests = heatmap_page_digests
+
+def _draw_dendrogram(ax, linkage_matrix, n_rows):
+    """在热图左侧绘制与行顺序对齐的树状图"""
+    from scipy.cluster.hierarchy import dendrogram
+    dendrogram(linkage_matrix, ax=ax, orientation='left', no_labels=True,
+               color_threshold=0, above_threshold_color='#555555')
+    # scipy 的叶节点位于 5, 15, 25...，翻转后与热图自上而下的行对齐
+    ax.set_ylim(n_rows * 10, 0)
+    ax.set_xticks([])
+    ax.set_yticks([])
+    for spine in ax.spines.values():
+        spine.set_visible(False)
+
+_REDUCERS = {'mean': np.nanmean, 'max': np.nanmax, 'min': np.nanmin}
+
+def block_reduce_rows(values, block, reduce="mean"):
+    """
+    将连续的 block 行聚合为一行 (向量化)
+    :param values: (n_rows, n_cols) 数值矩阵
+    :return: (ceil(n_rows / block), n_cols) 矩阵
+    """
+    if reduce not in _REDUCERS:
+        raise ValueError(f"不支持的聚合方式: {reduce}")
+    n_rows, n_cols = values.shape
+    if block <= 1:
+        return values
+    n_blocks = -(-n_rows // block)
+    padded = np.full((n_blocks * block, n_cols), np.nan)
+    padded[:n_rows] = values
+    return _REDUCERS[reduce](padded.reshape(n_blocks, block, n_cols), axis=1)
+
+def _draw_overview(df, cmap, font_size, global_font, reduce, dpi, fig_h=10, n_labels=25):
+    """概览热图：图像尺寸固定，耗时与行数无关"""
+    n_rows, n_cols = df.shape
+    fig_w = n_cols * 1.15 + 3
+    fig, ax = new_figure(figsize=(fig_w, fig_h))
+
+    # 坐标轴约占图高的 80%，据此计算输出的像素行数
+    px_rows = max(int(fig_h * 0.8 * dpi), 1)
+    block = max(-(-n_rows // px_rows), 1)
+    image = block_reduce_rows(df.to_numpy(dtype=float), block, reduce)
+
+    im = ax.imshow(image, aspect='auto', interpolation='nearest', cmap=cmap, vmin=0, vmax=100,
+                   extent=(0, n_cols, n_rows, 0))
+
+    ax.xaxis.tick_top()
+    ax.set_xticks(np.arange(n_cols) + 0.5)
+    ax.set_xticklabels([str(c) for c in df.columns], rotation=0, ha='center', fontsize=font_size, fontproperties=global_font)
+
+    tick_rows = np.unique(np.linspace(0, n_rows - 1, min(n_labels, n_rows)).astype(int))
+    ax.set_yticks(tick_rows + 0.5)
+    ax.set_yticklabels([str(df.index[i]) for i in tick_rows], fontproperties=global_font, fontsize=int(font_size*0.75))
+    ax.yaxis.set_tick_params(length=0)
+    ax.set_ylabel('生测编号', fontproperties=global_font, fontsize=int(font_size*1.5))
+
+    reduce_label = {'mean': '均值', 'max': '最大值', 'min': '最小值'}[reduce]
+    title = f'处理浓度 (ppm) — 共 {n_rows} 行' + (f'，每 {block} 行取{reduce_label}' if block > 1 else '')
+    ax.text(0.5, 1.04, title, transform=ax.transAxes, ha='center', va='bottom',
+            fontsize=font_size, fontweight='semibold', fontproperties=global_font)
+
+    cbar = fig.colorbar(im, ax=ax, fraction=0.04, pad=0.04)
+    cbar.set_label('死亡率 (%)', fontproperties=global_font, fontsize=int(font_size*0.875))
+
+    for spine in ax.spines.values():
+        spine.set_visible(False)
+    fig.tight_layout()
+    return fig
@@ -0,0 +1,175 @@
+import os
+import time
+import uuid
+import threading
+from concurrent.futures import ThreadPoolExecutor
+from .render import render_cached, submit
+
+# ==============================
+# 后台渲染任务
+# ==============================
+# 任务在独立的线程池中执行，句柄 (RenderJob) 可保存在 st.session_state 中：
+# 页面重新运行不会丢弃正在进行的渲染，页面只需轮询句柄的进度并在完成后取结果。
+# 任务线程只负责调度与汇报进度，绘图与导出都提交到 render 的渲染线程池 (有界队列 + 背压)，
+# 实际并发的绘图数始终不超过 render.MAX_WORKERS；任务线程池与渲染池分开，在任务中等待渲染不会互相阻塞。
+# 排队与运行中的任务总数有上限，超出时 start_job 直接拒绝 (JobQueueFull)，不会无限堆积。
+# 批量任务 (background=True，如导出包) 的总数少于任务线程数，交互式渲染始终有空闲的任务线程，
+# 其绘图也以交互优先级提交到渲染池 (见 render.MAX_BACKGROUND)，不会排在批量任务之后。
+MAX_JOBS = max(2, min(4, os.cpu_count() or 1))
+MAX_PENDING_JOBS = MAX_JOBS * 4
+MAX_BACKGROUND_JOBS = MAX_JOBS - 1
+
+_executor = None
+_slots = None
+_background_slots = None
+_init_lock = threading.Lock()
+
+def _get_executor():
+    global _executor, _slots, _background_slots
+    if _executor is None:
+        with _init_lock:
+            if _executor is None:
+                _slots = threading.BoundedSemaphore(MAX_PENDING_JOBS)
+                _background_slots = threading.BoundedSemaphore(MAX_BACKGROUND_JOBS)
+                _executor = ThreadPoolExecutor(max_workers=MAX_JOBS, thread_name_prefix='job')
+    return _executor, _slots
+
+class JobCancelled(Exception):
+    """任务被取消"""
+
+class JobQueueFull(RuntimeError):
+    """后台任务数已达上限"""
+
+class RenderJob:
+    """
+    后台任务句柄
+    stage / done / total 由任务线程更新，页面线程只读；取消通过 Event 传递，在任务的检查点生效
+    """
+
+    def __init__(self, name='', background=False):
+        self.id = uuid.uuid4().hex[:8]
+        self.name = name
+        self.background = background
+        self.stage = '排队中'
+        self.done = 0
+        self.total = 0
+        self.created = time.time()
+        self.finished = None
+        self.future = None
+        self._cancel = threading.Event()
+
+    def update(self, done=None, total=None, stage=None):
+        """更新进度，同时作为取消检查点"""
+        if done is not None:
+            self.done = done
+        if total is not None:
+            self.total = total
+        if stage is not None:
+            self.stage = stage
+        self.check_cancelled()
+
+    def check_cancelled(self):
+        if self._cancel.is_set():
+            raise JobCancelled()
+
+    def cancel(self):
+        """请求取消：尚未开始的任务直接取消，运行中的任务在下一个检查点退出"""
+        self._cancel.set()
+        if self.future is not None:
+            self.future.cancel()
+
+    @property
+    def status(self):
+        """'pending' / 'running' / 'done' / 'error' / 'cancelled'"""
+        f = self.future
+        if f is None or (not f.running() and not f.done()):
+            return 'cancelled' if self._cancel.is_set() else 'pending'
+        if f.running():
+            return 'running'
+        if f.cancelled() or isinstance(f.exception(), JobCancelled):
+            return 'cancelled'
+        return 'error' if f.exception() is not None else 'done'
+
+    @property
+    def progress(self):
+        return self.done / self.total if self.total else 0.0
+
+    @property
+    def elapsed(self):
+        return (self.finished or time.time()) - self.created
+
+    @property
+    def result(self):
+        return self.future.result() if self.status == 'done' else None
+
+    @property
+    def error(self):
+        return self.future.exception() if self.status == 'error' else None
+
+def start_job(func, *args, name='', background=False, **kwargs):
+    """
+    提交任意任务：func(job, *args, **kwargs)，可通过 job.update() 报告进度
+    排队与运行中的任务已达 MAX_PENDING_JOBS (批量任务为 MAX_BACKGROUND_JOBS) 时抛出 JobQueueFull
+    :param background: 批量任务 (如导出包)，数量受限且其渲染让位于交互式渲染
+    :return: RenderJob
+    """
+    executor, slots = _get_executor()
+    held = [slots]
+    if background:
+        if not _background_slots.acquire(blocking=False):
+            raise JobQueueFull("导出任务过多，请等待当前导出完成或取消后重试")
+        held.insert(0, _background_slots)
+    if not slots.acquire(blocking=False):
+        for sem in held[:-1]:
+            sem.release()
+        raise JobQueueFull("后台任务过多，请等待当前任务完成或取消后重试")
+    job = RenderJob(name, background=background)
+
+    def release(_=None):
+        for sem in held:
+            sem.release()
+
+    def run():
+        job.check_cancelled()
+        job.stage = '运行中'
+        try:
+            return func(job, *args, **kwargs)
+        finally:
+            job.finished = time.time()
+
+    try:
+        job.future = executor.submit(run)
+    except Exception:
+        release()
+        raise
+    job.future.add_done_callback(release)
+    return job
+
+def render_pages(job, draw_func, *args, fmt='png', dpi=300, **kwargs):
+    """
+    绘图并逐页导出，结果与 render() 相同；绘图在渲染线程池中执行，任务线程等待其完成
+    进度按导出的页数计算；开始绘图前、绘图与导出之间、每页之间均可取消；内容与参数未变的页直接取缓存
+    """
+    def report(done, total):
+        job.update(done=done, total=total, stage=f'已完成 {done}/{total} 页')
+
+    def run():
+        job.update(stage='绘图中')
+        return render_cached(draw_func, *args, fmt=fmt, dpi=dpi, progress=report, **kwargs)
+
+    job.update(stage='等待渲染')
+    future = submit(run, timeout=None, background=job.background)
+    try:
+        outputs = future.result()
+    except BaseException:
+        future.cancel()
+        raise
+    job.stage = '完成'
+    return outputs
+
+def start_render_job(draw_func, *args, name='', fmt='png', dpi=300, **kwargs):
+    """
+    后台执行绘图并导出
+    :return: RenderJob，完成后 result 为图片字节列表
+    """
+    return start_job(render_pages, draw_func, *args, name=name, fmt=fmt, dpi=dpi, **kwargs)
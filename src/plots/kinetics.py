@@ -1,14 +1,22 @@
-import matplotlib.pyplot as plt
 import seaborn as sns
 import numpy as np
-from .utils import configure_mpl_fonts
+from .utils import configure_mpl_fonts, as_frame, new_figure, coerce_numeric
+from .downsample import minmax_downsample, lttb_downsample
 
-def draw_kinetics(df, font_size=14):
+FIG_SIZE = (10, 6)
+AXES_WIDTH_FRACTION = 0.8   # 坐标轴约占图宽的比例，用于估算输出像素列数
+MARKER_SPACING = 0.05       # 降采样时标记点间距 (占坐标轴对角线长度的比例)
+
+def draw_kinetics(df, font_size=14, downsample="minmax", xlim=None, dpi=300):
     """
     绘制反应动力学曲线
     :param df: 第一列必须是时间（数值），后续列为各组实验的产率/转化率
+    :param downsample: 点数超过输出像素时的降采样方式 ("minmax" / "lttb" / None)
+    :param xlim: 缩放范围 (t_min, t_max)，指定后只绘制该范围内的数据，范围内点数仍远超像素列数时同样降采样
+    :param dpi: 目标输出分辨率，用于计算像素列数
     """
     global_font = configure_mpl_fonts()
+    df = as_frame(df)
     
     # 确保第一列作为时间轴
     time_col = df.columns[0]
@@ -19,8 +27,27 @@ def draw_kinetics(df, font_size=14):
         df.index = df.index.astype(float)
     except:
         raise ValueError("第一列必须是代表时间的数值")
-        
-    fig, ax = plt.subplots(figsize=(10, 6))
+    # 空白时间单元格 (如 Excel 导出末尾的空行) 无法定位，直接丢弃
+    df = df[df.index.notna()]
+
+    if not df.index.is_monotonic_increasing:
+        df = df.sort_index()
+    if xlim is not None:
+        df = df.loc[xlim[0]:xlim[1]]
+
+    # 点数远超输出像素列数时先降采样，所有列一次性处理
+    n_px = int(FIG_SIZE[0] * AXES_WIDTH_FRACTION * dpi)
+    reduced = None
+    if downsample and len(df) > 2 * n_px:
+        values = coerce_numeric(df).to_numpy(dtype=float)
+        if downsample == "lttb":
+            reduced = lttb_downsample(df.index.values, values, 2 * n_px)
+        elif downsample == "minmax":
+            reduced = minmax_downsample(df.index.values, values, n_px)
+        else:
+            raise ValueError(f"不支持的降采样方式: {downsample}")
+
+    fig, ax = new_figure(figsize=FIG_SIZE)
     
     # 定义一组清晰的标记形状和颜色
     markers = ['o', 's', '^', 'D', 'v', '<', '>', 'p', '*']
@@ -28,10 +55,17 @@ def draw_kinetics(df, font_size=14):
     
     for i, col in enumerate(df.columns):
         # 提取数据并去除空值
-        series = df[col].dropna()
+        if reduced is None:
+            series = df[col].dropna()
+            x_vals, y_vals = series.index, series.values
+        else:
+            x_vals, y_vals = reduced[0][:, i], reduced[1][:, i]
+            keep = ~np.isnan(y_vals)
+            x_vals, y_vals = x_vals[keep], y_vals[keep]
         
-        ax.plot(series.index, series.values, 
+        ax.plot(x_vals, y_vals, 
                 marker=markers[i % len(markers)], 
+                markevery=MARKER_SPACING if reduced is not None else None,
                 color=colors[i % len(colors)],
                 linewidth=2.5, 
                 markersize=8, 
@@ -56,9 +90,12 @@ def draw_kinetics(df, font_size=14):
     ax.spines['top'].set_visible(False)
     ax.spines['right'].set_visible(False)
     
+    if xlim is not None:
+        ax.set_xlim(xlim)
+    
     # 尝试设置Y轴范围（如果是产率通常在0-100）
     if df.max().max() <= 105 and df.min().min() >= -5:
         ax.set_ylim(-2, 105)
     
-    plt.tight_layout()
+    fig.tight_layout()
     return fig
\ No newline at end of file
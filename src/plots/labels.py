@@ -0,0 +1,101 @@
+import numpy as np
+
+# ==============================
+# 数值标签避让
+# ==============================
+# 同一列 (例如能级图的同一个步骤) 的标签只在竖直方向、且只朝远离所标注对象的方向移动：
+# 按期望位置排序后自下而上扫描，每个标签放在 max(期望位置, 下一个标签的上沿)。
+# 令 z_i = y_i - i*h，扫描等价于对 z 求分组累计最大值，整体复杂度由排序决定，为 O(n log n)，
+# 全部向量化，不需要逐对迭代排斥。
+# 可选的障碍物 (如能级线) 为固定的水平线：标签与其相交时越过该线，作为固定下界重新扫描，
+# 每个标签上方的第一条线用二分查找一次性求出，同样全部向量化。
+
+def place_labels(groups, desired, height, direction=1, obstacles=None, obstacle_groups=None, pad=0.0):
+    """
+    按列分组的一维标签避让
+    :param groups: 每个标签所属的列 (整数，如步骤序号)
+    :param desired: 每个标签的期望位置 (标签下沿，数据坐标)
+    :param height: 标签高度 (数据坐标)，同一列相邻标签的最小间距
+    :param direction: 1 表示标签只向上移动，-1 表示只向下移动
+    :param obstacles: 可选，标签不能覆盖的水平线位置；obstacle_groups 为其所属的列
+    :param pad: 标签越过障碍物时与其保持的间距
+    :return: 与输入同序的标签位置 (标签下沿)
+    """
+    groups = np.asarray(groups)
+    desired = np.asarray(desired, dtype=float)
+    n = len(desired)
+    if n == 0:
+        return desired.copy()
+    if direction < 0:
+        # 向下避让：翻转坐标轴后按向上处理，标签下沿变为上沿
+        flipped = None if obstacles is None else -np.asarray(obstacles, dtype=float)
+        return -place_labels(groups, -(desired + height), height, obstacles=flipped,
+                             obstacle_groups=obstacle_groups, pad=pad) - height
+    # 全部计算在 (列, 期望位置) 排序后的空间进行，最后还原为输入顺序
+    order = np.lexsort((desired, groups))
+    g = groups[order]
+    d = desired[order]
+    starts = np.flatnonzero(np.r_[True, g[1:] != g[:-1]])
+    group_of = np.repeat(np.arange(len(starts)), np.diff(np.r_[starts, n]))
+    rank = np.arange(n) - starts[group_of]
+
+    if obstacles is None or len(obstacles) == 0:
+        placed = _sweep(d, height, group_of, rank)
+    else:
+        # 有障碍物时：扫描结果中压线的标签被推到障碍线上方，作为固定下界再整体重新扫描，
+        # 直到没有标签压线。推移只会让位置单调增大，每一轮都是向量化的扫描 + 二分查找，
+        # 轮数取决于连锁推移的层数 (通常 1~3 轮)；标签的先后次序始终按期望位置
+        push = _obstacle_push(g, height, np.asarray(obstacles, dtype=float), np.asarray(obstacle_groups), pad)
+        floor = d
+        while True:
+            placed = _sweep(floor, height, group_of, rank)
+            pushed = push(placed)
+            if np.array_equal(pushed, placed):
+                break
+            floor = np.maximum(floor, pushed)
+
+    out = np.empty(n)
+    out[order] = placed
+    return out
+
+def _sweep(d, height, group_of, rank):
+    """
+    分组扫描 (输入已按列、期望位置排序)：对 z_i = y_i - i*h 求分组累计最大值
+    :param group_of: 每个标签的列序号 (0, 1, 2 ...)；rank 为标签在本列中的名次
+    """
+    z = d - rank * height
+    # 分组累计最大值：每组整体抬高一个大于取值范围的偏移量，组与组之间互不影响
+    lifted = z + (z.max() - z.min() + 1.0) * group_of
+    running = np.maximum.accumulate(lifted)
+    # 偏移量会带来舍入误差，改为记录每个位置的累计最大值来自哪个标签 src，
+    # 再按 期望位置[src] + 间隔数 * h 重算，未被推移的标签精确停在期望位置
+    src = np.maximum.accumulate(np.where(lifted == running, np.arange(len(d)), 0))
+    return d[src] + (rank - rank[src]) * height
+
+def _obstacle_push(groups, height, obstacles, obstacle_groups, pad):
+    """
+    构造障碍线推移函数：标签下沿 y 与同列障碍线 l 相交或离得太近 (l - h < y < l + pad) 时移到 l + pad；
+    相邻障碍线间距小于 pad + h 时连锁越过，直接落在这一串障碍线最上面一条的上方
+    :param groups: 已排序的标签所属列
+    :return: push(y)，y 与 groups 同序
+    """
+    obstacle_order = np.lexsort((obstacles, obstacle_groups))
+    og = obstacle_groups[obstacle_order]
+    ov = obstacles[obstacle_order]
+    k = len(ov)
+    # 每条障碍线所在连锁段的最上面一条
+    breaks = np.r_[og[1:] != og[:-1], True] | np.r_[ov[1:] >= ov[:-1] + pad + height, True]
+    chain_top = ov[np.flatnonzero(breaks)[np.cumsum(np.r_[0, breaks[:-1]])]]
+    # (列, l + pad) 组成复数键：numpy 对复数按 (实部, 虚部) 字典序排序，可一次 searchsorted 跨列查找；
+    # 标签本身已按 (列, 位置) 有序，二分查找可以沿用上一次的结果
+    line_keys = og + 1j * (ov + pad)
+    group_keys = groups.astype(float)
+
+    def push(y):
+        # 每个标签上方第一条 l + pad > y 的同列障碍线 (恰好在 l + pad 处不算相交)
+        first = np.searchsorted(line_keys, group_keys + 1j * y, side='right')
+        cand = np.minimum(first, k - 1)
+        hit = (first < k) & (og[cand] == groups) & (ov[cand] < y + height)
+        return np.where(hit, chain_top[cand] + pad, y)
+
+    return push
@@ -1,13 +1,15 @@
 import pandas as pd
 import numpy as np
-import matplotlib.pyplot as plt
-from .utils import configure_mpl_fonts
+from matplotlib.figure import Figure
+from .utils import configure_mpl_fonts, as_frame, new_figure
+from .depict import get_thumbnails, add_thumbnails
 
 def draw_polar_bar(df, font_size=12):
     """
     绘制极坐标除草柱图
     """
     global_font = configure_mpl_fonts()
+    df = as_frame(df)
     
     labels = df.iloc[:, 0].astype(str).values
     data_df = df.iloc[:, 1:]
@@ -24,8 +26,8 @@ def draw_polar_bar(df, font_size=12):
     max_radius = 100
     bar_colors = ["#4C72B0", "#55A868", "#C44E52", "#8172B3", "#CCB974", "#64B5CD"]
     
-    fig = plt.figure(figsize=(12, 11))
-    ax = plt.subplot(111, polar=True)
+    fig = Figure(figsize=(12, 11))
+    ax = fig.add_subplot(111, polar=True)
     ax.grid(False)
     ax.set_facecolor('white')
     ax.spines['polar'].set_visible(False)
@@ -78,14 +80,16 @@ def draw_polar_bar(df, font_size=12):
     ax.legend(handles, labels_legend, loc='center', fontsize=int(font_size*1.1), frameon=False,
               bbox_to_anchor=(0.5, 0.5), prop=global_font)
               
-    plt.tight_layout()
+    fig.tight_layout()
     return fig
 
-def draw_radar_chart(df, font_size=14):
+def draw_radar_chart(df, font_size=14, smiles_col=None):
     """
     绘制雷达图
+    :param smiles_col: 可选的 SMILES 列名，给出时在右侧按曲线颜色列出结构式缩略图 (需要 rdkit)
     """
     global_font = configure_mpl_fonts()
+    df = as_frame(df)
     
     names = df.iloc[:, 0].astype(str).values
     data_df = df.iloc[:, 1:].select_dtypes(include=[np.number])
@@ -101,10 +105,13 @@ def draw_radar_chart(df, font_size=14):
         names = names[:max_show]
         data_df = data_df.iloc[:max_show]
 
+    if smiles_col is not None and smiles_col not in df.columns:
+        raise ValueError(f"未找到 SMILES 列: {smiles_col}")
+
     angles = [n / float(N) * 2 * np.pi for n in range(N)]
     angles += angles[:1]
     
-    fig, ax = plt.subplots(figsize=(10, 10), subplot_kw=dict(polar=True))
+    fig, ax = new_figure(figsize=(10 if smiles_col is None else 12.5, 10), subplot_kw=dict(polar=True))
     colors = ['#1f77b4', '#ff7f0e', '#2ca02c', '#d62728', '#9467bd', '#8c564b']
     
     for i, (name, row) in enumerate(zip(names, data_df.values)):
@@ -119,10 +126,22 @@ def draw_radar_chart(df, font_size=14):
     ax.set_xticklabels(categories, fontproperties=global_font, fontsize=font_size)
     
     ax.yaxis.set_tick_params(labelsize=int(font_size*0.7))
-    plt.yticks(fontproperties=global_font)
+    for label in ax.get_yticklabels():
+        label.set_fontproperties(global_font)
     
     ax.set_title("多靶标广谱活性评价", fontproperties=global_font, fontsize=int(font_size*1.4), pad=30)
     ax.legend(loc='upper right', bbox_to_anchor=(0.1, 1.1), prop=global_font, frameon=False)
     
-    plt.tight_layout()
+    fig.tight_layout()
+
+    if smiles_col is not None:
+        fig.subplots_adjust(right=0.78)
+        thumbnails = get_thumbnails(df[smiles_col].iloc[:len(names)].tolist())
+        ys = [0.88 - i * 0.15 for i in range(len(names))]
+        frame_colors = [colors[i % len(colors)] for i in range(len(names))]
+        add_thumbnails(ax, thumbnails, [(0.89, y) for y in ys], 80, xycoords='figure fraction',
+                       frame_colors=frame_colors)
+        for name, y in zip(names, ys):
+            fig.text(0.89, y - 0.065, name, ha='center', va='top', fontproperties=global_font,
+                     fontsize=int(font_size*0.85))
     return fig
\ No newline at end of file
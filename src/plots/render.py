@@ -0,0 +1,135 @@
+import os
+import threading
+from io import BytesIO
+from concurrent.futures import ThreadPoolExecutor
+from .fonts import embed_svg_fonts
+from .cache import render_cache, params_digest
+
+# ==============================
+# 并发渲染
+# ==============================
+# 各 draw_* 函数不再经过 pyplot 状态机，也不在绘图时修改全局 rcParams，
+# 因此可以在线程池中并发执行。线程池大小固定，等待队列有上限：
+# 队列满时 submit_render 阻塞等待 (背压)，超时则报错，避免无限堆积。
+# 批量任务 (background=True，如导出包) 另有上限 MAX_BACKGROUND：排队 + 运行中的批量任务
+# 始终少于线程数，至少留出一个线程给交互式渲染，后者不会排在大批量任务之后。
+MAX_WORKERS = min(4, os.cpu_count() or 1)
+MAX_PENDING = MAX_WORKERS * 4
+MAX_BACKGROUND = max(1, MAX_WORKERS - 1)
+
+_executor = None
+_slots = None
+_background_slots = None
+_init_lock = threading.Lock()
+
+def _get_executor():
+    global _executor, _slots, _background_slots
+    if _executor is None:
+        with _init_lock:
+            if _executor is None:
+                _slots = threading.BoundedSemaphore(MAX_PENDING)
+                _background_slots = threading.BoundedSemaphore(MAX_BACKGROUND)
+                _executor = ThreadPoolExecutor(max_workers=MAX_WORKERS, thread_name_prefix='render')
+    return _executor, _slots
+
+def figure_to_bytes(fig, fmt='png', dpi=300):
+    """将 Figure 导出为图片字节 (SVG 内嵌所用字符的字体子集)"""
+    buf = BytesIO()
+    fig.savefig(buf, format=fmt, dpi=dpi, bbox_inches='tight')
+    if fmt == 'svg':
+        return embed_svg_fonts(buf.getvalue())
+    return buf.getvalue()
+
+def _export(fig, fmt, dpi):
+    if isinstance(fmt, str):
+        return figure_to_bytes(fig, fmt=fmt, dpi=dpi)
+    return {f: figure_to_bytes(fig, fmt=f, dpi=dpi) for f in fmt}
+
+def render(draw_func, *args, fmt='png', dpi=300, **kwargs):
+    """
+    在当前线程执行绘图并导出
+    :param draw_func: plots.draw_* 函数，返回单个 Figure 或 Figure 列表
+    :param fmt: 输出格式；传入多个格式 (元组) 时同一张图只绘制一次，分别导出
+    :return: 图片字节列表；fmt 为元组时为 {格式: 字节} 字典列表
+    """
+    result = draw_func(*args, **kwargs)
+    figures = result if isinstance(result, (list, tuple)) else [result]
+    return [_export(fig, fmt, dpi) for fig in figures]
+
+def render_cached(draw_func, *args, fmt='png', dpi=300, progress=None, **kwargs):
+    """
+    与 render() 相同，结果按 数据内容 + 参数 缓存
+    绘图函数带有 page_digests 属性 (如热图) 时按页缓存，只重新绘制内容变化的页
+    :param progress: 可选回调 progress(已完成页数, 总页数)，可在其中抛出异常以中止；
+                     开始导出前 (按页缓存时为开始绘图前) 以及每页导出后各调用一次
+    """
+    page_digests = getattr(draw_func, 'page_digests', None)
+    if page_digests is None or kwargs.get('overview'):
+        key = params_digest(draw_func, args, kwargs, fmt, dpi)
+        outputs = render_cache.get(key)
+        if outputs is None:
+            result = draw_func(*args, **kwargs)
+            figures = result if isinstance(result, (list, tuple)) else [result]
+            if progress:
+                progress(0, len(figures))
+            outputs = []
+            for i, fig in enumerate(figures):
+                outputs.append(_export(fig, fmt, dpi))
+                if progress:
+                    progress(i + 1, len(figures))
+            render_cache.put(key, outputs)
+        elif progress:
+            progress(len(outputs), len(outputs))
+        return list(outputs)
+
+    digests = page_digests(*args, **kwargs)
+    shared = params_digest(draw_func, args[1:], kwargs, fmt, dpi, len(digests))
+    if progress:
+        progress(0, len(digests))
+    outputs = []
+    for page, digest in enumerate(digests):
+        key = params_digest(shared, digest)
+        page_outputs = render_cache.get(key)
+        if page_outputs is None:
+            page_outputs = [_export(fig, fmt, dpi) for fig in draw_func(*args, pages=[page], **kwargs)]
+            render_cache.put(key, page_outputs)
+        outputs.extend(page_outputs)
+        if progress:
+            progress(page + 1, len(digests))
+    return outputs
+
+def submit(func, *args, timeout=30, background=False, **kwargs):
+    """
+    提交任意任务到共享渲染线程池，返回 Future
+    :param timeout: 队列已满时最多等待的秒数，None 表示一直等待
+    :param background: 批量任务，额外受 MAX_BACKGROUND 限制，为交互式渲染保留线程
+    """
+    executor, slots = _get_executor()
+    held = [slots]
+    if background:
+        if not _background_slots.acquire(timeout=timeout):
+            raise RuntimeError("渲染队列已满，请稍后重试")
+        held.insert(0, _background_slots)
+    if not slots.acquire(timeout=timeout):
+        for sem in held[:-1]:
+            sem.release()
+        raise RuntimeError("渲染队列已满，请稍后重试")
+
+    def release(_=None):
+        for sem in held:
+            sem.release()
+
+    try:
+        future = executor.submit(func, *args, **kwargs)
+    except Exception:
+        release()
+        raise
+    future.add_done_callback(release)
+    return future
+
+def submit_render(draw_func, *args, fmt='png', dpi=300, timeout=30, **kwargs):
+    """
+    提交绘图到共享渲染线程池，返回 Future (结果为图片字节列表)
+    :param timeout: 队列已满时最多等待的秒数
+    """
+    return submit(render, draw_func, *args, fmt=fmt, dpi=dpi, timeout=timeout, **kwargs)
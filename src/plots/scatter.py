@@ -1,13 +1,57 @@
+import numpy as np
 import pandas as pd
-import matplotlib.pyplot as plt
-from .utils import configure_mpl_fonts
+from matplotlib.lines import Line2D
+from wells import PLATE_FORMATS, parse_wells
+from .utils import configure_mpl_fonts, as_frame, new_figure
 
-def draw_optimization_bubble(df, font_size=12):
+def aggregate_conditions(df, keys, size_col, color_col):
+    """
+    按条件分组聚合重复实验 (均值 / 标准差 / 重复数)
+    气泡外圈只表示大小指标的离散程度，颜色指标只取均值
+    :param keys: 分组列，例如 [催化剂, 溶剂]
+    :return: 每个条件一行的 DataFrame，列为 keys + 大小指标的 mean/sd + 颜色指标的 mean + n
+    """
+    values = pd.DataFrame({
+        'size': pd.to_numeric(df[size_col], errors='coerce'),
+        'color': pd.to_numeric(df[color_col], errors='coerce'),
+    })
+    for k in keys:
+        values[k] = df[k].astype(str).values
+
+    grouped = values.groupby(keys, sort=True)
+    stats = grouped['size'].agg(['mean', 'std'])
+    stats.columns = [f"{size_col}_mean", f"{size_col}_sd"]
+    stats[f"{color_col}_mean"] = grouped['color'].mean()
+    stats['n'] = grouped.size()
+    return stats.fillna({f"{size_col}_sd": 0}).reset_index()
+
+def _draw_bubbles(ax, agg, x_codes, y_codes, size_col, color_col, vmin, vmax):
+    """
+    在单个坐标轴上绘制一个条件网格，每个条件一个气泡，所有气泡为一个集合
+    :param x_codes, y_codes: 各条件在全局类别中的位置，所有分面共用同一套编码
+    """
+    sizes = agg[f"{size_col}_mean"].fillna(0).values
+    colors = agg[f"{color_col}_mean"].fillna(0).values
+
+    # 有重复实验时，用半透明外圈表示 均值 + 标准差
+    sd = agg[f"{size_col}_sd"].values
+    if (agg['n'] > 1).any():
+        ax.scatter(x_codes, y_codes, s=(sizes + sd) * 12, facecolors='none',
+                   edgecolors='gray', linewidth=1, alpha=0.6, linestyle='--')
+
+    sc = ax.scatter(x_codes, y_codes, s=sizes*12, c=colors, vmin=vmin, vmax=vmax,
+                    cmap='viridis', alpha=0.8, edgecolors='black', linewidth=1)
+    return sc
+
+def draw_optimization_bubble(df, font_size=12, facet_col=None):
     """
     绘制反应条件筛选气泡图
+    :param df: 前 4 列依次为 [X 条件, Y 条件, 大小(产率), 颜色(ee)]，相同条件的重复实验自动取均值
+    :param facet_col: 可选的分面列 (例如温度)，每个取值绘制一个子图
     """
     global_font = configure_mpl_fonts()
-    
+    df = as_frame(df)
+
     if df.shape[1] < 4:
         raise ValueError("数据列数不足，至少需要 4 列 (Catalyst, Solvent, Yield, ee)")
 
@@ -16,50 +60,147 @@ def draw_optimization_bubble(df, font_size=12):
     y_col = col_names[1]
     size_col = col_names[2]
     color_col = col_names[3]
-    
-    x_cat = df[x_col].astype(str)
-    y_solv = df[y_col].astype(str)
-    sizes = pd.to_numeric(df[size_col], errors='coerce').fillna(0)
-    colors = pd.to_numeric(df[color_col], errors='coerce').fillna(0)
-    
-    unique_x = sorted(list(set(x_cat)))
-    unique_y = sorted(list(set(y_solv)))
-    
-    x_map = {val: i for i, val in enumerate(unique_x)}
-    y_map = {val: i for i, val in enumerate(unique_y)}
-    
-    x_vals = x_cat.map(x_map)
-    y_vals = y_solv.map(y_map)
-
-    fig, ax = plt.subplots(figsize=(11, 9))
-    
-    sc = ax.scatter(x_vals, y_vals, s=sizes*12, c=colors, 
-                    cmap='viridis', alpha=0.8, edgecolors='black', linewidth=1)
-    
-    ax.set_xticks(range(len(unique_x)))
-    ax.set_xticklabels(unique_x, fontsize=font_size, rotation=0, fontproperties=global_font)
-    
-    ax.set_yticks(range(len(unique_y)))
-    ax.set_yticklabels(unique_y, fontsize=font_size, fontproperties=global_font)
-    
-    ax.grid(True, linestyle='--', alpha=0.3)
-    ax.set_axisbelow(True)
-    
-    ax.set_xlabel(x_col, fontsize=int(font_size*1.2), fontweight='bold', labelpad=10, fontproperties=global_font)
-    ax.set_ylabel(y_col, fontsize=int(font_size*1.2), fontweight='bold', labelpad=10, fontproperties=global_font)
-    ax.set_title('反应条件筛选结果 (Reaction Optimization)', fontsize=int(font_size*1.5), pad=20, fontproperties=global_font)
-    
-    cbar = plt.colorbar(sc, ax=ax, fraction=0.046, pad=0.04)
+
+    if facet_col is not None and facet_col not in df.columns:
+        raise ValueError(f"未找到分面列: {facet_col}")
+    keys = [x_col, y_col] if facet_col is None else [facet_col, x_col, y_col]
+    agg = aggregate_conditions(df, keys, size_col, color_col)
+    color_vals = agg[f"{color_col}_mean"].fillna(0)
+    vmin, vmax = color_vals.min(), color_vals.max()
+    # X / Y 类别在全部数据上统一编码，同一条件在每个分面中的位置一致，缺少的类别留空
+    x_codes, unique_x = pd.factorize(agg[x_col], sort=True)
+    y_codes, unique_y = pd.factorize(agg[y_col], sort=True)
+
+    if facet_col is None:
+        facets = [(None, agg)]
+    else:
+        facets = list(agg.groupby(facet_col, sort=True))
+    n_facets = len(facets)
+    n_grid_cols = int(np.ceil(np.sqrt(n_facets)))
+    n_grid_rows = int(np.ceil(n_facets / n_grid_cols))
+
+    fig, axes = new_figure(n_grid_rows, n_grid_cols, figsize=(11 * n_grid_cols, 9 * n_grid_rows), squeeze=False)
+
+    for ax, (facet_val, facet_df) in zip(axes.flat, facets):
+        rows = facet_df.index.values
+        sc = _draw_bubbles(ax, facet_df, x_codes[rows], y_codes[rows], size_col, color_col, vmin, vmax)
+
+        ax.set_xticks(range(len(unique_x)))
+        ax.set_xticklabels(list(unique_x), fontsize=font_size, rotation=0, fontproperties=global_font)
+
+        ax.set_yticks(range(len(unique_y)))
+        ax.set_yticklabels(list(unique_y), fontsize=font_size, fontproperties=global_font)
+        if facet_col is not None:
+            # 分面之间坐标范围一致，某分面缺少边缘类别时不会自动收缩
+            ax.set_xlim(-0.5, len(unique_x) - 0.5)
+            ax.set_ylim(-0.5, len(unique_y) - 0.5)
+
+        ax.grid(True, linestyle='--', alpha=0.3)
+        ax.set_axisbelow(True)
+
+        ax.set_xlabel(x_col, fontsize=int(font_size*1.2), fontweight='bold', labelpad=10, fontproperties=global_font)
+        ax.set_ylabel(y_col, fontsize=int(font_size*1.2), fontweight='bold', labelpad=10, fontproperties=global_font)
+        if facet_val is None:
+            ax.set_title('反应条件筛选结果 (Reaction Optimization)', fontsize=int(font_size*1.5), pad=20, fontproperties=global_font)
+        else:
+            ax.set_title(f"{facet_col} = {facet_val}", fontsize=int(font_size*1.3), pad=15, fontproperties=global_font)
+
+    for ax in axes.flat[n_facets:]:
+        ax.set_visible(False)
+    ax = axes.flat[0]
+
+    cbar_ax = axes[0, 0] if n_facets == 1 else axes.ravel().tolist()
+    cbar = fig.colorbar(sc, ax=cbar_ax, fraction=0.046, pad=0.04)
     cbar.set_label(f'{color_col} (Color)', rotation=270, labelpad=20, fontsize=font_size, fontproperties=global_font)
-    
+
     legend_sizes = [20, 50, 80]
     legend_labels = ['20%', '50%', '80%']
-    legend_handles = [plt.scatter([], [], s=s*12, c='gray', alpha=0.6, edgecolors='black') for s in legend_sizes]
-    
-    ax.legend(legend_handles, legend_labels, title=f"{size_col} (Size)", 
-              loc='upper left', bbox_to_anchor=(1.15, 1), frameon=False, labelspacing=1.5, prop=global_font)
-    
-    plt.tight_layout()
-    plt.subplots_adjust(right=0.85)
-    
-    return fig
\ No newline at end of file
+    legend_handles = [Line2D([], [], linestyle='', marker='o', markersize=np.sqrt(s*12), markerfacecolor='gray',
+                             markeredgecolor='black', alpha=0.6) for s in legend_sizes]
+
+    if n_facets == 1:
+        ax.legend(legend_handles, legend_labels, title=f"{size_col} (Size)",
+                  loc='upper left', bbox_to_anchor=(1.15, 1), frameon=False, labelspacing=1.5, prop=global_font)
+        fig.tight_layout()
+        fig.subplots_adjust(right=0.85)
+    else:
+        fig.legend(legend_handles, legend_labels, title=f"{size_col} (Size)", ncol=len(legend_sizes),
+                   loc='upper center', frameon=False, prop=global_font)
+
+    return fig
+
+def draw_hte_plate(df, font_size=12, plate_format=None):
+    """
+    绘制高通量实验 (HTE) 板图：每块板一个子图，每个孔一个气泡
+    :param df: 列依次为 [孔位, 大小(产率), 颜色(ee)]，可选第 4 列为板号；同板同孔的重复实验取均值
+    :param plate_format: 96 / 384 / 1536，默认根据孔位自动推断
+    """
+    global_font = configure_mpl_fonts()
+    df = as_frame(df)
+
+    if df.shape[1] < 3:
+        raise ValueError("数据列数不足，至少需要 3 列 (Well, Yield, ee)")
+
+    well_col, size_col, color_col = df.columns[:3]
+    plate_col = df.columns[3] if df.shape[1] > 3 else None
+
+    rows, cols = parse_wells(df[well_col].values)
+    wells = pd.DataFrame({
+        'plate': df[plate_col].astype(str).values if plate_col is not None else '',
+        'row': rows,
+        'col': cols,
+        'size': pd.to_numeric(df[size_col], errors='coerce').values,
+        'color': pd.to_numeric(df[color_col], errors='coerce').values,
+    })
+    wells = wells.groupby(['plate', 'row', 'col'], sort=True)[['size', 'color']].mean().reset_index()
+
+    if plate_format is None:
+        plate_format = next((k for k, (r, c) in sorted(PLATE_FORMATS.items())
+                             if wells['row'].max() < r and wells['col'].max() < c), None)
+    if plate_format not in PLATE_FORMATS:
+        raise ValueError("无法识别板规格，请指定 96 / 384 / 1536")
+    n_plate_rows, n_plate_cols = PLATE_FORMATS[plate_format]
+
+    plates = list(wells.groupby('plate', sort=True))
+    n_plates = len(plates)
+    n_grid_cols = int(np.ceil(np.sqrt(n_plates)))
+    n_grid_rows = int(np.ceil(n_plates / n_grid_cols))
+
+    panel_w = 9
+    panel_h = panel_w * n_plate_rows / n_plate_cols + 1
+    fig, axes = new_figure(n_grid_rows, n_grid_cols, figsize=(panel_w * n_grid_cols + 1.5, panel_h * n_grid_rows),
+                             squeeze=False)
+
+    # 气泡最大直径约为孔间距的 90%
+    cell_pt = panel_w * 0.8 * 72 / n_plate_cols
+    vmin, vmax = np.nanmin(wells['color'].values), np.nanmax(wells['color'].values)
+
+    for ax, (plate, plate_df) in zip(axes.flat, plates):
+        frac = np.clip(plate_df['size'].fillna(0).values / 100, 0, 1)
+        sc = ax.scatter(plate_df['col'].values, plate_df['row'].values, s=(cell_pt * 0.9) ** 2 * frac,
+                        c=plate_df['color'].values, cmap='viridis', vmin=vmin, vmax=vmax,
+                        edgecolors='black', linewidth=0.3 if plate_format == 1536 else 0.8)
+
+        ax.set_xlim(-0.6, n_plate_cols - 0.4)
+        ax.set_ylim(n_plate_rows - 0.4, -0.6)
+        ax.set_aspect('equal')
+        step = 1 if plate_format == 96 else 2 if plate_format == 384 else 4
+        ax.set_xticks(range(0, n_plate_cols, step))
+        ax.set_xticklabels([str(c + 1) for c in range(0, n_plate_cols, step)], fontsize=int(font_size*0.8))
+        row_names = [chr(65 + r) if r < 26 else 'A' + chr(65 + r - 26) for r in range(n_plate_rows)]
+        ax.set_yticks(range(0, n_plate_rows, step))
+        ax.set_yticklabels(row_names[::step], fontsize=int(font_size*0.8))
+        ax.xaxis.tick_top()
+        ax.grid(True, linestyle=':', alpha=0.3)
+        ax.set_axisbelow(True)
+        title = f"{plate_col} = {plate}" if plate_col is not None else f"{plate_format} 孔板"
+        ax.set_title(title, fontsize=font_size, pad=25, fontproperties=global_font)
+
+    for ax in axes.flat[n_plates:]:
+        ax.set_visible(False)
+
+    cbar = fig.colorbar(sc, ax=axes.ravel().tolist(), fraction=0.03, pad=0.02)
+    cbar.set_label(f'{color_col} (Color)', rotation=270, labelpad=20, fontsize=font_size, fontproperties=global_font)
+    fig.suptitle(f'高通量实验板图 ({size_col}: 气泡大小)', fontsize=int(font_size*1.4), fontproperties=global_font)
+
+    return fig
@@ -0,0 +1,122 @@
+import warnings
+import numpy as np
+import pandas as pd
+
+# ==============================
+# Bootstrap 置信区间
+# ==============================
+# 每次重抽样是行索引矩阵中的一行，一批重抽样一次性取值并按行求中位数/均值；
+# 同一组行索引作用于所有指标列 (成对设计：每行是同一个化合物)，两两比较的差值分布因此反映配对关系。
+# 单批元素数不超过 chunk_elements，内存占用与数据量无关。
+
+DEFAULT_RESAMPLES = 2000
+CHUNK_ELEMENTS = 1 << 20  # 单批最多 1M 个元素 (索引与取值合计约 12 MB)
+
+def numeric_frame(df):
+    """取出用于统计的数值列 (第一列非数值时视为编号列)"""
+    if df.columns[0] not in df.select_dtypes(include=[np.number]).columns:
+        df = df.set_index(df.columns[0])
+    return df.select_dtypes(include=[np.number])
+
+def bootstrap_distribution(values, n_resamples=DEFAULT_RESAMPLES, rng=None, chunk_elements=CHUNK_ELEMENTS):
+    """
+    批量成对重抽样，返回每次重抽样的中位数与均值
+    每次重抽样抽取一组行索引，同时作用于所有列，同一化合物的各指标保持配对
+    :param values: 一维数组，或 (行, 列) 二维数组；二维时可含缺失值 (各列在重抽样样本中忽略缺失值)
+    :return: (medians, means)，一维输入时长度为 n_resamples，二维输入时形状为 (列数, n_resamples)
+    """
+    values = np.asarray(values, dtype=float)
+    one_dim = values.ndim == 1
+    X = values[:, None] if one_dim else values
+    rng = np.random.default_rng() if rng is None else rng
+    n, k = X.shape
+    medians = np.full((k, n_resamples), np.nan)
+    means = np.full((k, n_resamples), np.nan)
+    if n == 0:
+        return (medians[0], means[0]) if one_dim else (medians, means)
+
+    # 各列预先排序并记录 行号 -> 排名：重抽样的中位数即排名的中位数对应的值，
+    # 只需对整数排名做部分排序，比直接对浮点样本求中位数快得多；含缺失值的列退回 nanmedian
+    order = np.argsort(X, axis=0, kind='stable')
+    sorted_cols = np.take_along_axis(X, order, axis=0).T.copy()
+    ranks = np.empty((k, n), dtype=np.int32 if n < 2**31 else np.int64)
+    ranks[np.arange(k)[:, None], order.T] = np.arange(n)
+    has_nan = np.isnan(X).any(axis=0)
+    columns = X.T.copy()
+
+    lo, hi = (n - 1) // 2, n // 2
+    batch = max(chunk_elements // n, 1)
+    for start in range(0, n_resamples, batch):
+        stop = min(start + batch, n_resamples)
+        idx = rng.integers(0, n, size=(stop - start, n), dtype=np.int32 if n < 2**31 else np.int64)
+        for c in range(k):
+            if has_nan[c]:
+                sample = columns[c][idx]
+                with warnings.catch_warnings():
+                    warnings.simplefilter('ignore', RuntimeWarning)
+                    medians[c, start:stop] = np.nanmedian(sample, axis=1)
+                    means[c, start:stop] = np.nanmean(sample, axis=1)
+                continue
+            r = ranks[c][idx]
+            means[c, start:stop] = sorted_cols[c][r].mean(axis=1)
+            r.partition(hi, axis=1)
+            # 偶数个样本时，另一个中间值是左半部分的最大值
+            lower = r[:, hi] if lo == hi else r[:, :hi].max(axis=1)
+            medians[c, start:stop] = (sorted_cols[c][lower] + sorted_cols[c][r[:, hi]]) / 2
+    return (medians[0], means[0]) if one_dim else (medians, means)
+
+def bootstrap_ci(df, n_resamples=DEFAULT_RESAMPLES, ci=0.95, seed=0, chunk_elements=CHUNK_ELEMENTS):
+    """
+    计算各指标中位数/均值的 bootstrap 置信区间 (百分位法)，以及两两指标的中位数差异
+    :param df: 数据 DataFrame，规则同箱线图 (第一列非数值时视为编号列)
+    :param ci: 置信水平
+    :param seed: 随机种子，结果可复现
+    :return: (summary, pairwise) 两个 DataFrame
+    """
+    numeric_df = numeric_frame(df)
+    if numeric_df.empty:
+        raise ValueError("未找到有效的数值列用于统计")
+
+    alpha = (1 - ci) / 2
+    q = [alpha, 1 - alpha]
+    names = [str(c) for c in numeric_df.columns]
+    # 只有缺失值的行不参与重抽样
+    X = numeric_df.to_numpy(dtype=float)
+    X = X[~np.isnan(X).all(axis=1)]
+    boot_medians, boot_means = bootstrap_distribution(X, n_resamples, np.random.default_rng(seed), chunk_elements)
+    rows = []
+    for k, col in enumerate(numeric_df.columns):
+        values = numeric_df[col].dropna().to_numpy(dtype=float)
+        with np.errstate(all='ignore'):
+            med_lo, med_hi = np.nanquantile(boot_medians[k], q) if len(values) else (np.nan, np.nan)
+            mean_lo, mean_hi = np.nanquantile(boot_means[k], q) if len(values) else (np.nan, np.nan)
+        rows.append({
+            'indicator': names[k],
+            'n': len(values),
+            'median': np.median(values) if len(values) else np.nan,
+            'median_lo': med_lo,
+            'median_hi': med_hi,
+            'mean': values.mean() if len(values) else np.nan,
+            'mean_lo': mean_lo,
+            'mean_hi': mean_hi,
+        })
+    summary = pd.DataFrame(rows)
+
+    # 两两比较：各列使用同一组行索引，中位数之差的分布直接由两组 bootstrap 结果相减得到 (成对 bootstrap)
+    # 某次重抽样中一列全为缺失值时差值为 NaN，p 值只在有效的重抽样中计算
+    i, j = np.triu_indices(len(names), k=1)
+    diffs = boot_medians[i] - boot_medians[j]
+    n_valid = np.isfinite(diffs).sum(axis=1)
+    with np.errstate(all='ignore'):
+        diff_lo, diff_hi = np.nanquantile(diffs, q, axis=1)
+        tail = np.minimum((diffs <= 0).sum(axis=1), (diffs >= 0).sum(axis=1))
+        p_value = np.where(n_valid > 0, np.minimum(2 * tail / n_valid, 1.0), np.nan)
+    pairwise = pd.DataFrame({
+        'a': np.array(names, dtype=object)[i],
+        'b': np.array(names, dtype=object)[j],
+        'median_diff': summary['median'].values[i] - summary['median'].values[j],
+        'diff_lo': diff_lo,
+        'diff_hi': diff_hi,
+        'p_value': p_value,
+    })
+    return summary, pairwise
@@ -1,15 +1,22 @@
 import platform
 import os
-import re
-import matplotlib.pyplot as plt
+import threading
+from functools import lru_cache
+import pandas as pd
+import matplotlib as mpl
 import matplotlib.font_manager as fm
+from matplotlib.figure import Figure
 from matplotlib.font_manager import FontProperties
 
 # ==============================
 # 通用字体设置工具
 # ==============================
-def get_chinese_font():
-    """尝试获取可用的中文字体"""
+_rc_lock = threading.Lock()
+_rc_configured = False
+
+@lru_cache(maxsize=1)
+def _find_chinese_font_path():
+    """查找可用中文字体文件路径 (结果缓存，避免每次绘图都扫描字体)"""
     system = platform.system()
     font_names = ['Microsoft YaHei', 'SimHei', 'SimSun', 'PingFang SC', 'Heiti TC', 'Droid Sans Fallback']
     
@@ -19,8 +26,8 @@ def get_chinese_font():
         for f in win_fonts:
             if os.path.exists(f):
                 try:
-                    prop = FontProperties(fname=f)
-                    return prop
+                    FontProperties(fname=f).get_name()
+                    return f
                 except:
                     pass
     
@@ -29,39 +36,72 @@ def get_chinese_font():
         try:
             path = fm.findfont(fm.FontProperties(family=name))
             if os.path.exists(path):
-                return FontProperties(fname=path)
+                return path
         except:
             continue
             
+    return None
+
+def get_chinese_font():
+    """尝试获取可用的中文字体 (每次返回新的 FontProperties，调用方可自由修改)"""
+    path = _find_chinese_font_path()
+    if path:
+        return FontProperties(fname=path)
     # 如果都失败，返回默认
     return FontProperties(family='sans-serif')
 
 def configure_mpl_fonts():
-    """配置 Matplotlib 全局字体"""
+    """
+    配置 Matplotlib 字体
+    全局 rcParams 只在首次调用时写入一次 (加锁)，之后的绘图不再修改全局状态，
+    各图表的字体通过 fontproperties 显式传给每个文本对象，可在多线程中并发绘图
+    """
+    global _rc_configured
     font_prop = get_chinese_font()
-    font_name = font_prop.get_name()
-    plt.rcParams['font.sans-serif'] = [font_name] + plt.rcParams['font.sans-serif']
-    plt.rcParams['axes.unicode_minus'] = False
+    if not _rc_configured:
+        with _rc_lock:
+            if not _rc_configured:
+                font_name = font_prop.get_name()
+                mpl.rcParams['font.sans-serif'] = [font_name] + mpl.rcParams['font.sans-serif']
+                mpl.rcParams['axes.unicode_minus'] = False
+                # 矢量图导出：PDF 嵌入 TrueType 字体子集，SVG 保留文字 (字体子集见 fonts.embed_svg_fonts)
+                mpl.rcParams['pdf.fonttype'] = 42
+                mpl.rcParams['svg.fonttype'] = 'none'
+                _rc_configured = True
     return font_prop
 
+def new_figure(nrows=1, ncols=1, figsize=None, **kwargs):
+    """
+    不经过 pyplot 状态机创建 Figure 与 Axes
+    Figure 不注册到 pyplot 的全局图表管理器，线程之间互不干扰，也不会因未 close 而累积
+    """
+    fig = Figure(figsize=figsize)
+    axes = fig.subplots(nrows, ncols, **kwargs)
+    return fig, axes
+
 # ==============================
-# 通用排序工具
+# 输入数据适配
 # ==============================
-def sort_key(name):
-    """生测编号排序逻辑"""
-    name_str = str(name).strip()
-    if '阿维菌素' in name_str: return (998, 0, 0)
-    if 'CK' in name_str or 'ck' in name_str or '对照' in name_str: return (999, 0, 0)
-    
-    roman_map = {'Ⅰ': 1, 'Ⅱ': 2, 'Ⅲ': 3, 'Ⅳ': 4, 'Ⅴ': 5, 'Ⅵ': 6, 'Ⅶ': 7, 'Ⅷ': 8, 'Ⅸ': 9, 'Ⅹ': 10,
-                 'I': 1, 'II': 2, 'III': 3, 'IV': 4, 'V': 5, 'VI': 6, 'VII': 7, 'VIII': 8, 'IX': 9, 'X': 10}
-    
-    m = re.match(r'^([ⅠⅡⅢⅣⅤⅥⅦⅧⅨⅩIVX]+)\s*(\d+)-(\d+)$', name_str)
-    if m:
-        return (roman_map.get(m.group(1), 0), int(m.group(2)), int(m.group(3)))
-    
-    nums = re.findall(r'\d+', name_str)
-    if nums:
-        return (997, int(nums[0]), int(nums[1]) if len(nums) > 1 else 0)
-    
-    return (996, 0, 0)
\ No newline at end of file
+def as_frame(data):
+    """
+    统一绘图输入：DataFrame 原样返回，其他提供 to_frame() 的视图对象
+    (例如 ingest.SharedSheet 内存映射工作表) 转换为 DataFrame (数值列引用映射内存)
+    """
+    if isinstance(data, pd.DataFrame):
+        return data
+    if hasattr(data, 'to_frame'):
+        return data.to_frame()
+    return pd.DataFrame(data)
+
+def coerce_numeric(df):
+    """
+    将各列转换为数值 (无法转换的值为 NaN)：已是数值类型的列原样保留、不复制，
+    全部为数值列时直接返回原 DataFrame (内存映射工作表的数据块因此不会被复制)
+    """
+    convert = [i for i in range(df.shape[1]) if not pd.api.types.is_numeric_dtype(df.dtypes.iloc[i])]
+    if not convert:
+        return df
+    df = df.copy(deep=False)
+    for i in convert:
+        df.isetitem(i, pd.to_numeric(df.iloc[:, i], errors='coerce'))
+    return df
@@ -0,0 +1,47 @@
+import re
+import numpy as np
+import pandas as pd
+
+# ==============================
+# 孔位与生测编号
+# ==============================
+# ingest (板图导入) 与 plots (板图、热图排序) 共用，不依赖任何一方。
+
+# 标准微孔板规格: 孔数 -> (行数, 列数)
+PLATE_FORMATS = {96: (8, 12), 384: (16, 24), 1536: (32, 48)}
+
+def parse_wells(wells):
+    """
+    向量化解析孔位编号 (A1 / A01 / AF48)
+    :return: (行索引, 列索引) 两个整数数组，均从 0 开始
+    """
+    parts = pd.Series(wells).astype(str).str.strip().str.upper().str.extract(r'^([A-Z]{1,2})0*(\d+)$')
+    if parts.isnull().any().any():
+        bad = pd.Series(wells)[parts[0].isnull().values].iloc[0]
+        raise ValueError(f"无法解析孔位编号: {bad}")
+    letters = parts[0]
+    first = letters.str[0].map(ord).values - 65
+    second = letters.str[1].fillna('').map(lambda c: ord(c) - 65 if c else -1).values
+    # 单字母 A-Z -> 0-25；双字母 AA-AF -> 26-31 (1536 孔板)
+    rows = np.where(second < 0, first, (first + 1) * 26 + second)
+    cols = parts[1].astype(int).values - 1
+    return rows, cols
+
+def sort_key(name):
+    """生测编号排序逻辑"""
+    name_str = str(name).strip()
+    if '阿维菌素' in name_str: return (998, 0, 0)
+    if 'CK' in name_str or 'ck' in name_str or '对照' in name_str: return (999, 0, 0)
+    
+    roman_map = {'Ⅰ': 1, 'Ⅱ': 2, 'Ⅲ': 3, 'Ⅳ': 4, 'Ⅴ': 5, 'Ⅵ': 6, 'Ⅶ': 7, 'Ⅷ': 8, 'Ⅸ': 9, 'Ⅹ': 10,
+                 'I': 1, 'II': 2, 'III': 3, 'IV': 4, 'V': 5, 'VI': 6, 'VII': 7, 'VIII': 8, 'IX': 9, 'X': 10}
+    
+    m = re.match(r'^([ⅠⅡⅢⅣⅤⅥⅦⅧⅨⅩIVX]+)\s*(\d+)-(\d+)$', name_str)
+    if m:
+        return (roman_map.get(m.group(1), 0), int(m.group(2)), int(m.group(3)))
+    
+    nums = re.findall(r'\d+', name_str)
+    if nums:
+        return (997, int(nums[0]), int(nums[1]) if len(nums) > 1 else 0)
+    
+    return (996, 0, 0)
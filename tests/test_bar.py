@@ -0,0 +1,22 @@
+import os
+import sys
+import numpy as np
+import pandas as pd
+import pytest
+
+sys.path.append(os.path.join(os.path.dirname(os.path.dirname(os.path.abspath(__file__))), 'src'))
+from plots.bar import draw_grouped_bar
+
+
+def test_missing_values_draw_no_bar():
+    df = pd.DataFrame({'生测编号': ['A1', 'A2', 'A3'], 'S0': [10.0, np.nan, 0.0], 'S1': [np.nan, 5.0, 7.0]})
+    ax = draw_grouped_bar(df)[0].axes[0]
+    counts = [len(coll.get_paths()) for coll in ax.collections]
+    # 实测的 0 仍有柱子 (高度为 0)，缺失值没有
+    assert counts == [2, 2]
+
+
+def test_empty_series_is_rejected():
+    df = pd.DataFrame({'生测编号': ['A1'], 'S0': [1.0]})
+    with pytest.raises(ValueError):
+        draw_grouped_bar(df, series=[])
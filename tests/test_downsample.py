@@ -0,0 +1,49 @@
+import os
+import sys
+import warnings
+import numpy as np
+import pandas as pd
+
+sys.path.append(os.path.join(os.path.dirname(os.path.dirname(os.path.abspath(__file__))), 'src'))
+from plots.downsample import minmax_downsample, lttb_downsample
+from plots.kinetics import draw_kinetics, FIG_SIZE, AXES_WIDTH_FRACTION
+
+
+def _trace(n, blank_rows=0):
+    """单调时间轴 + 两列信号；末尾追加 blank_rows 行空白时间 (模拟 Excel 导出的尾部空行)"""
+    t = np.linspace(0.0, 100.0, n)
+    df = pd.DataFrame({'Time': t, 'A': np.sin(t), 'B': np.cos(t)})
+    if blank_rows:
+        df = pd.concat([df, pd.DataFrame({'Time': [np.nan] * blank_rows, 'A': np.nan, 'B': np.nan})], ignore_index=True)
+    return df
+
+
+def test_downsamplers_ignore_nan_time():
+    df = _trace(5000, blank_rows=3)
+    x, Y = df['Time'].to_numpy(), df[['A', 'B']].to_numpy()
+    with warnings.catch_warnings():
+        warnings.simplefilter('error')
+        for X_out, Y_out in (minmax_downsample(x, Y, 100), lttb_downsample(x, Y, 200)):
+            assert not np.isnan(X_out).any()
+            assert X_out.min() >= 0.0 and X_out.max() <= 100.0
+            assert Y_out.shape == X_out.shape
+
+
+def test_kinetics_with_blank_time_rows():
+    n_px = int(FIG_SIZE[0] * AXES_WIDTH_FRACTION * 10)
+    df = _trace(10 * n_px, blank_rows=5)
+    with warnings.catch_warnings():
+        warnings.simplefilter('error', RuntimeWarning)
+        fig = draw_kinetics(df, dpi=10)
+    line = fig.axes[0].get_lines()[0]
+    assert len(line.get_xdata()) <= 2 * n_px
+    assert np.isfinite(line.get_xdata()).all()
+
+
+def test_kinetics_zoom_still_downsamples():
+    n_px = int(FIG_SIZE[0] * AXES_WIDTH_FRACTION * 10)
+    df = _trace(40 * n_px)
+    fig = draw_kinetics(df, dpi=10, xlim=(0.0, 50.0))
+    x = fig.axes[0].get_lines()[0].get_xdata()
+    assert len(x) <= 2 * n_px
+    assert x.min() >= 0.0 and x.max() <= 50.0
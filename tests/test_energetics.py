@@ -0,0 +1,69 @@
+import os
+import sys
+import numpy as np
+import pandas as pd
+
+sys.path.append(os.path.join(os.path.dirname(os.path.dirname(os.path.abspath(__file__))), 'src'))
+from plots.energetics import energetic_span, span_states, turnover_frequency, is_transition_state
+
+STEPS = ['R', 'TS1', 'Int1', 'TS2', 'P']
+
+
+def _profiles():
+    """
+    三条路径，δE 均可手算 (kcal/mol)：
+    A: ΔG_r = -10；TS1-R = 20 (TS 在后)，TS1-Int1 = 20 + 5 - 10 = 15，TS2-R = 12，TS2-Int1 = 17 → δE = 20 (TS1 / R)
+    B: ΔG_r = -5； TS1-R = 18，TS1-Int1 = 18 + 12 - 5 = 25 (TS 在前)，TS2-R = 4，TS2-Int1 = 16 → δE = 25 (TS1 / Int1)
+    C: TS2 缺失，ΔG_r = -4；TS1-R = 10，TS1-Int1 = 10 + 2 - 4 = 8 → δE = 10 (TS1 / R)
+    """
+    return pd.DataFrame({
+        'Step': STEPS,
+        'A': [0.0, 20.0, -5.0, 12.0, -10.0],
+        'B': [0.0, 18.0, -12.0, 4.0, -5.0],
+        'C': [0.0, 10.0, -2.0, np.nan, -4.0],
+    })
+
+
+def test_ts_detection():
+    assert list(is_transition_state(STEPS)) == [False, True, False, True, False]
+    assert list(is_transition_state(['Int1-TS2', 'TS-3', '过渡态', 'Int2', 'Product'])) == [True, True, True, False, False]
+
+
+def test_span_states_textbook_profiles():
+    df = _profiles()
+    states = span_states(df[['A', 'B', 'C']].to_numpy(), is_transition_state(STEPS))
+    assert np.allclose(states['span'], [20.0, 25.0, 10.0])
+    assert list(states['tdts']) == [1, 1, 1]
+    assert list(states['tdi']) == [0, 2, 0]
+    assert list(states['tdts_after_tdi']) == [True, False, True]
+    assert np.allclose(states['reaction_energy'], [-10.0, -5.0, -4.0])
+
+
+def test_energetic_span_table():
+    table = energetic_span(_profiles(), temperature=298.15)
+    assert list(table['path']) == ['C', 'A', 'B']
+    assert list(table['rank']) == [1, 2, 3]
+    assert list(table['tdts']) == ['TS1', 'TS1', 'TS1']
+    assert list(table['tdi']) == ['R', 'R', 'Int1']
+    assert list(table['tdts_after_tdi']) == [True, True, False]
+    kt_h = 1.380649e-23 * 298.15 / 6.62607015e-34
+    expected_tof = kt_h * np.exp(-np.array([10.0, 20.0, 25.0]) / (1.987204259e-3 * 298.15))
+    assert np.allclose(table['tof'], expected_tof)
+    assert np.allclose(turnover_frequency(20.0, unit='kcal/mol'), expected_tof[1])
+
+
+def test_many_paths_match_pairwise_definition():
+    rng = np.random.default_rng(0)
+    steps = ['R'] + [('TS' if i % 2 else 'Int') + str(i) for i in range(1, 12)] + ['P']
+    E = np.cumsum(rng.normal(0, 5, (len(steps), 200)), axis=0)
+    E[0] = 0
+    ts = is_transition_state(steps)
+    states = span_states(E, ts)
+    ts_idx = np.flatnonzero(ts)
+    int_idx = np.flatnonzero(~ts)[:-1]
+    for p in range(E.shape[1]):
+        dG = E[-1, p] - E[0, p]
+        spans = {(t, i): E[t, p] - E[i, p] + (0.0 if t > i else dG) for t in ts_idx for i in int_idx}
+        (t, i), best = max(spans.items(), key=lambda kv: kv[1])
+        assert np.isclose(states['span'][p], best)
+        assert (states['tdts'][p], states['tdi'][p]) == (t, i)
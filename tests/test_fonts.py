@@ -0,0 +1,26 @@
+import os
+import re
+import sys
+import xml.etree.ElementTree as ET
+
+sys.path.append(os.path.join(os.path.dirname(os.path.dirname(os.path.abspath(__file__))), 'src'))
+from plots.render import figure_to_bytes
+from plots.utils import new_figure, configure_mpl_fonts
+
+_FACE = re.compile(rb"@font-face \{font-family: '([^']*)'; font-weight: (\w+); font-style: (\w+)")
+
+
+def test_svg_embeds_every_font_used():
+    configure_mpl_fonts()
+    fig, ax = new_figure()
+    ax.plot([0, 1], [0, 1])
+    ax.set_title('Bold title', fontweight='bold')
+    ax.text(0.5, 0.5, 'oblique', style='oblique')
+    svg = figure_to_bytes(fig, fmt='svg')
+
+    ET.fromstring(svg)
+    faces = _FACE.findall(svg)
+    # 刻度标签 (常规)、标题 (粗体)、斜体文字各有一个字体子集，同名同样式只声明一次
+    weights_styles = {(w, s) for _, w, s in faces}
+    assert {(b'normal', b'normal'), (b'700', b'normal'), (b'normal', b'oblique')} <= weights_styles
+    assert len(faces) == len(set(faces))
@@ -0,0 +1,50 @@
+import os
+import sys
+import numpy as np
+
+sys.path.append(os.path.join(os.path.dirname(os.path.dirname(os.path.abspath(__file__))), 'src'))
+from plots.labels import place_labels
+
+
+def _naive(groups, desired, height, obstacles, obstacle_groups, pad):
+    """逐列逐个标签扫描的参考实现：标签放在 max(期望位置, 上一个标签上沿)，与障碍线冲突时移到线上方 pad 处"""
+    out = np.empty(len(desired))
+    for g in np.unique(groups):
+        idx = np.flatnonzero(groups == g)
+        idx = idx[np.argsort(desired[idx], kind='stable')]
+        lines = np.sort(obstacles[obstacle_groups == g])
+        floor, k = -np.inf, 0
+        for i in idx:
+            y = max(desired[i], floor)
+            while k < len(lines) and lines[k] + pad <= y:
+                k += 1
+            while k < len(lines) and lines[k] < y + height:
+                y = lines[k] + pad
+                k += 1
+            out[i] = y
+            floor = y + height
+    return out
+
+
+def test_sweep_without_obstacles():
+    y = place_labels([0, 0, 0, 1], [1.0, 0.0, 0.5, 0.2], 1.0)
+    assert np.allclose(y, [2.0, 0.0, 1.0, 0.2])
+
+
+def test_obstacles_match_reference_loop():
+    rng = np.random.default_rng(0)
+    for _ in range(500):
+        n, m = rng.integers(1, 30), rng.integers(1, 30)
+        groups = rng.integers(0, 4, n)
+        desired = rng.integers(0, 20, n).astype(float)
+        obstacles = rng.integers(0, 20, m).astype(float)
+        obstacle_groups = rng.integers(0, 4, m)
+        height, pad = rng.choice([1.0, 1.5, 2.75]), rng.choice([0.0, 0.25, 1.0])
+
+        up = place_labels(groups, desired, height, obstacles=obstacles, obstacle_groups=obstacle_groups, pad=pad)
+        assert np.array_equal(up, _naive(groups, desired, height, obstacles, obstacle_groups, pad))
+
+        down = place_labels(groups, desired, height, direction=-1, obstacles=obstacles,
+                            obstacle_groups=obstacle_groups, pad=pad)
+        ref = -_naive(groups, -(desired + height), height, -obstacles, obstacle_groups, pad) - height
+        assert np.array_equal(down, ref)
@@ -0,0 +1,46 @@
+import io
+import os
+import sys
+import numpy as np
+import pandas as pd
+
+sys.path.append(os.path.join(os.path.dirname(os.path.dirname(os.path.abspath(__file__))), 'src'))
+from ingest.plate import parse_plate_export
+
+
+def _plate_rows(letters=True):
+    """96 孔板网格：表头 1..12；letters 为 False 时不写行字母，网格左侧留一列空白"""
+    rows = [['Plate: P1'], [None] + list(range(1, 13))]
+    for r in range(8):
+        rows.append([chr(65 + r) if letters else None] + [round(0.1 * r + 0.01 * c, 3) for c in range(12)])
+    return rows
+
+
+class _Upload(io.BytesIO):
+    def __init__(self, data, name):
+        super().__init__(data)
+        self.name = name
+
+
+def _check(tidy):
+    assert len(tidy) == 96
+    assert set(tidy['Plate']) == {'P1'}
+    h12 = tidy.loc[tidy['Well'] == 'H12', 'Value'].iloc[0]
+    assert np.isclose(h12, 0.81)
+
+
+def test_csv_grid():
+    text = '\n'.join(','.join('' if c is None else str(c) for c in row) for row in _plate_rows())
+    _check(parse_plate_export(_Upload(text.encode('utf-8'), 'export.csv')))
+
+
+def test_xlsx_grid():
+    buf = io.BytesIO()
+    pd.DataFrame(_plate_rows()).to_excel(buf, header=False, index=False)
+    _check(parse_plate_export(_Upload(buf.getvalue(), 'export.xlsx')))
+
+
+def test_xlsx_grid_with_blank_column_left_of_data():
+    buf = io.BytesIO()
+    pd.DataFrame(_plate_rows(letters=False)).to_excel(buf, header=False, index=False)
+    _check(parse_plate_export(_Upload(buf.getvalue(), 'export.xlsx')))
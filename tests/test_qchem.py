@@ -0,0 +1,82 @@
+import os
+import sys
+import warnings
+import numpy as np
+import pytest
+
+sys.path.append(os.path.join(os.path.dirname(os.path.dirname(os.path.abspath(__file__))), 'src'))
+import ingest.qchem as qchem
+from ingest.qchem import parse_qchem_output, build_energy_table, HARTREE_TO_KCAL
+
+
+def _gaussian(scf, g=None):
+    lines = [' Entering Gaussian System', f' SCF Done:  E(RB3LYP) =  {scf - 0.01:.6f}     A.U. after   12 cycles',
+             f' SCF Done:  E(RB3LYP) =  {scf:.6f}     A.U. after    3 cycles']
+    if g is not None:
+        lines.append(f' Sum of electronic and thermal Free Energies=        {g:.6f}')
+    return '\n'.join(lines) + '\n'
+
+
+def _orca(scf, g=None):
+    lines = ['                                 * O   R   C   A *', f'FINAL SINGLE POINT ENERGY      {scf:.9f}']
+    if g is not None:
+        lines.append(f'Final Gibbs free energy         ...   {g:.8f} Eh')
+    return '\n'.join(lines) + '\n'
+
+
+def _write(directory, name, text):
+    path = os.path.join(directory, name)
+    with open(path, 'w') as f:
+        f.write(text)
+    return path
+
+
+def test_parse_last_values(tmp_path):
+    g16 = parse_qchem_output(_write(tmp_path, 'a.log', _gaussian(-500.25, -500.1)))
+    assert g16 == {'program': 'gaussian', 'G': -500.1, 'E': -500.25}
+    orca = parse_qchem_output(_write(tmp_path, 'b.out', _orca(-300.5)))
+    assert orca == {'program': 'orca', 'G': None, 'E': -300.5}
+
+
+def test_energy_table_relative_free_energies(tmp_path):
+    files = [_write(tmp_path, 'cat1_R.log', _gaussian(-100.0, -99.90)),
+             _write(tmp_path, 'cat1_TS1.log', _gaussian(-100.0, -99.87)),
+             _write(tmp_path, 'cat2_R.out', _orca(-100.0, -99.80)),
+             _write(tmp_path, 'cat2_TS1.out', _orca(-100.0, -99.79))]
+    table = build_energy_table(files)
+    assert list(table.columns) == ['Step', 'cat1', 'cat2', 'Energy_Type']
+    assert list(table['Step']) == ['R', 'TS1']
+    assert np.allclose(table['cat1'], [0.0, round(0.03 * HARTREE_TO_KCAL, 2)])
+    assert np.allclose(table['cat2'], [0.0, round(0.01 * HARTREE_TO_KCAL, 2)])
+    assert set(table['Energy_Type']) == {'G'}
+
+
+def test_mixed_energy_types_fall_back_to_scf(tmp_path):
+    files = [_write(tmp_path, 'p_R.log', _gaussian(-100.0, -99.9)),
+             _write(tmp_path, 'p_TS.log', _gaussian(-99.98))]
+    with pytest.warns(UserWarning, match='电子能'):
+        table = build_energy_table(files)
+    assert set(table['Energy_Type']) == {'E'}
+    assert np.allclose(table['p'], [0.0, round(0.02 * HARTREE_TO_KCAL, 2)])
+
+
+def test_step_order_warns_about_dropped_and_empty_steps(tmp_path):
+    files = [_write(tmp_path, 'p_R.log', _gaussian(-100.0, -99.9)),
+             _write(tmp_path, 'p_TS1.log', _gaussian(-100.0, -99.88)),
+             _write(tmp_path, 'p_Int9.log', _gaussian(-100.0, -99.95))]
+    with warnings.catch_warnings(record=True) as caught:
+        warnings.simplefilter('always')
+        table = build_energy_table(files, steps=['R', 'TS1', 'P'])
+    messages = ' '.join(str(w.message) for w in caught)
+    assert 'Int9' in messages and 'P' in messages
+    assert list(table['Step']) == ['R', 'TS1', 'P']
+    assert np.isnan(table['p'].iloc[2])
+
+
+def test_parse_cache_is_bounded(tmp_path, monkeypatch):
+    monkeypatch.setattr(qchem, '_PARSE_CACHE_SIZE', 3)
+    monkeypatch.setattr(qchem, '_parse_cache', qchem.OrderedDict())
+    files = [_write(tmp_path, f'p_S{i}.log', _gaussian(-100.0 - i, -99.9 - i)) for i in range(5)]
+    results = qchem.parse_qchem_outputs(files)
+    assert [r['G'] for r in results] == [-99.9 - i for i in range(5)]
+    assert len(qchem._parse_cache) == 3
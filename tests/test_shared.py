@@ -0,0 +1,50 @@
+import os
+import sys
+import numpy as np
+import pandas as pd
+
+sys.path.append(os.path.join(os.path.dirname(os.path.dirname(os.path.abspath(__file__))), 'src'))
+from ingest.shared import save_shared_sheet, load_shared_sheet
+from plots.utils import as_frame, coerce_numeric
+
+
+def _sheet():
+    return pd.DataFrame({
+        '生测编号': ['I1-1', 'I1-2', None],
+        'SMILES': ['CCO', 'c1ccccc1', 'CN'],
+        '灰霉': [95.0, np.nan, 12.5],
+        10: [1, 2, 3],
+        'flag': [True, False, True],
+    })
+
+
+def test_round_trip_restores_columns_and_dtypes(tmp_path):
+    df = _sheet()
+    sheet = load_shared_sheet(save_shared_sheet(df, tmp_path, 'plate').path)
+    out = sheet.to_frame()
+
+    assert list(out.columns) == list(df.columns)
+    assert out.columns.dtype == df.columns.dtype
+    assert [str(t) for t in out.dtypes] == [str(t) for t in df.dtypes]
+    pd.testing.assert_frame_equal(out, df)
+    assert sheet.meta['other_values'] == [['I1-1', 'I1-2', None], ['CCO', 'c1ccccc1', 'CN']]
+    assert sheet.numeric_columns == ['灰霉', 10, 'flag']
+
+
+def test_digest_follows_content(tmp_path):
+    df = _sheet()
+    a = save_shared_sheet(df, tmp_path, 'a')
+    b = save_shared_sheet(df.copy(), tmp_path, 'b')
+    changed = df.copy()
+    changed.loc[0, 'SMILES'] = 'CCN'
+    c = save_shared_sheet(changed, tmp_path, 'c')
+    assert a.digest == b.digest and repr(a) == repr(b)
+    assert c.digest != a.digest
+
+
+def test_numeric_columns_stay_mapped(tmp_path):
+    df = pd.DataFrame({'t': [0.0, 1.0, 2.0], 'A': [1.0, 2.0, 3.0]})
+    sheet = save_shared_sheet(df, tmp_path, 'kinetics')
+    frame = as_frame(sheet)
+    assert coerce_numeric(frame) is frame
+    assert np.shares_memory(frame['A'].to_numpy(), sheet.values)